@@ -0,0 +1,149 @@
+"""Decision context packing, commerce, sync and provider tables
+
+Revision ID: 8f41d2b7c6a9
+Revises: 3c9963f60e2f
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41d2b7c6a9'
+down_revision: Union[str, None] = '3c9963f60e2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # init_db (create_all) may already have created the new tables, but it
+    # never adds columns to existing ones
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    decision_columns = {column["name"] for column in inspector.get_columns("decisions")}
+    if "context_packing" not in decision_columns:
+        op.add_column("decisions", sa.Column("context_packing", sa.JSON(), nullable=True))
+
+    if "orders" not in tables:
+        op.create_table(
+            "orders",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("tenant_id", sa.String(length=36), nullable=False),
+            sa.Column("platform", sa.String(length=50), nullable=False),
+            sa.Column("external_id", sa.String(length=100), nullable=False),
+            sa.Column("customer_id", sa.String(length=100), nullable=True),
+            sa.Column("status", sa.String(length=50), nullable=True),
+            sa.Column("sales_channel", sa.String(length=50), nullable=True),
+            sa.Column("currency", sa.String(length=3), nullable=True),
+            sa.Column("total_value", sa.Float(), nullable=True),
+            sa.Column("items_value", sa.Float(), nullable=True),
+            sa.Column("discounts_value", sa.Float(), nullable=True),
+            sa.Column("shipping_value", sa.Float(), nullable=True),
+            sa.Column("items_count", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("last_change_at", sa.DateTime(), nullable=True),
+            sa.Column("synced_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("tenant_id", "platform", "external_id", name="uq_orders_tenant_platform_external"),
+        )
+        op.create_index("ix_orders_tenant_id", "orders", ["tenant_id"])
+        op.create_index("ix_orders_created_at", "orders", ["created_at"])
+        op.create_index("ix_orders_tenant_customer_created", "orders", ["tenant_id", "customer_id", "created_at"])
+
+    if "export_checkpoints" not in tables:
+        op.create_table(
+            "export_checkpoints",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("tenant_id", sa.String(length=36), nullable=False),
+            sa.Column("platform", sa.String(length=50), nullable=False),
+            sa.Column("resource", sa.String(length=50), nullable=False),
+            sa.Column("range_start", sa.DateTime(), nullable=False),
+            sa.Column("range_end", sa.DateTime(), nullable=False),
+            sa.Column("completed_through", sa.DateTime(), nullable=False),
+            sa.Column("exported", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "tenant_id", "platform", "resource", name="uq_export_checkpoints_tenant_platform_resource"
+            ),
+        )
+        op.create_index("ix_export_checkpoints_tenant_id", "export_checkpoints", ["tenant_id"])
+
+    if "sync_watermarks" not in tables:
+        op.create_table(
+            "sync_watermarks",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("tenant_id", sa.String(length=36), nullable=False),
+            sa.Column("integration", sa.String(length=50), nullable=False),
+            sa.Column("resource", sa.String(length=50), nullable=False),
+            sa.Column("scope", sa.String(length=100), nullable=True),
+            sa.Column("cursor", sa.Text(), nullable=True),
+            sa.Column("last_modified_at", sa.DateTime(), nullable=True),
+            sa.Column("etag", sa.String(length=255), nullable=True),
+            sa.Column("last_sync_at", sa.DateTime(), nullable=True),
+            sa.Column("last_full_sync_at", sa.DateTime(), nullable=True),
+            sa.Column("records_synced", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "tenant_id", "integration", "resource", name="uq_sync_watermarks_tenant_integration_resource"
+            ),
+        )
+        op.create_index("ix_sync_watermarks_tenant_id", "sync_watermarks", ["tenant_id"])
+
+    if "provider_report_cache" not in tables:
+        op.create_table(
+            "provider_report_cache",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("provider", sa.String(length=50), nullable=False),
+            sa.Column("cache_key", sa.String(length=64), nullable=False),
+            sa.Column("report_type", sa.String(length=50), nullable=False),
+            sa.Column("database", sa.String(length=10), nullable=True),
+            sa.Column("target", sa.String(length=500), nullable=True),
+            sa.Column("export_columns", sa.String(length=255), nullable=True),
+            sa.Column("rows", sa.JSON(), nullable=False),
+            sa.Column("row_count", sa.Integer(), nullable=True),
+            sa.Column("units", sa.Integer(), nullable=True),
+            sa.Column("hits", sa.Integer(), nullable=True),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("provider", "cache_key", name="uq_provider_report_cache_provider_key"),
+        )
+        op.create_index("ix_provider_report_cache_expires_at", "provider_report_cache", ["expires_at"])
+
+    if "provider_unit_usage" not in tables:
+        op.create_table(
+            "provider_unit_usage",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("tenant_id", sa.String(length=36), nullable=False),
+            sa.Column("provider", sa.String(length=50), nullable=False),
+            sa.Column("period", sa.String(length=7), nullable=False),
+            sa.Column("units_spent", sa.Integer(), nullable=True),
+            sa.Column("units_saved", sa.Integer(), nullable=True),
+            sa.Column("calls", sa.Integer(), nullable=True),
+            sa.Column("cache_hits", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "tenant_id", "provider", "period", name="uq_provider_unit_usage_tenant_provider_period"
+            ),
+        )
+        op.create_index("ix_provider_unit_usage_tenant_id", "provider_unit_usage", ["tenant_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("provider_unit_usage")
+    op.drop_table("provider_report_cache")
+    op.drop_table("sync_watermarks")
+    op.drop_table("export_checkpoints")
+    op.drop_table("orders")
+    with op.batch_alter_table("decisions") as batch_op:
+        batch_op.drop_column("context_packing")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List
+from datetime import date
 
 from app.db.session import get_db
 from app.api.deps import get_current_verified_user
@@ -19,6 +20,7 @@ from app.schemas.campaign import (
 from app.schemas.auth import MessageResponse
 from app.integrations.ads.google_ads import GoogleAdsClient
 from app.integrations.ads.meta_ads import MetaAdsClient
+from app.integrations.sync import complete_sync, plan_sync, upsert_campaigns
 
 router = APIRouter()
 
@@ -131,6 +133,57 @@ async def get_campaign_aggregates(
     )
 
 
+async def _sync_campaigns(
+    client,
+    platform: str,
+    integration: str,
+    label: str,
+    request: CampaignSyncRequest,
+    current_user: User,
+    db: AsyncSession,
+) -> MessageResponse:
+    """Incremental campaign sync against the tenant's watermark (full pass when due)"""
+    
+    scope = f"{request.start_date}..{request.end_date}"
+    plan = await plan_sync(
+        db,
+        current_user.tenant_id,
+        integration,
+        "campaigns",
+        scope=scope,
+        force_full=request.full_sync,
+        metrics_end=date.fromisoformat(request.end_date),
+    )
+    
+    campaigns = await client.fetch_campaigns(
+        start_date=request.start_date,
+        end_date=request.end_date,
+        updated_since=plan.updated_since,
+    )
+    
+    # Store campaigns (only changed rows are written)
+    counts = await upsert_campaigns(
+        db,
+        user_id=current_user.id,
+        tenant_id=current_user.tenant_id,
+        platform=platform,
+        records=campaigns,
+        start_date=request.start_date,
+        end_date=request.end_date,
+    )
+    complete_sync(plan, campaigns)
+    
+    await db.commit()
+    
+    mode = "full" if plan.full else "incremental"
+    return MessageResponse(
+        message=(
+            f"Successfully synced {len(campaigns)} campaigns from {label} ({mode}: "
+            f"{counts['created']} new, {counts['updated']} updated, {counts['unchanged']} unchanged)"
+        )
+    )
+
+
 @router.post("/sync/google", response_model=MessageResponse)
 async def sync_google_ads(
     request: CampaignSyncRequest,
@@ -141,48 +194,7 @@ async def sync_google_ads(
     
     try:
         client = GoogleAdsClient(user_id=current_user.id)
-        campaigns = await client.fetch_campaigns(
-            start_date=request.start_date,
-            end_date=request.end_date,
-        )
-        
-        # Store campaigns
-        for campaign_data in campaigns:
-            campaign = Campaign(
-                user_id=current_user.id,
-                tenant_id=current_user.tenant_id,
-                external_id=campaign_data["id"],
-                platform="google",
-                name=campaign_data["name"],
-                status=campaign_data["status"],
-                impressions=campaign_data["impressions"],
-                clicks=campaign_data["clicks"],
-                conversions=campaign_data["conversions"],
-                spend=campaign_data["spend"],
-                revenue=campaign_data.get("revenue", 0),
-                start_date=request.start_date,
-                end_date=request.end_date,
-            )
-            # Calculate derived metrics
-            metrics = CampaignMetrics.calculate_derived(
-                impressions=campaign.impressions,
-                clicks=campaign.clicks,
-                conversions=campaign.conversions,
-                spend=campaign.spend,
-                revenue=campaign.revenue,
-            )
-            campaign.ctr = metrics.ctr
-            campaign.cpc = metrics.cpc
-            campaign.cpa = metrics.cpa
-            campaign.roas = metrics.roas
-            
-            db.add(campaign)
-        
-        await db.commit()
-        
-        return MessageResponse(
-            message=f"Successfully synced {len(campaigns)} campaigns from Google Ads"
-        )
+        return await _sync_campaigns(client, "google", "google_ads", "Google Ads", request, current_user, db)
         
     except Exception as e:
         raise HTTPException(
@@ -201,48 +213,7 @@ async def sync_meta_ads(
     
     try:
         client = MetaAdsClient(user_id=current_user.id)
-        campaigns = await client.fetch_campaigns(
-            start_date=request.start_date,
-            end_date=request.end_date,
-        )
-        
-        # Store campaigns
-        for campaign_data in campaigns:
-            campaign = Campaign(
-                user_id=current_user.id,
-                tenant_id=current_user.tenant_id,
-                external_id=campaign_data["id"],
-                platform="meta",
-                name=campaign_data["name"],
-                status=campaign_data["status"],
-                impressions=campaign_data["impressions"],
-                clicks=campaign_data["clicks"],
-                conversions=campaign_data["conversions"],
-                spend=campaign_data["spend"],
-                revenue=campaign_data.get("revenue", 0),
-                start_date=request.start_date,
-                end_date=request.end_date,
-            )
-            # Calculate derived metrics
-            metrics = CampaignMetrics.calculate_derived(
-                impressions=campaign.impressions,
-                clicks=campaign.clicks,
-                conversions=campaign.conversions,
-                spend=campaign.spend,
-                revenue=campaign.revenue,
-            )
-            campaign.ctr = metrics.ctr
-            campaign.cpc = metrics.cpc
-            campaign.cpa = metrics.cpa
-            campaign.roas = metrics.roas
-            
-            db.add(campaign)
-        
-        await db.commit()
-        
-        return MessageResponse(
-            message=f"Successfully synced {len(campaigns)} campaigns from Meta Ads"
-        )
+        return await _sync_campaigns(client, "meta", "meta_ads", "Meta Ads", request, current_user, db)
         
     except Exception as e:
         raise HTTPException(
@@ -292,48 +263,7 @@ async def sync_tiktok_ads(
         from app.integrations.ads.tiktok_ads import TikTokAdsClient
         
         client = TikTokAdsClient(user_id=current_user.id)
-        campaigns = await client.fetch_campaigns(
-            start_date=request.start_date,
-            end_date=request.end_date,
-        )
-        
-        # Store campaigns
-        for campaign_data in campaigns:
-            campaign = Campaign(
-                user_id=current_user.id,
-                tenant_id=current_user.tenant_id,
-                external_id=campaign_data["id"],
-                platform="tiktok",
-                name=campaign_data["name"],
-                status=campaign_data["status"],
-                impressions=campaign_data["impressions"],
-                clicks=campaign_data["clicks"],
-                conversions=campaign_data["conversions"],
-                spend=campaign_data["spend"],
-                revenue=campaign_data.get("revenue", 0),
-                start_date=request.start_date,
-                end_date=request.end_date,
-            )
-            # Calculate derived metrics
-            metrics = CampaignMetrics.calculate_derived(
-                impressions=campaign.impressions,
-                clicks=campaign.clicks,
-                conversions=campaign.conversions,
-                spend=campaign.spend,
-                revenue=campaign.revenue,
-            )
-            campaign.ctr = metrics.ctr
-            campaign.cpc = metrics.cpc
-            campaign.cpa = metrics.cpa
-            campaign.roas = metrics.roas
-            
-            db.add(campaign)
-        
-        await db.commit()
-        
-        return MessageResponse(
-            message=f"Successfully synced {len(campaigns)} campaigns from TikTok Ads"
-        )
+        return await _sync_campaigns(client, "tiktok", "tiktok_ads", "TikTok Ads", request, current_user, db)
         
     except Exception as e:
         raise HTTPException(
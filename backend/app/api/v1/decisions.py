@@ -4,7 +4,7 @@ from sqlalchemy import select
 from typing import List
 
 from app.db.session import get_db
-from app.api.deps import get_current_verified_user
+from app.api.deps import get_current_verified_user, get_admin_user
 from app.models.user import User, Decision, AuditLog
 from app.schemas.decision import (
     DecisionRequest,
@@ -16,6 +16,7 @@ from app.schemas.decision import (
     DecisionHistoryItem,
 )
 from app.engine.orchestrator import DecisionOrchestrator
+from app.engine.diagnosis_cache import get_diagnosis_cache
 
 router = APIRouter()
 
@@ -66,6 +67,7 @@ async def evaluate_decision(
         mai_decision=result.mai_decision.value,
         validation_verdict=result.validation_verdict.value,
         next_step=result.next_step,
+        context_packing=result.context_packing,
     )
     db.add(decision)
     
@@ -136,6 +138,14 @@ async def validate_decision(
     return result
 
 
+@router.get("/cache/diagnosis")
+async def get_diagnosis_cache_stats(
+    current_user: User = Depends(get_admin_user),
+):
+    """Hit-rate metrics of the semantic diagnosis cache (admin only)"""
+    return get_diagnosis_cache().stats()
+
+
 @router.get("/history", response_model=List[DecisionHistoryItem])
 async def get_decision_history(
     limit: int = 20,
@@ -203,4 +213,5 @@ async def get_decision(
         mai_decision=decision.mai_decision,
         next_step=decision.next_step,
         validation_verdict=decision.validation_verdict,
+        context_packing=decision.context_packing,
     )
@@ -3,7 +3,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 from typing import List, Any
 from app.db.session import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_admin_user
+from app.core.http import get_http_pool
+from app.integrations.ratelimit import rate_limiter_stats
+from app.integrations.resilience import resilience_stats
+from app.integrations.response_cache import get_response_cache
+from app.integrations.tools.semrush_cache import get_semrush_cache
 from app.models.user import User
 from app.models.integrations import Integration, TenantIntegration
 
@@ -18,6 +23,26 @@ async def list_available_integrations(
     result = await db.execute(select(Integration).where(Integration.is_active == True))
     return result.scalars().all()
 
+@router.get("/metrics")
+async def get_integration_metrics(
+    current_user: User = Depends(get_admin_user)
+):
+    """Circuit breaker, hedging, rate limiter, response cache and connection pool state of this worker (admin only)"""
+    return {
+        "resilience": resilience_stats(),
+        "rate_limits": rate_limiter_stats(),
+        "response_cache": get_response_cache().stats(),
+        "semrush_cache": get_semrush_cache().stats(),
+        "http_pool": get_http_pool().stats(),
+    }
+
+@router.get("/semrush/usage")
+async def get_semrush_usage(
+    current_user: User = Depends(get_current_user)
+):
+    """SEMrush API units spent and saved by the cache this month for the current user's tenant"""
+    return await get_semrush_cache().usage(current_user.tenant_id)
+
 @router.get("/config", response_model=List[Any])
 async def list_tenant_configs(
     db: Session = Depends(get_db),
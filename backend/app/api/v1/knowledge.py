@@ -1,60 +1,79 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from typing import Dict, List, Optional
+import uuid
 
-from app.api.deps import get_current_verified_user
+from app.api.deps import get_current_verified_user, get_admin_user
 from app.models.user import User
-from app.engine.rag_engine import RAGEngine
+from app.engine.rag_engine import get_rag_engine
+from app.engine.embedding_cache import get_embedding_cache
+from app.engine.ingestion import IngestionProgress, KnowledgeIngestor, iter_document_text
+from app.engine.vector_store import NAMESPACE_ID_RE
 
 router = APIRouter()
 
+# Ingestion runs in progress in this worker, by job id
+_active_ingestions: Dict[str, IngestionProgress] = {}
 
-# Knowledge namespaces
-NAMESPACES = [
-    {
-        "id": "growth_capital",
+
+# Display names of the built-in namespaces; contents and metrics come from the live index
+NAMESPACE_INFO = {
+    "growth_capital": {
         "name": "Growth & Capital Efficiency",
         "description": "Métricas de crescimento e eficiência de capital",
-        "metrics": ["CAC Payback", "LTV/CAC", "GEI", "Burn Multiple"],
     },
-    {
-        "id": "performance_revenue",
+    "performance_revenue": {
         "name": "Performance Orientada a Receita",
         "description": "Eliminar métricas de vaidade e alinhar mídia à geração de caixa",
-        "metrics": ["ROAS Incremental", "Contribution Margin", "Margem líquida pós-mídia"],
     },
-    {
-        "id": "funnel_economics",
+    "funnel_economics": {
         "name": "Funil & Economia da Conversão",
         "description": "Otimização de conversão com foco em impacto financeiro",
-        "metrics": ["Custo por etapa", "Drop-off financeiro", "Win rate ajustado"],
     },
-    {
-        "id": "behavioral_demand",
+    "behavioral_demand": {
         "name": "Psicologia & Demanda Econômica",
         "description": "Ativar demanda real usando princípios comportamentais",
-        "metrics": ["Elasticidade de preço", "Taxa de ativação", "Aumento de ticket"],
     },
-    {
-        "id": "market_sizing",
+    "market_sizing": {
         "name": "Market Sizing & Expansão",
         "description": "Evitar escala fora do mercado real",
-        "metrics": ["TAM", "SAM", "SOM", "Penetração por segmento"],
     },
-    {
-        "id": "unit_economics",
+    "unit_economics": {
         "name": "Economia Unitária & SaaS",
         "description": "Garantir crescimento sustentável",
-        "metrics": ["Gross Margin", "NRR", "Churn por receita", "CAC Payback"],
     },
-]
+}
+
+
+def _namespace_summary(stats: Dict) -> Dict:
+    info = NAMESPACE_INFO.get(stats["namespace"], {})
+    return {
+        "id": stats["namespace"],
+        "name": info.get("name", stats["namespace"]),
+        "description": info.get("description", ""),
+        "item_count": stats["item_count"],
+        "metrics": list(stats["metrics"]),
+        "metric_counts": stats["metrics"],
+        "tags": list(stats["tags"]),
+        "tag_counts": stats["tags"],
+    }
 
 
 @router.get("/namespaces")
 async def list_namespaces(
     current_user: User = Depends(get_current_verified_user),
 ):
-    """List available RAG knowledge namespaces"""
-    return NAMESPACES
+    """
+    List knowledge namespaces visible to the caller.
+    
+    Generated from the index: item counts and metric / tag frequencies
+    cover shared MAI knowledge plus the caller's tenant knowledge.
+    """
+    
+    rag_engine = get_rag_engine()
+    return [
+        _namespace_summary(await rag_engine.namespace_stats(namespace, current_user.tenant_id))
+        for namespace in await rag_engine.list_namespaces(current_user.tenant_id)
+    ]
 
 
 @router.get("/namespaces/{namespace_id}")
@@ -64,11 +83,77 @@ async def get_namespace(
 ):
     """Get details of a specific namespace"""
     
-    for ns in NAMESPACES:
-        if ns["id"] == namespace_id:
-            return ns
+    rag_engine = get_rag_engine()
+    if namespace_id not in await rag_engine.list_namespaces(current_user.tenant_id):
+        return {"error": "Namespace not found"}
+    
+    return _namespace_summary(await rag_engine.namespace_stats(namespace_id, current_user.tenant_id))
+
+
+@router.get("/namespaces/{namespace_id}/items")
+async def list_namespace_items(
+    namespace_id: str,
+    metrics: Optional[List[str]] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_verified_user),
+):
+    """
+    Knowledge items with any of the given metrics / tags (e.g. every item
+    mentioning "CAC Payback"), looked up in the metric index without a query.
+    """
+    
+    try:
+        results = await get_rag_engine().find_items(
+            namespace_id,
+            metrics=metrics,
+            tags=tags,
+            tenant_id=current_user.tenant_id,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    return {"error": "Namespace not found"}
+    return {
+        "namespace": namespace_id,
+        "items": [hit.item for hit in results],
+    }
+
+
+@router.get("/search")
+async def search_knowledge(
+    query: str,
+    namespaces: Optional[List[str]] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    metrics: Optional[List[str]] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    current_user: User = Depends(get_current_verified_user),
+):
+    """
+    Search several knowledge namespaces and return one ranking.
+    
+    Searches every namespace visible to the caller unless `namespaces` is
+    given. Namespaces are searched concurrently and hits are merged by
+    similarity; repeated searches are served from a short-lived cache
+    that is dropped as soon as any of the indexes changes.
+    """
+    
+    try:
+        results = await get_rag_engine().search_all(
+            query=query,
+            namespaces=namespaces,
+            limit=limit,
+            tenant_id=current_user.tenant_id,
+            metrics=metrics,
+            tags=tags,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return {
+        "query": query,
+        "results": [hit.to_dict() for hit in results],
+    }
 
 
 @router.get("/namespaces/{namespace_id}/search")
@@ -76,25 +161,117 @@ async def search_namespace(
     namespace_id: str,
     query: str,
     limit: int = 5,
+    metrics: Optional[List[str]] = Query(None),
+    tags: Optional[List[str]] = Query(None),
     current_user: User = Depends(get_current_verified_user),
 ):
-    """Search within a specific knowledge namespace"""
+    """
+    Search within a specific knowledge namespace.
     
-    rag_engine = RAGEngine()
+    Covers shared MAI knowledge plus the caller's tenant knowledge;
+    `metrics` and `tags` restrict results to items with any of the values.
+    """
     
-    results = await rag_engine.search(
-        namespace=namespace_id,
-        query=query,
-        limit=limit,
-    )
+    try:
+        results = await get_rag_engine().search(
+            namespace=namespace_id,
+            query=query,
+            limit=limit,
+            tenant_id=current_user.tenant_id,
+            metrics=metrics,
+            tags=tags,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
         "namespace": namespace_id,
         "query": query,
-        "results": results,
+        "results": [hit.to_dict() for hit in results],
     }
 
 
+@router.post("/namespaces/{namespace_id}/ingest")
+async def ingest_documents(
+    namespace_id: str,
+    files: List[UploadFile] = File(...),
+    metrics: Optional[List[str]] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    current_user: User = Depends(get_admin_user),
+):
+    """
+    Stream documents (markdown, plain text or PDF) into a namespace.
+    
+    Documents go to the admin's tenant shard of the namespace, visible
+    only to that tenant. They are chunked and embedded in batches, and
+    every batch is appended to the live index, so searches keep being
+    served while the upload is processed. Returns final counts and
+    throughput.
+    """
+    
+    if not NAMESPACE_ID_RE.match(namespace_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid namespace id",
+        )
+    
+    job_id = str(uuid.uuid4())
+    progress = IngestionProgress(namespace_id, tenant_id=current_user.tenant_id)
+    _active_ingestions[job_id] = progress
+    
+    async def documents():
+        for upload in files:
+            filename = upload.filename or "document.txt"
+            yield filename, iter_document_text(upload, filename, progress)
+    
+    try:
+        await KnowledgeIngestor(get_rag_engine()).ingest(
+            namespace_id,
+            documents(),
+            metrics=metrics,
+            progress=progress,
+            tenant_id=current_user.tenant_id,
+            tags=tags,
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    finally:
+        _active_ingestions.pop(job_id, None)
+    
+    return {"job_id": job_id, **progress.to_dict()}
+
+
+@router.get("/ingestions")
+async def list_active_ingestions(
+    current_user: User = Depends(get_admin_user),
+):
+    """Progress and throughput of the tenant's ingestions running in this worker"""
+    return [
+        {"job_id": job_id, **progress.to_dict()}
+        for job_id, progress in _active_ingestions.items()
+        if progress.tenant_id == current_user.tenant_id
+    ]
+
+
+@router.get("/cache/embeddings")
+async def get_embedding_cache_stats(
+    current_user: User = Depends(get_admin_user),
+):
+    """Hit-rate metrics of the query embedding cache (admin only)"""
+    return get_embedding_cache().stats()
+
+
+@router.get("/cache/search")
+async def get_search_cache_stats(
+    current_user: User = Depends(get_admin_user),
+):
+    """Hit-rate metrics of the cross-namespace search cache (admin only)"""
+    return get_rag_engine().search_cache.stats()
+
+
 @router.get("/principles")
 async def list_strategic_principles(
     current_user: User = Depends(get_current_verified_user),
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Dict, Optional
 import os
 
 
@@ -33,10 +33,115 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
 
+    # LLM gateway (OpenAI-compatible chat completions; off = rule-based diagnosis)
+    LLM_ENABLED: bool = False
+    LLM_BASE_URL: str = "https://api.openai.com/v1"  # e.g. http://localhost:8100/v1 for the stub server
+    LLM_API_KEY: Optional[str] = None  # defaults to OPENAI_API_KEY
+    LLM_MODEL: Optional[str] = None  # defaults to OPENAI_MODEL
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_CONNECTIONS: int = 32
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_HTTP2: bool = True
+
+    # Outbound HTTP pool shared by integration clients and OAuth providers
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_MAX_KEEPALIVE_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP2_ENABLED: bool = True
+
+    # Integration rate limits per provider (BaseIntegrationClient.provider_name),
+    # "*" applies to every provider, e.g. {"*": {"rate": 10, "burst": 20,
+    # "max_concurrency": 8}, "vtex": {"rate": 40, "burst": 80}}. Per worker and
+    # per credential; rate is requests per second.
+    INTEGRATION_RATE_LIMITS: Dict[str, Dict[str, float]] = {}
+    INTEGRATION_MAX_RETRIES: int = 4
+    INTEGRATION_BACKOFF_SECONDS: float = 0.5
+    INTEGRATION_MAX_RETRY_AFTER_SECONDS: float = 120.0
+    # Circuit breaker per provider endpoint: opens when the failure rate over
+    # the window reaches the threshold (with at least MIN_CALLS calls)
+    INTEGRATION_BREAKER_FAILURE_RATE: float = 0.5
+    INTEGRATION_BREAKER_MIN_CALLS: int = 10
+    INTEGRATION_BREAKER_WINDOW_SECONDS: float = 30.0
+    INTEGRATION_BREAKER_OPEN_SECONDS: float = 30.0
+    # Send a duplicate GET once the endpoint's p95 latency has elapsed
+    INTEGRATION_HEDGING_ENABLED: bool = False
+    # Conditional-request (ETag / Last-Modified) cache for catalog reads
+    INTEGRATION_CACHE_ENABLED: bool = True
+    INTEGRATION_CACHE_SIZE: int = 10000
+    INTEGRATION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    INTEGRATION_CACHE_PATH: Optional[str] = None  # e.g. /var/cache/mai/integration_responses.sqlite
+    INTEGRATION_CACHE_MAX_DISK_ENTRIES: int = 100000
+    # Per-request batching of per-ID lookups (app.integrations.loader)
+    INTEGRATION_LOADER_MAX_BATCH: int = 100
+    INTEGRATION_LOADER_CONCURRENCY: int = 8
+    # Incremental syncs run against per-tenant watermarks; a full
+    # reconciliation pass re-pulls everything at this interval
+    SYNC_FULL_RECONCILE_HOURS: float = 24.0
+    # Ad metrics (spend, clicks, conversions) of a day keep changing for this
+    # long (late attribution) without touching the campaign's updated_time;
+    # incremental syncs re-pull ranges that had not settled at the last sync
+    SYNC_METRICS_SETTLE_DAYS: int = 28
+
+    # Prompt context packing: token budget per decision type (growth, budget,
+    # product, pricing, market), falling back to CONTEXT_TOKEN_BUDGET
+    CONTEXT_TOKEN_BUDGET: int = 1200
+    CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {}
+    CONTEXT_CANDIDATES_PER_NAMESPACE: int = 5
+    CONTEXT_DIVERSITY: float = 0.7  # 1 = rank by relevance only
+    CONTEXT_DUPLICATE_THRESHOLD: float = 0.8  # word-set overlap treated as duplicate
+
+    # Semantic cache of LLM diagnosis / risk answers (see app/engine/diagnosis_cache.py)
+    DIAGNOSIS_CACHE_ENABLED: bool = True
+    DIAGNOSIS_CACHE_THRESHOLD: float = 0.92  # question cosine similarity
+    DIAGNOSIS_CACHE_TTL_SECONDS: float = 3600.0
+    DIAGNOSIS_CACHE_SIZE: int = 5000
+    DIAGNOSIS_CACHE_SCOPE: str = "tenant"  # tenant | global (share answers across tenants)
+
     # Vector Database (Qdrant)
     QDRANT_HOST: str = "localhost"
     QDRANT_PORT: int = 6333
     QDRANT_API_KEY: Optional[str] = None
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = True
+    QDRANT_HTTPS: Optional[bool] = None
+    QDRANT_TIMEOUT: Optional[int] = None
+    QDRANT_LOCATION: Optional[str] = None  # ":memory:" or a path for embedded mode
+    QDRANT_COLLECTION_PREFIX: str = "mai_"
+    QDRANT_UPSERT_BATCH_SIZE: int = 256
+    QDRANT_UPSERT_CONCURRENCY: int = 4
+
+    # Knowledge vector store backend: memory (NumPy, single node) | qdrant
+    VECTOR_STORE_BACKEND: str = "memory"
+
+    # Embeddings
+    EMBEDDING_PROVIDER: str = "hashing"  # hashing | openai
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PATH: Optional[str] = None  # e.g. /var/cache/mai/query_embeddings.sqlite
+    EMBEDDING_CACHE_MAX_DISK_ENTRIES: int = 500000
+
+    # Knowledge index (memory-mapped, shared by all workers on the node)
+    KNOWLEDGE_INDEX_DIR: Optional[str] = None  # e.g. /var/lib/mai/knowledge_index
+    KNOWLEDGE_INDEX_REFRESH_SECONDS: float = 2.0
+    # Per-namespace index options, "*" applies to every namespace, e.g.
+    # {"*": {"quantization": "int8"}, "playbooks": {"quantization": "pq", "pq_subvectors": 32}}
+    # Keys: quantization (none | int8 | pq), pq_subvectors, pq_min_train_rows,
+    # pq_train_sample, rerank_candidates, index (flat | ivf), ivf_lists, nprobe,
+    # ivf_min_train_rows, ivf_train_sample
+    KNOWLEDGE_NAMESPACE_CONFIG: Dict[str, Dict[str, Any]] = {}
+    # Cross-namespace search results, invalidated when an index changes
+    SEARCH_CACHE_SIZE: int = 1000
+    SEARCH_CACHE_TTL_SECONDS: float = 30.0
+
+    # Knowledge ingestion
+    INGEST_BATCH_SIZE: int = 64
+    INGEST_CHUNK_CHARS: int = 1200
+    INGEST_CHUNK_OVERLAP: int = 150
 
     # Email (SMTP)
     SMTP_HOST: str = "smtp.gmail.com"
@@ -66,6 +171,11 @@ class Settings(BaseSettings):
     VTEX_ENVIRONMENT: str = "vtexcommercestable"
     VTEX_APP_KEY: str = ""
     VTEX_APP_TOKEN: str = ""
+    # Bulk order export (app/integrations/ecommerce/vtex_export.py)
+    VTEX_EXPORT_WINDOW_HOURS: float = 24.0
+    VTEX_EXPORT_WINDOW_CONCURRENCY: int = 2
+    VTEX_EXPORT_DETAIL_CONCURRENCY: int = 16
+    VTEX_EXPORT_BATCH_SIZE: int = 500
 
     # --- ANALYTICS & INSIGHTS ---
     GOOGLE_ANALYTICS_PROPERTY_ID: str = ""
@@ -217,6 +327,14 @@ class Settings(BaseSettings):
     
     # --- TOOLS ---
     SEMRUSH_API_KEY: str = ""
+    # Monthly API units per tenant (0 = unlimited), with per-tenant overrides {"<tenant_id>": units}
+    SEMRUSH_MONTHLY_UNIT_BUDGET: int = 0
+    SEMRUSH_TENANT_UNIT_BUDGETS: Dict[str, int] = {}
+    # How long a call waits for in-flight reservations before it is refused
+    SEMRUSH_BUDGET_WAIT_SECONDS: float = 30.0
+    # Result TTL overrides per report type, e.g. {"domain_organic": 12}
+    SEMRUSH_CACHE_TTL_HOURS: Dict[str, float] = {}
+    SEMRUSH_CACHE_MAX_ROWS: int = 50000
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,142 @@
+"""
+Shared outbound HTTP client pool.
+
+Integration clients and OAuth providers send their requests through one
+process-wide pool instead of opening an `httpx.AsyncClient` per call, so
+TCP and TLS handshakes are paid once per host and connections are kept
+alive between requests. Each origin (scheme, host, port) gets its own
+client with its own connection limits, so a slow API cannot exhaust the
+connections of the others. HTTP/2 is used where the server offers it.
+
+The pool is opened and closed in the application lifespan.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from app.config import settings
+
+
+Origin = Tuple[str, str, int]
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _origin(url: httpx.URL) -> Origin:
+    return (url.scheme, url.host, url.port or (443 if url.scheme == "https" else 80))
+
+
+class HTTPClientPool:
+    """
+    Per-host pooled `httpx.AsyncClient`s.
+
+    Usage:
+        pool = get_http_pool()
+        response = await pool.request("GET", "https://api.example.com/v1/items", params=...)
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and transport is None and not _http2_available():
+            logger.warning("h2 not installed, HTTP client pool falls back to HTTP/1.1")
+            http2 = False
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2
+        self._transport = transport
+        self._clients: Dict[Origin, httpx.AsyncClient] = {}
+        self._requests: Dict[Origin, int] = {}
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        """Pooled client for the origin of `url`"""
+        origin = _origin(httpx.URL(url))
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self._transport,
+            )
+            self._clients[origin] = client
+        return client
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request on the pooled client of its host (`httpx.AsyncClient.request` arguments)"""
+        origin = _origin(httpx.URL(url))
+        self._requests[origin] = self._requests.get(origin, 0) + 1
+        return await self.client(url).request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Like `request`, but the body is read incrementally inside the block"""
+        origin = _origin(httpx.URL(url))
+        self._requests[origin] = self._requests.get(origin, 0) + 1
+        async with self.client(url).stream(method, url, **kwargs) as response:
+            yield response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "max_connections_per_host": self.limits.max_connections,
+            "hosts": {
+                f"{scheme}://{host}:{port}": {"requests": self._requests.get((scheme, host, port), 0)}
+                for scheme, host, port in self._clients
+            },
+        }
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+_http_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Get the process-wide HTTP client pool configured in settings"""
+    global _http_pool
+
+    if _http_pool is None:
+        _http_pool = HTTPClientPool(
+            max_connections_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_per_host=settings.HTTP_MAX_KEEPALIVE_PER_HOST,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            http2=settings.HTTP2_ENABLED,
+        )
+
+    return _http_pool
+
+
+async def close_http_pool() -> None:
+    """Close every pooled connection (application shutdown)"""
+    global _http_pool
+
+    if _http_pool is not None:
+        await _http_pool.close()
+        _http_pool = None
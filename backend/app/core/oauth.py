@@ -5,10 +5,10 @@ Handles OAuth authentication with Google and LinkedIn.
 """
 
 from typing import Optional, Dict, Any
-import httpx
 from loguru import logger
 
 from app.config import settings
+from app.core.http import get_http_pool
 
 
 class GoogleOAuthProvider:
@@ -46,37 +46,37 @@ class GoogleOAuthProvider:
     
     async def exchange_code(self, code: str) -> Dict[str, Any]:
         """Exchange authorization code for tokens"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.TOKEN_URL,
-                data={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": self.redirect_uri,
-                },
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Google token exchange failed: {response.text}")
-                raise Exception("Failed to exchange authorization code")
-            
-            return response.json()
+        response = await get_http_pool().request(
+            "POST",
+            self.TOKEN_URL,
+            data={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": self.redirect_uri,
+            },
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Google token exchange failed: {response.text}")
+            raise Exception("Failed to exchange authorization code")
+        
+        return response.json()
     
     async def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get user info from Google"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.USER_INFO_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Google user info failed: {response.text}")
-                raise Exception("Failed to get user info")
-            
-            return response.json()
+        response = await get_http_pool().request(
+            "GET",
+            self.USER_INFO_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Google user info failed: {response.text}")
+            raise Exception("Failed to get user info")
+        
+        return response.json()
 
 
 class LinkedInOAuthProvider:
@@ -113,38 +113,38 @@ class LinkedInOAuthProvider:
     
     async def exchange_code(self, code: str) -> Dict[str, Any]:
         """Exchange authorization code for tokens"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.TOKEN_URL,
-                data={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": self.redirect_uri,
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"LinkedIn token exchange failed: {response.text}")
-                raise Exception("Failed to exchange authorization code")
-            
-            return response.json()
+        response = await get_http_pool().request(
+            "POST",
+            self.TOKEN_URL,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": self.redirect_uri,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"LinkedIn token exchange failed: {response.text}")
+            raise Exception("Failed to exchange authorization code")
+        
+        return response.json()
     
     async def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get user info from LinkedIn"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.USER_INFO_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"LinkedIn user info failed: {response.text}")
-                raise Exception("Failed to get user info")
-            
-            return response.json()
+        response = await get_http_pool().request(
+            "GET",
+            self.USER_INFO_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"LinkedIn user info failed: {response.text}")
+            raise Exception("Failed to get user info")
+        
+        return response.json()
 
 
 # Singleton instances
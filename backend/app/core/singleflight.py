@@ -0,0 +1,60 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one in-flight execution: the
+first caller starts the work, later callers await the same result. Once
+it completes the key is released, so nothing is cached beyond the
+duration of the call. Not shared between workers.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces identical concurrent async calls.
+
+    Usage:
+        flights = SingleFlight()
+        result = await flights.do(key, lambda: expensive(args))
+
+    The work runs in its own task, so a caller that is cancelled (client
+    disconnect) does not cancel it for the others; exceptions propagate
+    to every waiting caller.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "asyncio.Task[T]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._release(key, task))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller went away
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
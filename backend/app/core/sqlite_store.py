@@ -0,0 +1,117 @@
+"""
+SQLite key/value store shared by the worker processes of a node.
+
+Backs the disk tier of the two-tier caches (query embeddings, integration
+responses): one table per cache in a SQLite file in WAL mode, so readers
+do not block the writer, pruned to the least recently read rows beyond a
+row budget.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from loguru import logger
+
+
+class SQLiteStore:
+    """
+    Key/value table in a SQLite file.
+
+    Each call opens a short-lived connection, so the store is safe to use
+    from worker threads and from several processes at once. Rows carry a
+    `tag` (e.g. the embedding model): rows written under another tag are
+    never returned and are purged when the store is opened.
+
+    Usage:
+        store = SQLiteStore("/var/cache/mai/cache.sqlite", "query_embeddings", 500000, tag=model_tag)
+        store.put(key, vector.tobytes())
+        value, meta = store.get(key) or (None, None)
+
+    Args:
+        path: SQLite file (created along with its directory)
+        table: Table holding this store's rows
+        max_entries: Rows kept; the least recently read are pruned beyond it
+        tag: Tag of the rows this store reads and writes
+    """
+
+    # Writes between two pruning passes
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str, table: str, max_entries: int, tag: str = ""):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.tag = tag
+        self._writes_since_prune = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    tag TEXT NOT NULL,
+                    meta TEXT,
+                    value BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_last_access ON {table} (last_access)")
+            purged = conn.execute(f"DELETE FROM {table} WHERE tag != ?", (tag,)).rowcount
+            if purged:
+                logger.info(f"Purged {purged} stale rows from {table} (tag != {tag})")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """(value, meta) of a key, refreshing its recency; None when absent"""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, meta FROM {self.table} WHERE key = ? AND tag = ?",
+                (key, self.tag),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+        return bytes(row[0]), row[1]
+
+    def put(self, key: str, value: bytes, meta: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, tag, meta, value, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, self.tag, meta, value, time.time()),
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.PRUNE_EVERY:
+                self._writes_since_prune = 0
+                self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used rows beyond max_entries"""
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
@@ -1,5 +1,5 @@
 # MAI Engine Package
 from app.engine.orchestrator import DecisionOrchestrator
-from app.engine.rag_engine import RAGEngine
+from app.engine.rag_engine import RAGEngine, KnowledgeHit
 from app.engine.scoring_engine import ScoringEngine
 from app.engine.validation_engine import ValidationEngine
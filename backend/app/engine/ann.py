@@ -0,0 +1,187 @@
+"""
+MAI Approximate Nearest Neighbour Search
+
+Inverted-file (IVF) partitioning for namespace indexes: vectors are
+assigned to the nearest of `lists` coarse centroids, and a search only
+scores the rows of the `nprobe` lists closest to the query.
+
+The partitioner only produces candidate rows; `NamespaceIndex` scores them
+(with quantized codes when configured) and re-ranks exactly, so IVF and
+quantization compose into an IVF-int8 / IVF-PQ index.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# Rows assigned per block, bounds the (rows × lists) score temporaries
+ASSIGN_BLOCK_ROWS = 16384
+
+
+class IVFPartitioner:
+    """
+    Coarse quantizer with incremental inverted lists.
+
+    Centroids are trained with spherical k-means once the namespace holds
+    `min_train_rows` vectors; until then searches stay exhaustive. Rows
+    appended afterwards are assigned to the existing centroids.
+
+    Args:
+        dimension: Embedding dimension
+        lists: Number of coarse centroids (inverted lists)
+        nprobe: Lists scanned per query (recall/latency knob)
+        min_train_rows: Rows required before training (default 30 × lists)
+        train_sample: Maximum rows sampled for k-means
+        iterations: k-means iterations
+        seed: Random seed for sampling and initialization
+    """
+
+    name = "ivf"
+
+    def __init__(
+        self,
+        dimension: int,
+        lists: int = 1024,
+        nprobe: int = 16,
+        min_train_rows: Optional[int] = None,
+        train_sample: int = 50000,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.dimension = dimension
+        self.lists = lists
+        self.nprobe = nprobe
+        self.min_train_rows = min_train_rows if min_train_rows is not None else 30 * lists
+        self.train_sample = train_sample
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None  # (lists, d), L2-normalized
+        self._postings: List[np.ndarray] = []
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self.rows = 0  # rows added to the inverted lists
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def should_train(self, count: int) -> bool:
+        return not self.is_trained and count >= self.min_train_rows
+
+    def config(self) -> Dict[str, Any]:
+        """Parameters that must match for persisted assignments to be reused"""
+        return {"name": self.name, "lists": self.lists}
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"centroids": self.centroids} if self.centroids is not None else {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        if "centroids" in state:
+            self.centroids = np.asarray(state["centroids"], dtype=np.float32)
+
+    def train(self, vectors: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        sample = vectors
+        if len(sample) > self.train_sample:
+            sample = sample[np.sort(rng.choice(len(sample), self.train_sample, replace=False))]
+        sample = np.asarray(sample, dtype=np.float32)
+        clusters = min(self.lists, len(sample))
+
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = self._nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        if clusters < self.lists:
+            # Tiny samples: pad with copies, padded lists just stay empty
+            centroids = np.concatenate([centroids, np.repeat(centroids[:1], self.lists - clusters, axis=0)])
+
+        self.centroids = centroids.astype(np.float32)
+        self._postings = [np.zeros(0, dtype=np.int64) for _ in range(self.lists)]
+        self._sizes = np.zeros(self.lists, dtype=np.int64)
+        self.rows = 0
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignment = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+            assignment[start:start + len(block)] = (block @ centroids.T).argmax(axis=1)
+        return assignment
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Inverted list of each vector"""
+        if self.centroids is None:
+            raise RuntimeError("IVF partitioner must be trained before assigning")
+        return self._nearest(vectors, self.centroids)
+
+    def add(self, assignment: np.ndarray, start: int) -> None:
+        """
+        Add rows `start .. start + len(assignment)` to their lists.
+
+        Row ids are written before list sizes grow, so concurrent searches
+        see each list either before or after the batch.
+        """
+        order = np.argsort(assignment, kind="stable")
+        lists, boundaries = np.unique(assignment[order], return_index=True)
+        boundaries = np.append(boundaries, len(order))
+
+        for position, list_id in enumerate(lists):
+            rows = order[boundaries[position]:boundaries[position + 1]] + start
+            size = self._sizes[list_id]
+            postings = self._postings[list_id]
+            if size + len(rows) > len(postings):
+                grown = np.zeros(max(size + len(rows), 2 * len(postings), 16), dtype=np.int64)
+                grown[:size] = postings[:size]
+                postings = grown
+            postings[size:size + len(rows)] = rows
+            self._postings[list_id] = postings
+            self._sizes[list_id] = size + len(rows)
+
+        self.rows = start + len(assignment)
+
+    def rebuild(self, assignment: np.ndarray) -> None:
+        """Rebuild every list from the assignment of rows 0..n"""
+        self._postings = [np.zeros(0, dtype=np.int64) for _ in range(self.lists)]
+        self._sizes = np.zeros(self.lists, dtype=np.int64)
+        self.rows = 0
+        self.add(np.asarray(assignment), 0)
+
+    def candidates(self, query: np.ndarray, count: int, nprobe: Optional[int] = None) -> np.ndarray:
+        """Sorted rows (below `count`) of the lists closest to the query"""
+        probes = np.argsort(-(self.centroids @ query))[:nprobe or self.nprobe]
+        sizes = self._sizes
+        rows = np.concatenate([self._postings[list_id][:sizes[list_id]] for list_id in probes])
+        rows = rows[rows < count]
+        rows.sort()
+        return rows
+
+    def list_sizes(self) -> np.ndarray:
+        return self._sizes.copy()
+
+
+def build_partitioner(config: Dict[str, Any], dimension: int) -> Optional[IVFPartitioner]:
+    """
+    Build the ANN partitioner described by a namespace config.
+
+    Recognized keys: `index` (flat | ivf), `ivf_lists`, `nprobe`,
+    `ivf_min_train_rows`, `ivf_train_sample`.
+    """
+    index_type = config.get("index", "flat")
+
+    if index_type in (None, "flat"):
+        return None
+    if index_type == "ivf":
+        return IVFPartitioner(
+            dimension,
+            lists=config.get("ivf_lists", 1024),
+            nprobe=config.get("nprobe", 16),
+            min_train_rows=config.get("ivf_min_train_rows"),
+            train_sample=config.get("ivf_train_sample", 50000),
+        )
+
+    raise ValueError(f"Unknown index type '{index_type}'")
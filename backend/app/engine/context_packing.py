@@ -0,0 +1,207 @@
+"""
+MAI Context Packing
+
+Selects what goes into an LLM prompt between RAG retrieval and diagnosis.
+Retrieved items are deduplicated (chunks of one document overlap), ranked
+by relevance and diversity (maximal marginal relevance over word sets)
+and added until the token budget of the decision type is spent, so prompt
+cost and latency stay flat as namespaces grow.
+
+Token counts use a local approximation of BPE tokenizers (about four
+characters per token, punctuation counted separately); no tokenizer
+download or network call is needed.
+"""
+
+import json
+import math
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from app.config import settings
+
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Budget share the business context may take before additional_data is trimmed
+MAX_FACTS_SHARE = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: words cost ~1 token per 4 characters"""
+    return sum(
+        math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _TOKEN_RE.findall(text)
+    )
+
+
+def _words(text: str) -> FrozenSet[str]:
+    return frozenset(word for word in _WORD_RE.findall(text.casefold()) if len(word) > 2)
+
+
+def _score(item: Any) -> float:
+    """Retrieval score of a `KnowledgeHit` or a plain item dict"""
+    score = getattr(item, "score", None)
+    if score is None:
+        score = item.get("score", 0.0)
+    return float(score or 0.0)
+
+
+def _overlap(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two word sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class PackedContext:
+    """Knowledge items and business facts chosen for one prompt"""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.items: List[Any] = []
+        self.item_tokens: List[int] = []
+        self.facts: Dict[str, Any] = {}
+        self.facts_tokens = 0
+        self.candidates = 0
+        self.duplicates = 0
+        self.over_budget = 0
+
+    @property
+    def tokens(self) -> int:
+        return self.facts_tokens + sum(self.item_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Record of the packing decision (stored with the decision)"""
+        return {
+            "budget": self.budget,
+            "tokens": self.tokens,
+            "facts_tokens": self.facts_tokens,
+            "candidates": self.candidates,
+            "dropped_duplicates": self.duplicates,
+            "dropped_over_budget": self.over_budget,
+            "items": [
+                {
+                    "namespace": getattr(item, "namespace", None),
+                    "id": item.get("id"),
+                    "score": round(_score(item), 4),
+                    "tokens": tokens,
+                }
+                for item, tokens in zip(self.items, self.item_tokens)
+            ],
+        }
+
+
+class ContextPacker:
+    """
+    Token-budgeted selection of retrieved knowledge.
+
+    Usage:
+        packer = ContextPacker()
+        packed = packer.pack(context, rag_context, decision_type)
+        prompt_items, prompt_facts = packed.items, packed.facts
+    """
+
+    def __init__(
+        self,
+        default_budget: Optional[int] = None,
+        budgets: Optional[Dict[str, int]] = None,
+        diversity: Optional[float] = None,
+        duplicate_threshold: Optional[float] = None,
+    ):
+        self.default_budget = default_budget if default_budget is not None else settings.CONTEXT_TOKEN_BUDGET
+        self.budgets = budgets if budgets is not None else settings.CONTEXT_TOKEN_BUDGETS
+        self.diversity = diversity if diversity is not None else settings.CONTEXT_DIVERSITY
+        self.duplicate_threshold = (
+            duplicate_threshold if duplicate_threshold is not None else settings.CONTEXT_DUPLICATE_THRESHOLD
+        )
+
+    def budget_for(self, decision_type: Optional[str]) -> int:
+        key = getattr(decision_type, "value", decision_type)
+        return self.budgets.get(key, self.default_budget) if key else self.default_budget
+
+    def _pack_facts(self, packed: PackedContext, context: Dict[str, Any]) -> None:
+        """Every set context field; additional_data keys only while they fit"""
+        facts = {
+            key: value
+            for key, value in context.items()
+            if value is not None and key != "additional_data"
+        }
+        tokens = estimate_tokens(json.dumps(facts, ensure_ascii=False, default=str))
+        limit = int(packed.budget * MAX_FACTS_SHARE)
+
+        extra: Dict[str, Any] = {}
+        for key, value in (context.get("additional_data") or {}).items():
+            cost = estimate_tokens(f"{key}: {value}")
+            if tokens + cost > limit:
+                continue
+            extra[key] = value
+            tokens += cost
+        if extra:
+            facts["additional_data"] = extra
+
+        packed.facts = facts
+        packed.facts_tokens = tokens
+
+    def pack(
+        self,
+        context: Dict[str, Any],
+        rag_context: Sequence[Any],
+        decision_type: Optional[str] = None,
+    ) -> PackedContext:
+        """
+        Choose the facts and knowledge items for a prompt.
+
+        Args:
+            context: Business context (DecisionContext fields)
+            rag_context: Retrieved items (`KnowledgeHit` or dicts with
+                `content` and optionally `score`)
+            decision_type: Selects the budget (CONTEXT_TOKEN_BUDGETS)
+
+        Returns:
+            Packed context, items in selection order
+        """
+        packed = PackedContext(self.budget_for(decision_type))
+        self._pack_facts(packed, context)
+        packed.candidates = len(rag_context)
+
+        # Exact duplicates first (the same text stored in several namespaces)
+        candidates = []
+        seen = set()
+        for item in sorted(rag_context, key=_score, reverse=True):
+            content = item.get("content") or ""
+            key = " ".join(content.casefold().split())
+            if key in seen:
+                packed.duplicates += 1
+                continue
+            seen.add(key)
+            candidates.append((item, _words(content), estimate_tokens(content)))
+
+        scores = [_score(item) for item, _, _ in candidates]
+        top = max(scores, default=0.0) or 1.0
+
+        remaining = packed.budget - packed.facts_tokens
+        chosen: List[FrozenSet[str]] = []
+        pending = list(range(len(candidates)))
+        while pending:
+            def marginal(index: int) -> float:
+                redundancy = max((_overlap(candidates[index][1], words) for words in chosen), default=0.0)
+                return self.diversity * scores[index] / top - (1 - self.diversity) * redundancy
+
+            best = max(pending, key=marginal)
+            pending.remove(best)
+            item, words, tokens = candidates[best]
+
+            if any(_overlap(words, other) >= self.duplicate_threshold for other in chosen):
+                packed.duplicates += 1
+                continue
+            if tokens > remaining:
+                packed.over_budget += 1
+                continue
+
+            packed.items.append(item)
+            packed.item_tokens.append(tokens)
+            chosen.append(words)
+            remaining -= tokens
+
+        return packed
@@ -0,0 +1,211 @@
+"""
+MAI Diagnosis Cache
+
+Semantic cache in front of the LLM analysis steps. Strategic questions
+repeat with small wording changes ("Devemos escalar tráfego pago?" /
+"Vale escalar o investimento em mídia paga?") and similar metrics, which
+an exact-hash cache never matches.
+
+Entries are grouped by a bucketed context signature (stage, decision
+type, LTV/CAC band, churn band) and by task, so an answer is only reused
+for a business in the same situation; within a group the question
+embedding must pass a cosine threshold. Groups are per tenant unless the
+scope is "global".
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+from app.engine.embedding_cache import EmbeddingCache, get_embedding_cache
+
+
+# Upper bounds of the LTV/CAC and churn (monthly fraction) bands
+LTV_CAC_BANDS = (1.0, 2.0, 3.0, 5.0)
+CHURN_BANDS = (0.02, 0.05, 0.10)
+
+Group = Tuple[str, ...]
+
+
+def _band(value: Any, bounds: Tuple[float, ...]) -> str:
+    if value is None:
+        return "?"
+    for index, bound in enumerate(bounds):
+        if value < bound:
+            return str(index)
+    return str(len(bounds))
+
+
+def _value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def context_signature(context: Dict[str, Any]) -> str:
+    """Bucketed business situation, e.g. "traction|growth|ltv_cac=1|churn=2" """
+    ltv = context.get("ltv")
+    cac = context.get("cac")
+    ltv_cac = ltv / cac if ltv is not None and cac else None
+    return "|".join([
+        str(_value(context.get("company_stage")) or "?"),
+        str(_value(context.get("decision_type")) or "?"),
+        f"ltv_cac={_band(ltv_cac, LTV_CAC_BANDS)}",
+        f"churn={_band(context.get('churn_rate'), CHURN_BANDS)}",
+    ])
+
+
+class _Group:
+    """Entries of one signature, with their embeddings stacked for scoring"""
+
+    def __init__(self):
+        self.keys: List[int] = []
+        self.matrix: Optional[np.ndarray] = None
+
+    def vectors(self, entries: "OrderedDict[int, Any]") -> np.ndarray:
+        if self.matrix is None:
+            self.matrix = np.stack([entries[key][1] for key in self.keys])
+        return self.matrix
+
+
+class SemanticDiagnosisCache:
+    """
+    Reuses LLM answers for near-identical questions in the same situation.
+
+    Usage:
+        cache = get_diagnosis_cache()
+        answer = await cache.get(task, question, context, tenant_id)
+        if answer is None:
+            answer = await llm(...)
+            await cache.set(task, question, context, tenant_id, answer)
+    """
+
+    def __init__(
+        self,
+        embedding_cache: EmbeddingCache,
+        threshold: float = 0.92,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 5000,
+        scope: str = "tenant",
+    ):
+        if scope not in ("tenant", "global"):
+            raise ValueError(f"Unknown diagnosis cache scope '{scope}'")
+        self.embedding_cache = embedding_cache
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.scope = scope
+
+        # key → (group, vector, answer, expires_at), oldest first
+        self._entries: "OrderedDict[int, Tuple[Group, np.ndarray, str, float]]" = OrderedDict()
+        self._groups: Dict[Group, _Group] = {}
+        self._next_key = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _group(self, task: str, context: Dict[str, Any], tenant_id: Optional[str]) -> Group:
+        owner = (tenant_id or "") if self.scope == "tenant" else "*"
+        return (owner, task, context_signature(context))
+
+    def _remove(self, key: int) -> None:
+        group_key = self._entries.pop(key)[0]
+        group = self._groups[group_key]
+        group.keys.remove(key)
+        group.matrix = None
+        if not group.keys:
+            del self._groups[group_key]
+
+    async def get(
+        self,
+        task: str,
+        question: str,
+        context: Dict[str, Any],
+        tenant_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Cached answer for a similar question in the same situation, or None"""
+        group = self._groups.get(self._group(task, context, tenant_id))
+        if group is None:
+            self.misses += 1
+            return None
+
+        query = await self.embedding_cache.embed_query(question)
+        scores = group.vectors(self._entries) @ query
+        best = int(np.argmax(scores))
+        key = group.keys[best]
+        _, _, answer, expires_at = self._entries[key]
+
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.misses += 1
+            return None
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Diagnosis cache hit ({scores[best]:.3f}) for: {question[:50]}...")
+        return answer
+
+    async def set(
+        self,
+        task: str,
+        question: str,
+        context: Dict[str, Any],
+        tenant_id: Optional[str],
+        answer: str,
+    ) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        vector = await self.embedding_cache.embed_query(question)
+        group_key = self._group(task, context, tenant_id)
+
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = (group_key, vector, answer, time.monotonic() + self.ttl_seconds)
+        group = self._groups.setdefault(group_key, _Group())
+        group.keys.append(key)
+        group.matrix = None
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._groups.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "groups": len(self._groups),
+            "scope": self.scope,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_diagnosis_cache: Optional[SemanticDiagnosisCache] = None
+
+
+def get_diagnosis_cache() -> SemanticDiagnosisCache:
+    """Get the process-wide semantic diagnosis cache configured in settings"""
+    global _diagnosis_cache
+
+    if _diagnosis_cache is None:
+        _diagnosis_cache = SemanticDiagnosisCache(
+            embedding_cache=get_embedding_cache(),
+            threshold=settings.DIAGNOSIS_CACHE_THRESHOLD,
+            ttl_seconds=settings.DIAGNOSIS_CACHE_TTL_SECONDS,
+            max_entries=settings.DIAGNOSIS_CACHE_SIZE,
+            scope=settings.DIAGNOSIS_CACHE_SCOPE,
+        )
+
+    return _diagnosis_cache
@@ -0,0 +1,133 @@
+"""
+MAI Query Embedding Cache
+
+Two-tier cache for query embeddings:
+- Memory: per-process LRU of the hottest queries
+- Disk (optional): `SQLiteStore` table that survives restarts and is
+  shared by every uvicorn worker on the node (one row per vector)
+
+Keys are a SHA-256 of the embedder `model_tag` plus the normalized query
+text, so a model or dimension change never returns stale vectors. Rows
+written under a different tag are purged when the disk tier is opened.
+"""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.sqlite_store import SQLiteStore
+from app.engine.embeddings import BaseEmbedder, get_embedder, normalize_text
+
+
+class EmbeddingCache:
+    """
+    Query embedding cache with an in-memory LRU and an optional disk tier.
+
+    Usage:
+        cache = EmbeddingCache(embedder)
+        vector = await cache.embed_query("Devemos escalar investimento?")
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        max_memory_entries: int = 10000,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 500000,
+    ):
+        self.embedder = embedder
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.disk = (
+            SQLiteStore(disk_path, "query_embeddings", max_disk_entries, tag=embedder.model_tag)
+            if disk_path
+            else None
+        )
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key_for(self, text: str) -> str:
+        """Cache key: hash of model tag + normalized text"""
+        payload = f"{self.embedder.model_tag}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        vector.setflags(write=False)
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """
+        Get the embedding for a query, computing it only on a full miss.
+
+        Returns:
+            Read-only float32 vector
+        """
+        key = self.key_for(text)
+
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+        if self.disk is not None:
+            row = await asyncio.to_thread(self.disk.get, key)
+            if row is not None:
+                vector = np.frombuffer(row[0], dtype=np.float32)
+                self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+
+        self.misses += 1
+        vector = (await self.embedder.embed([text]))[0]
+        self._remember(key, vector)
+
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, vector.astype(np.float32).tobytes())
+
+        return vector
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for both tiers"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model_tag": self.embedder.model_tag,
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_capacity": self.max_memory_entries,
+            "disk_enabled": self.disk is not None,
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide query embedding cache configured in settings"""
+    global _embedding_cache
+
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            embedder=get_embedder(),
+            max_memory_entries=settings.EMBEDDING_CACHE_SIZE,
+            disk_path=settings.EMBEDDING_CACHE_PATH,
+            max_disk_entries=settings.EMBEDDING_CACHE_MAX_DISK_ENTRIES,
+        )
+
+    return _embedding_cache
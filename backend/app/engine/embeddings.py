@@ -0,0 +1,169 @@
+"""
+MAI Embeddings
+
+Text embedding providers used by the RAG engine.
+
+Providers:
+- hashing: deterministic local feature-hashing embedder (offline, no model download)
+- openai: OpenAI embeddings API
+
+Every provider exposes a `model_tag` that identifies the vector space it
+produces. Caches and persisted indexes store this tag so vectors from a
+different model (or dimension) are never mixed with the current ones.
+"""
+
+import asyncio
+import hashlib
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so trivially different phrasings share one cache key.
+
+    Applies NFKC, case folding, whitespace collapsing and strips
+    surrounding punctuation ("Escalar?" and "escalar" are equivalent).
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _WHITESPACE_RE.sub(" ", text)
+    return text.strip(" \t\n?!.;,")
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class BaseEmbedder(ABC):
+    """Base class for text embedding providers"""
+
+    dimension: int
+
+    @property
+    @abstractmethod
+    def model_tag(self) -> str:
+        """Identifier of the vector space produced by this embedder"""
+        pass
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Returns:
+            float32 matrix of shape (len(texts), dimension), L2-normalized
+        """
+        pass
+
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Deterministic feature-hashing embedder.
+
+    Projects accent-folded word unigrams, bigrams and character trigrams
+    into a fixed number of signed buckets. Needs no model or network,
+    which makes it the default for tests and single-node installs.
+    """
+
+    VERSION = "v1"
+
+    # Batches larger than this are embedded in a worker thread so ingestion
+    # does not stall the event loop
+    THREAD_THRESHOLD = 16
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    @property
+    def model_tag(self) -> str:
+        return f"hashing-{self.VERSION}-{self.dimension}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(_strip_accents(normalize_text(text)))
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"~{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self.embed_one(text) for text in texts])
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if len(texts) > self.THREAD_THRESHOLD:
+            return await asyncio.to_thread(self.embed_batch, texts)
+        return self.embed_batch(texts)
+
+
+class OpenAIEmbedder(BaseEmbedder):
+    """Embedder backed by the OpenAI embeddings API"""
+
+    def __init__(self, model: str, dimension: int, api_key: str):
+        from openai import AsyncOpenAI
+
+        self.model = model
+        self.dimension = dimension
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    @property
+    def model_tag(self) -> str:
+        return f"openai-{self.model}-{self.dimension}"
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimension,
+        )
+        vectors = np.array([row.embedding for row in response.data], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+_embedder: Optional[BaseEmbedder] = None
+
+
+def get_embedder() -> BaseEmbedder:
+    """Get the process-wide embedder configured in settings"""
+    global _embedder
+
+    if _embedder is None:
+        if settings.EMBEDDING_PROVIDER == "openai":
+            _embedder = OpenAIEmbedder(
+                model=settings.EMBEDDING_MODEL,
+                dimension=settings.EMBEDDING_DIMENSION,
+                api_key=settings.OPENAI_API_KEY,
+            )
+        else:
+            _embedder = HashingEmbedder(dimension=settings.EMBEDDING_DIMENSION)
+        logger.info(f"Embedder initialized: {_embedder.model_tag}")
+
+    return _embedder
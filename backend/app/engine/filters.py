@@ -0,0 +1,98 @@
+"""
+MAI Knowledge Filters
+
+Inverted postings over item metadata, used to push filters down into the
+namespace indexes: a filtered search resolves the matching rows first and
+only scores those, instead of filtering the top-k afterwards (which loses
+hits and gets slower as the shard grows).
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Item fields that can be filtered on; each holds a list of strings
+FILTER_FIELDS = ("metrics", "tags")
+
+
+def _key(value: str) -> str:
+    return value.strip().casefold()
+
+
+class PostingIndex:
+    """
+    Value → rows postings for the filterable fields of a namespace index.
+
+    Postings are append-only and grow like the vector buffer: row ids are
+    written before a list's size is advanced, so concurrent searches see
+    every list either before or after a batch.
+    """
+
+    def __init__(self, fields: Sequence[str] = FILTER_FIELDS):
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in self.fields}
+        self._sizes: Dict[str, Dict[str, int]] = {field: {} for field in self.fields}
+        # First spelling seen for each normalized value
+        self._labels: Dict[str, Dict[str, str]] = {field: {} for field in self.fields}
+
+    def add(self, items: List[Dict[str, Any]], start: int) -> None:
+        """Index rows `start .. start + len(items)`"""
+        for field in self.fields:
+            labels = self._labels[field]
+            batch: Dict[str, List[int]] = {}
+            for offset, item in enumerate(items):
+                keys = set()
+                for value in item.get(field) or []:
+                    key = _key(value)
+                    labels.setdefault(key, value)
+                    keys.add(key)
+                for key in keys:
+                    batch.setdefault(key, []).append(start + offset)
+
+            postings = self._postings[field]
+            sizes = self._sizes[field]
+            for value, rows in batch.items():
+                size = sizes.get(value, 0)
+                array = postings.get(value, np.zeros(0, dtype=np.int64))
+                if size + len(rows) > len(array):
+                    grown = np.zeros(max(size + len(rows), 2 * len(array), 16), dtype=np.int64)
+                    grown[:size] = array[:size]
+                    array = grown
+                array[size:size + len(rows)] = rows
+                postings[value] = array
+                sizes[value] = size + len(rows)
+
+    def rows(self, filters: Dict[str, Optional[List[str]]], count: int) -> Optional[np.ndarray]:
+        """
+        Sorted rows (below `count`) matching the filters.
+
+        A row matches a field when it has any of the listed values, and
+        must match every filtered field. Returns None when no filter is set.
+        """
+        result: Optional[np.ndarray] = None
+        for field, values in filters.items():
+            if not values:
+                continue
+            if field not in self._postings:
+                raise ValueError(f"Unsupported filter field '{field}'")
+
+            postings = self._postings[field]
+            sizes = self._sizes[field]
+            # A list published by a concurrent add may not have its size yet
+            parts = [
+                postings[key][:sizes.get(key, 0)]
+                for key in {_key(value) for value in values}
+                if key in postings
+            ]
+            matched = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+            result = matched if result is None else np.intersect1d(result, matched, assume_unique=True)
+
+        if result is None:
+            return None
+        return result[result < count]
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Rows per value of a field"""
+        labels = self._labels[field]
+        return {labels.get(key, key): size for key, size in list(self._sizes[field].items())}
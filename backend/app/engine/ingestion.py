@@ -0,0 +1,303 @@
+"""
+MAI Knowledge Ingestion
+
+Streams documents (markdown, plain text, PDF) into a RAG namespace:
+
+    read (64 KB pieces / PDF pages) → chunk → embed in batches → append
+
+Nothing is held in memory beyond the current read buffer, the chunker
+buffer and one pending embedding batch, so playbooks of hundreds of MB can
+be loaded without rebuilding the namespace index or pausing searches.
+"""
+
+import asyncio
+import codecs
+import hashlib
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.config import settings
+
+
+READ_SIZE = 64 * 1024
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+class IngestionProgress:
+    """Counters and throughput for one ingestion run"""
+
+    def __init__(self, namespace: str, tenant_id: Optional[str] = None):
+        self.namespace = namespace
+        self.tenant_id = tenant_id
+        self.documents = 0
+        self.chunks = 0
+        self.batches = 0
+        self.bytes_read = 0
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed
+        return {
+            "namespace": self.namespace,
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "batches": self.batches,
+            "bytes_read": self.bytes_read,
+            "elapsed_seconds": round(elapsed, 3),
+            "chunks_per_second": round(self.chunks / elapsed, 1) if elapsed > 0 else 0.0,
+            "mb_per_second": round(self.bytes_read / 1_048_576 / elapsed, 3) if elapsed > 0 else 0.0,
+            "finished": self.finished_at is not None,
+        }
+
+
+class TextChunker:
+    """
+    Incremental text chunker.
+
+    Text is fed in arbitrary pieces; chunks of at most `max_chars` are
+    emitted as soon as they are complete, preferring paragraph, then
+    sentence, then word boundaries. Consecutive chunks overlap by roughly
+    `overlap` characters so context spanning a boundary is not lost.
+    """
+
+    def __init__(self, max_chars: int = 1200, overlap: int = 150):
+        if overlap >= max_chars:
+            raise ValueError("overlap must be smaller than max_chars")
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self._buffer = ""
+
+    def _split_point(self, text: str) -> int:
+        window = text[:self.max_chars]
+        minimum = self.max_chars // 2
+        for separator in ("\n\n", ". ", "\n", " "):
+            position = window.rfind(separator)
+            if position >= minimum:
+                return position + len(separator)
+        return self.max_chars
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return the chunks completed by it"""
+        self._buffer += text
+        chunks = []
+        while len(self._buffer) > self.max_chars:
+            split = self._split_point(self._buffer)
+            chunk = self._buffer[:split].strip()
+            if chunk:
+                chunks.append(chunk)
+            start = max(split - self.overlap, 1)
+            boundary = self._buffer.find(" ", start, split)
+            self._buffer = self._buffer[boundary + 1 if boundary != -1 else split:]
+        return chunks
+
+    def flush(self) -> List[str]:
+        """Return the trailing partial chunk, if any"""
+        chunk = self._buffer.strip()
+        self._buffer = ""
+        return [chunk] if chunk else []
+
+
+async def iter_document_text(
+    file: Any,
+    filename: str,
+    progress: Optional[IngestionProgress] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the text of an uploaded document.
+
+    Args:
+        file: Object with an async `read(size)` (e.g. FastAPI UploadFile)
+        filename: Original file name, used to detect PDFs
+        progress: Optional progress to account bytes read
+    """
+    if filename.lower().endswith(".pdf"):
+        async for page in _iter_pdf_pages(file, progress):
+            yield page
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        data = await file.read(READ_SIZE)
+        if not data:
+            break
+        if progress is not None:
+            progress.bytes_read += len(data)
+        yield decoder.decode(data)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def _iter_pdf_pages(
+    file: Any,
+    progress: Optional[IngestionProgress] = None,
+) -> AsyncIterator[str]:
+    """Extract PDF text page by page (pypdf is imported lazily)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise RuntimeError("PDF ingestion requires the 'pypdf' package") from e
+
+    # UploadFile spools to disk; pypdf reads pages lazily from the file handle
+    handle = getattr(file, "file", file)
+    reader = await asyncio.to_thread(PdfReader, handle)
+    if progress is not None:
+        handle.seek(0, 2)
+        progress.bytes_read += handle.tell()
+
+    for page in reader.pages:
+        text = await asyncio.to_thread(page.extract_text)
+        if text:
+            yield text + "\n\n"
+
+
+def detect_metrics(text: str, vocabulary: Set[str]) -> List[str]:
+    """Known metric names mentioned in a chunk"""
+    # Word boundaries, so "TAM" does not match inside "também"
+    return sorted(
+        metric for metric in vocabulary
+        if re.search(rf"(?<!\w){re.escape(metric)}(?!\w)", text, re.IGNORECASE)
+    )
+
+
+def _slugify(value: str) -> str:
+    return _SLUG_RE.sub("-", value.lower()).strip("-") or "doc"
+
+
+def chunk_id(namespace: str, source: str, sequence: int, content: str) -> str:
+    """
+    Id of a document chunk.
+
+    The digest covers the exact source name and the chunk text, so an
+    unchanged chunk keeps its id when re-ingested (and is skipped, or
+    overwritten with the same content, by every backend), while edited
+    chunks and documents whose names slugify alike get ids of their own.
+    """
+    digest = hashlib.sha1(f"{source}\0{content}".encode("utf-8")).hexdigest()[:12]
+    return f"{namespace}:{_slugify(source)}:{sequence:05d}:{digest}"
+
+
+class KnowledgeIngestor:
+    """
+    Streams documents into a namespace through `RAGEngine.add_items`.
+
+    Usage:
+        ingestor = KnowledgeIngestor(RAGEngine())
+        progress = await ingestor.ingest("growth_capital", documents)
+    """
+
+    def __init__(
+        self,
+        rag_engine: Any,
+        batch_size: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        overlap: Optional[int] = None,
+        on_progress: Optional[Callable[[IngestionProgress], None]] = None,
+    ):
+        self.rag_engine = rag_engine
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.max_chars = max_chars or settings.INGEST_CHUNK_CHARS
+        self.overlap = overlap if overlap is not None else settings.INGEST_CHUNK_OVERLAP
+        self.on_progress = on_progress
+
+    async def _flush(
+        self,
+        namespace: str,
+        pending: List[Dict[str, Any]],
+        progress: IngestionProgress,
+        tenant_id: Optional[str],
+    ) -> None:
+        if not pending:
+            return
+        await self.rag_engine.add_items(namespace, list(pending), tenant_id=tenant_id)
+        progress.chunks += len(pending)
+        progress.batches += 1
+        pending.clear()
+
+        if self.on_progress is not None:
+            self.on_progress(progress)
+        if progress.batches % 10 == 0:
+            stats = progress.to_dict()
+            logger.info(
+                f"Ingesting '{namespace}': {stats['chunks']} chunks, "
+                f"{stats['chunks_per_second']} chunks/s"
+            )
+
+    async def ingest(
+        self,
+        namespace: str,
+        documents: AsyncIterator[Tuple[str, AsyncIterator[str]]],
+        metrics: Optional[List[str]] = None,
+        progress: Optional[IngestionProgress] = None,
+        tenant_id: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> IngestionProgress:
+        """
+        Ingest a stream of documents into a namespace.
+
+        Args:
+            namespace: Target namespace
+            documents: Async iterator of (source name, text pieces)
+            metrics: Metrics to attach to every chunk, in addition to the
+                ones detected from the namespace vocabulary
+            progress: Progress object to update (created if omitted)
+            tenant_id: Tenant owning the documents; None ingests shared
+                MAI knowledge
+            tags: Document tags attached to every chunk, for filtering
+
+        Returns:
+            Final ingestion progress
+        """
+        progress = progress or IngestionProgress(namespace, tenant_id=tenant_id)
+
+        vocabulary = set(await self.rag_engine.facets(namespace, "metrics", tenant_id))
+        vocabulary.update(metrics or [])
+
+        pending: List[Dict[str, Any]] = []
+
+        async for source, pieces in documents:
+            chunker = TextChunker(self.max_chars, self.overlap)
+            sequence = 0
+
+            async def emit(chunks: List[str]) -> None:
+                nonlocal sequence
+                for chunk in chunks:
+                    pending.append({
+                        "id": chunk_id(namespace, source, sequence, chunk),
+                        "content": chunk,
+                        "metrics": sorted(set(detect_metrics(chunk, vocabulary)) | set(metrics or [])),
+                        "tags": list(tags or []),
+                        "source": source,
+                        "chunk": sequence,
+                    })
+                    sequence += 1
+                    if len(pending) >= self.batch_size:
+                        await self._flush(namespace, pending, progress, tenant_id)
+
+            async for piece in pieces:
+                await emit(chunker.feed(piece))
+            await emit(chunker.flush())
+
+            progress.documents += 1
+
+        await self._flush(namespace, pending, progress, tenant_id)
+        progress.finished_at = time.perf_counter()
+
+        stats = progress.to_dict()
+        logger.info(
+            f"Ingested {stats['documents']} documents into '{namespace}': "
+            f"{stats['chunks']} chunks in {stats['elapsed_seconds']}s "
+            f"({stats['chunks_per_second']} chunks/s)"
+        )
+
+        return progress
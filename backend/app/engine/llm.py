@@ -0,0 +1,272 @@
+"""
+MAI LLM Gateway
+
+Process-wide client for OpenAI-compatible chat-completions APIs. All
+calls share one pooled HTTP/2 connection pool and a concurrency limit,
+so a burst of decisions cannot open unbounded connections or exceed the
+provider's rate limits. Transient failures (timeouts, 429, 5xx) are
+retried with exponential backoff, honouring Retry-After. Token usage is
+accounted per tenant.
+
+For offline load tests point LLM_BASE_URL at the bundled stub server
+(`scripts/llm_stub_server.py`).
+"""
+
+import asyncio
+import json
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+from app.config import settings
+
+
+# Statuses worth retrying: rate limits, timeouts and transient server errors
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# Upper bound for a server-provided Retry-After
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    """Chat completion failed after retries (or with a non-retryable error)"""
+    pass
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LLMGateway:
+    """
+    Pooled, rate-limited chat-completions client.
+
+    Usage:
+        gateway = get_llm_gateway()
+        text = await gateway.complete(messages, tenant_id=tenant_id)
+        async for delta in gateway.stream(messages, tenant_id=tenant_id):
+            ...
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        model: str,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        if http2 and transport is None and not _http2_available():
+            logger.warning("h2 not installed, LLM gateway falls back to HTTP/1.1")
+            http2 = False
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            http2=http2,
+            transport=transport,
+        )
+
+        # tenant → token counters ("_shared" for calls without a tenant)
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self.retries = 0
+        self.failures = 0
+
+    def _payload(self, messages: Messages, model: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"model": model or self.model, "messages": messages, **params}
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Retry-After when the server sends one, else exponential backoff with jitter"""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(max(float(retry_after), 0.0), MAX_RETRY_AFTER_SECONDS)
+                except ValueError:
+                    pass
+        return self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def _send(self, payload: Dict[str, Any], stream: bool = False) -> httpx.Response:
+        """POST a completion request, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                request = self._client.build_request("POST", "/chat/completions", json=payload)
+                response = await self._client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    self.failures += 1
+                    raise LLMError(f"LLM request failed: {e!r}") from e
+                delay = self._retry_delay(attempt)
+                logger.warning(f"LLM request error ({e!r}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code < 400:
+                    return response
+
+                await response.aread()
+                await response.aclose()
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    self.failures += 1
+                    raise LLMError(f"LLM request failed: {response.status_code} - {response.text[:200]}")
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"LLM request returned {response.status_code}, retrying in {delay:.2f}s")
+
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+        raise LLMError("LLM request failed")  # pragma: no cover - loop always returns or raises
+
+    def _account(self, tenant_id: Optional[str], usage: Optional[Dict[str, Any]]) -> None:
+        counters = self._usage.setdefault(tenant_id or "_shared", {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+        })
+        counters["requests"] += 1
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            counters[key] += int((usage or {}).get(key) or 0)
+
+    async def complete(
+        self,
+        messages: Messages,
+        tenant_id: Optional[str] = None,
+        model: Optional[str] = None,
+        **params: Any,
+    ) -> str:
+        """
+        Run a chat completion and return the assistant message.
+
+        Args:
+            messages: Chat messages ({"role", "content"})
+            tenant_id: Tenant charged with the tokens
+            model: Override of the configured model
+            **params: Extra request fields (temperature, max_tokens, ...)
+
+        Raises:
+            LLMError: The request failed after retries
+        """
+        payload = self._payload(messages, model, params)
+        async with self._semaphore:
+            response = await self._send(payload)
+
+        try:
+            body = response.json()
+            content = body["choices"][0]["message"].get("content") or ""
+        except (ValueError, KeyError, IndexError) as e:
+            self.failures += 1
+            raise LLMError(f"Malformed completion response: {e!r}") from e
+
+        self._account(tenant_id, body.get("usage"))
+        return content
+
+    async def stream(
+        self,
+        messages: Messages,
+        tenant_id: Optional[str] = None,
+        model: Optional[str] = None,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        Only opening the stream is retried; the concurrency slot is held
+        until the stream is consumed or closed. Usage is accounted from the
+        final usage chunk.
+        """
+        payload = self._payload(messages, model, {
+            **params,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        })
+        async with self._semaphore:
+            response = await self._send(payload, stream=True)
+            usage = None
+            try:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices") or []:
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            yield content
+            except httpx.TransportError as e:
+                self.failures += 1
+                raise LLMError(f"LLM stream interrupted: {e!r}") from e
+            finally:
+                await response.aclose()
+                self._account(tenant_id, usage)
+
+    def usage(self, tenant_id: Optional[str] = None) -> Dict[str, int]:
+        """Token counters of a tenant since startup"""
+        return dict(self._usage.get(tenant_id or "_shared", {}))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "retries": self.retries,
+            "failures": self.failures,
+            "tenants": {tenant: dict(counters) for tenant, counters in self._usage.items()},
+        }
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_llm_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway configured in settings"""
+    global _llm_gateway
+
+    if _llm_gateway is None:
+        _llm_gateway = LLMGateway(
+            base_url=settings.LLM_BASE_URL,
+            api_key=settings.LLM_API_KEY or settings.OPENAI_API_KEY,
+            model=settings.LLM_MODEL or settings.OPENAI_MODEL,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_seconds=settings.LLM_RETRY_BACKOFF_SECONDS,
+            http2=settings.LLM_HTTP2,
+        )
+        logger.info(f"LLM gateway initialized: {settings.LLM_BASE_URL} ({_llm_gateway.model})")
+
+    return _llm_gateway
+
+
+async def close_llm_gateway() -> None:
+    """Release pooled connections (application shutdown)"""
+    global _llm_gateway
+
+    if _llm_gateway is not None:
+        await _llm_gateway.close()
+        _llm_gateway = None
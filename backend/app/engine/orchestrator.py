@@ -11,10 +11,17 @@ Central component that orchestrates the complete decision evaluation flow:
 7. Final verdict
 """
 
+import json
+import re
 from typing import Dict, Any, Optional
 from loguru import logger
 
-from app.engine.rag_engine import RAGEngine
+from app.config import settings
+from app.core.singleflight import SingleFlight
+from app.engine.context_packing import ContextPacker
+from app.engine.diagnosis_cache import get_diagnosis_cache
+from app.engine.llm import LLMError, Messages, get_llm_gateway
+from app.engine.rag_engine import get_rag_engine
 from app.engine.scoring_engine import ScoringEngine
 from app.engine.validation_engine import ValidationEngine
 from app.engine.response_formatter import ResponseFormatter
@@ -73,8 +80,12 @@ class DecisionOrchestrator:
     └────────────────────────────────┘
     """
     
+    # Identical evaluations in flight in this worker, shared by all instances
+    _evaluations: SingleFlight[DecisionResponse] = SingleFlight()
+    
     def __init__(self):
-        self.rag_engine = RAGEngine()
+        self.rag_engine = get_rag_engine()
+        self.context_packer = ContextPacker()
         self.scoring_engine = ScoringEngine()
         self.validation_engine = ValidationEngine()
         self.formatter = ResponseFormatter()
@@ -89,6 +100,10 @@ class DecisionOrchestrator:
         """
         Execute the complete decision evaluation pipeline.
         
+        Concurrent identical requests (same tenant, question and context)
+        share one pipeline run; each caller gets its own copy of the
+        response and persists its own decision.
+        
         Args:
             question: The strategic question to evaluate
             context: Business context (metrics, stage, etc.)
@@ -99,6 +114,20 @@ class DecisionOrchestrator:
             Complete decision response with diagnosis, score, and recommendation
         """
         
+        key = (tenant_id, question, json.dumps(context, sort_keys=True, default=str))
+        result = await self._evaluations.do(
+            key,
+            lambda: self._evaluate(question, context, user_id, tenant_id),
+        )
+        return result.model_copy(deep=True)
+    
+    async def _evaluate(
+        self,
+        question: str,
+        context: Dict[str, Any],
+        user_id: str,
+        tenant_id: str,
+    ) -> DecisionResponse:
         logger.info(f"Evaluating decision for user {user_id}: {question[:50]}...")
         
         # Step 1: Classify decision type
@@ -111,15 +140,24 @@ class DecisionOrchestrator:
             query=question,
             namespaces=namespaces,
             context=context,
+            limit_per_namespace=settings.CONTEXT_CANDIDATES_PER_NAMESPACE,
+            tenant_id=tenant_id,
         )
         logger.debug(f"Retrieved context from {len(namespaces)} namespaces")
         
+        # Keep only what fits the decision type's prompt token budget
+        packed = self.context_packer.pack(context, rag_context, decision_type)
+        logger.debug(
+            f"Packed {len(packed.items)}/{packed.candidates} knowledge items "
+            f"({packed.tokens}/{packed.budget} tokens)"
+        )
+        
         # Step 3: Generate strategic diagnosis
-        diagnosis = await self._generate_diagnosis(question, context, rag_context)
+        diagnosis = await self._generate_diagnosis(question, packed.facts, packed.items, tenant_id)
         
         # Step 4: Identify key metrics and hidden risks
         key_metrics = self._identify_key_metrics(context, decision_type)
-        hidden_risks = await self._identify_hidden_risks(question, context, rag_context)
+        hidden_risks = await self._identify_hidden_risks(question, packed.facts, packed.items, tenant_id)
         
         # Step 5: Identify applicable strategic principle
         strategic_principle = self._get_strategic_principle(decision_type, context)
@@ -157,6 +195,7 @@ class DecisionOrchestrator:
             mai_decision=mai_decision,
             next_step=next_step,
             validation_verdict=ValidationVerdict(validation.validation.value),
+            context_packing=packed.to_dict(),
         )
     
     async def cross_validate(
@@ -221,11 +260,22 @@ class DecisionOrchestrator:
         question: str,
         context: Dict[str, Any],
         rag_context: list,
+        tenant_id: Optional[str] = None,
     ) -> str:
         """Generate strategic diagnosis of the situation"""
         
-        # In production, this would use LLM
-        # For now, generate based on context
+        if settings.LLM_ENABLED:
+            diagnosis = await self._ask_llm(
+                "Escreva um diagnóstico estratégico objetivo (até 3 frases) da situação.",
+                question,
+                context,
+                rag_context,
+                tenant_id,
+            )
+            if diagnosis:
+                return diagnosis.strip()
+        
+        # Rule-based diagnosis (also used when the LLM is unavailable)
         stage = context.get("company_stage", "traction")
         ltv = context.get("ltv", 0)
         cac = context.get("cac", 0)
@@ -240,6 +290,72 @@ class DecisionOrchestrator:
         else:
             return f"Os unit economics indicam fundamentos saudáveis (LTV/CAC: {ltv_cac_ratio:.1f}x, Churn: {churn*100:.1f}%). A decisão deve considerar capital efficiency."
     
+    def _llm_messages(
+        self,
+        task: str,
+        question: str,
+        context: Dict[str, Any],
+        rag_context: list,
+    ) -> Messages:
+        """Prompt with the question, the business context and retrieved knowledge"""
+        
+        knowledge = "\n".join(f"- {hit['content']}" for hit in rag_context)
+        facts = {key: value for key, value in context.items() if value is not None}
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "Você é o MAI, um motor de decisão estratégica de marketing. "
+                    "Baseie-se apenas em métricas de impacto real (CAC, LTV, churn, margem) "
+                    "e no conhecimento fornecido. Responda em português."
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Pergunta: {question}\n\n"
+                    f"Contexto: {json.dumps(facts, ensure_ascii=False, default=str)}\n\n"
+                    f"Conhecimento relevante:\n{knowledge}\n\n"
+                    f"{task}"
+                ),
+            },
+        ]
+    
+    async def _ask_llm(
+        self,
+        task: str,
+        question: str,
+        context: Dict[str, Any],
+        rag_context: list,
+        tenant_id: Optional[str],
+    ) -> Optional[str]:
+        """
+        LLM answer for a task, or None so callers fall back to the rules.
+        
+        Answers are reused from the semantic diagnosis cache for similar
+        questions asked in the same (bucketed) business situation.
+        """
+        
+        cache = get_diagnosis_cache() if settings.DIAGNOSIS_CACHE_ENABLED else None
+        if cache is not None:
+            answer = await cache.get(task, question, context, tenant_id)
+            if answer is not None:
+                return answer
+        
+        try:
+            answer = await get_llm_gateway().complete(
+                self._llm_messages(task, question, context, rag_context),
+                tenant_id=tenant_id,
+                temperature=0.2,
+            )
+        except LLMError as e:
+            logger.warning(f"LLM unavailable, using rule-based analysis: {e}")
+            return None
+        
+        if cache is not None and answer.strip():
+            await cache.set(task, question, context, tenant_id, answer)
+        return answer
+    
     def _identify_key_metrics(
         self,
         context: Dict[str, Any],
@@ -262,9 +378,26 @@ class DecisionOrchestrator:
         question: str,
         context: Dict[str, Any],
         rag_context: list,
+        tenant_id: Optional[str] = None,
     ) -> list:
         """Identify hidden risks in the decision"""
         
+        if settings.LLM_ENABLED:
+            answer = await self._ask_llm(
+                "Liste até 4 riscos ocultos desta decisão, um por linha, sem numeração.",
+                question,
+                context,
+                rag_context,
+                tenant_id,
+            )
+            risks = [
+                re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip()
+                for line in (answer or "").splitlines()
+            ]
+            risks = [risk for risk in risks if risk]
+            if risks:
+                return risks
+        
         risks = []
         
         ltv = context.get("ltv", 0)
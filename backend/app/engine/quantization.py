@@ -0,0 +1,233 @@
+"""
+MAI Vector Quantization
+
+Compressed codes for namespace vectors, scored with asymmetric distance
+computation (ADC): the query stays float32 and is compared directly with
+the codes, without decompressing the stored vectors.
+
+Codecs:
+- int8: per-vector symmetric scalar quantization (d + 4 bytes per vector)
+- pq: product quantization, M sub-vectors × 256 centroids (M bytes per vector)
+
+Codes are only used to shortlist candidates; `NamespaceIndex` re-ranks the
+shortlist against the exact float32 vectors (memory-mapped when the index
+is persisted), which recovers most of the recall lost to compression.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Rows scored per block, bounds the float32 temporaries of a scan
+SCORE_BLOCK_ROWS = 65536
+
+
+class VectorCodec(ABC):
+    """Base class for vector codecs"""
+
+    name: str
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    @property
+    def is_trained(self) -> bool:
+        return True
+
+    def should_train(self, count: int) -> bool:
+        """Whether the codec is ready to be trained on `count` rows"""
+        return False
+
+    def train(self, sample: np.ndarray) -> None:
+        pass
+
+    @abstractmethod
+    def fields(self) -> List[Tuple[str, Any, int]]:
+        """Code arrays as (name, dtype, width) triples"""
+        pass
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """Encode float32 vectors into one array per field"""
+        pass
+
+    @abstractmethod
+    def score(self, query: np.ndarray, codes: Dict[str, np.ndarray]) -> np.ndarray:
+        """Approximate inner products between the query and encoded rows"""
+        pass
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return sum(np.dtype(dtype).itemsize * width for _, dtype, width in self.fields())
+
+    def config(self) -> Dict[str, Any]:
+        """Parameters that must match for persisted codes to be reused"""
+        return {"name": self.name}
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Trained parameters to persist"""
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        pass
+
+
+class Int8Codec(VectorCodec):
+    """
+    Per-vector symmetric int8 quantization.
+
+    Each vector is scaled by its largest absolute component, so no training
+    is needed and appended vectors never fall outside the code range.
+    """
+
+    name = "int8"
+
+    def fields(self) -> List[Tuple[str, Any, int]]:
+        return [("codes", np.int8, self.dimension), ("scales", np.float32, 1)]
+
+    def encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        peak = np.abs(vectors).max(axis=1, keepdims=True)
+        peak[peak == 0] = 1.0
+        codes = np.rint(vectors / peak * 127.0).astype(np.int8)
+        return {"codes": codes, "scales": (peak / 127.0).astype(np.float32)}
+
+    def score(self, query: np.ndarray, codes: Dict[str, np.ndarray]) -> np.ndarray:
+        int_codes = codes["codes"]
+        scales = codes["scales"].reshape(-1)
+        scores = np.empty(len(int_codes), dtype=np.float32)
+        for start in range(0, len(int_codes), SCORE_BLOCK_ROWS):
+            stop = start + SCORE_BLOCK_ROWS
+            scores[start:stop] = int_codes[start:stop].astype(np.float32) @ query
+        return scores * scales
+
+
+class ProductQuantizationCodec(VectorCodec):
+    """
+    Product quantization with 256 centroids per sub-space.
+
+    The codebook is trained with k-means once the namespace holds
+    `min_train_rows` vectors; until then the index serves exact search.
+    """
+
+    name = "pq"
+
+    def __init__(
+        self,
+        dimension: int,
+        subvectors: int = 16,
+        min_train_rows: int = 1024,
+        train_sample: int = 20000,
+        iterations: int = 20,
+        seed: int = 0,
+    ):
+        super().__init__(dimension)
+        if dimension % subvectors:
+            raise ValueError(f"dimension {dimension} is not divisible by {subvectors} sub-vectors")
+        self.subvectors = subvectors
+        self.subdimension = dimension // subvectors
+        self.min_train_rows = min_train_rows
+        self.train_sample = train_sample
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None  # (M, K, d/M)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def should_train(self, count: int) -> bool:
+        return not self.is_trained and count >= self.min_train_rows
+
+    def config(self) -> Dict[str, Any]:
+        return {"name": self.name, "subvectors": self.subvectors}
+
+    def fields(self) -> List[Tuple[str, Any, int]]:
+        return [("codes", np.uint8, self.subvectors)]
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors.reshape(len(vectors), self.subvectors, self.subdimension)
+
+    @staticmethod
+    def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = (
+            (centroids * centroids).sum(axis=1)[None, :]
+            - 2.0 * points @ centroids.T
+        )
+        return distances.argmin(axis=1)
+
+    def train(self, sample: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        if len(sample) > self.train_sample:
+            sample = sample[np.sort(rng.choice(len(sample), self.train_sample, replace=False))]
+        sample = self._split(np.asarray(sample, dtype=np.float32))
+        clusters = min(256, len(sample))
+
+        centroids = np.zeros((self.subvectors, 256, self.subdimension), dtype=np.float32)
+        for m in range(self.subvectors):
+            points = sample[:, m, :]
+            current = points[rng.choice(len(points), clusters, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignment = self._nearest(points, current)
+                sums = np.zeros_like(current)
+                np.add.at(sums, assignment, points)
+                counts = np.bincount(assignment, minlength=clusters)[:, None]
+                empty = counts[:, 0] == 0
+                current = np.where(empty[:, None], current, sums / np.maximum(counts, 1))
+            centroids[m, :clusters] = current
+            # Unused slots (tiny samples) repeat a real centroid, never win ties
+            centroids[m, clusters:] = current[0]
+
+        self.centroids = centroids
+
+    def encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        if self.centroids is None:
+            raise RuntimeError("PQ codec must be trained before encoding")
+        parts = self._split(np.asarray(vectors, dtype=np.float32))
+        codes = np.empty((len(vectors), self.subvectors), dtype=np.uint8)
+        for m in range(self.subvectors):
+            codes[:, m] = self._nearest(parts[:, m, :], self.centroids[m])
+        return {"codes": codes}
+
+    def score(self, query: np.ndarray, codes: Dict[str, np.ndarray]) -> np.ndarray:
+        # Lookup table: inner product of each query sub-vector with each centroid
+        table = np.einsum("mkd,md->mk", self.centroids, self._split(query[None, :])[0])
+        pq_codes = codes["codes"]
+        columns = np.arange(self.subvectors)
+        scores = np.empty(len(pq_codes), dtype=np.float32)
+        for start in range(0, len(pq_codes), SCORE_BLOCK_ROWS):
+            block = pq_codes[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = table[columns, block].sum(axis=1)
+        return scores
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"centroids": self.centroids} if self.centroids is not None else {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        if "centroids" in state:
+            self.centroids = np.asarray(state["centroids"], dtype=np.float32)
+
+
+def build_codec(config: Dict[str, Any], dimension: int) -> Optional[VectorCodec]:
+    """
+    Build the codec described by a namespace config.
+
+    Recognized keys: `quantization` (none | int8 | pq), `pq_subvectors`,
+    `pq_min_train_rows`, `pq_train_sample`.
+    """
+    quantization = config.get("quantization", "none")
+
+    if quantization in (None, "none"):
+        return None
+    if quantization == "int8":
+        return Int8Codec(dimension)
+    if quantization == "pq":
+        return ProductQuantizationCodec(
+            dimension,
+            subvectors=config.get("pq_subvectors", 16),
+            min_train_rows=config.get("pq_min_train_rows", 1024),
+            train_sample=config.get("pq_train_sample", 20000),
+        )
+
+    raise ValueError(f"Unknown quantization '{quantization}'")
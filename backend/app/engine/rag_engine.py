@@ -10,15 +10,84 @@ Namespaces:
 - behavioral_demand: Psicologia & Demanda Econômica
 - market_sizing: Market Sizing & Expansão
 - unit_economics: Economia Unitária & SaaS
+
+Each namespace layers shared MAI knowledge with per-tenant private
+knowledge: tenant items live in their own shard, so a tenant's searches
+only ever touch the shared shard and its own, and latency does not grow
+with the number of tenants. Storage is delegated to the configured
+`VectorStore` backend (see `app.engine.vector_store`).
 """
 
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Optional, Sequence
 from loguru import logger
 
-# In production, use actual vector DB client
-# from qdrant_client import QdrantClient
-
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.singleflight import SingleFlight
+from app.engine.embedding_cache import get_embedding_cache
+from app.engine.embeddings import normalize_text
+from app.engine.vector_store import VectorStore, get_vector_store, validate_namespace
+
+
+class KnowledgeHit:
+    """
+    Read-only view of a knowledge item retrieved from a namespace.
+    
+    Holds a reference to the stored item instead of copying it, so the
+    shared knowledge base is never mutated by retrieval and no per-item
+    dict is allocated. Supports dict-style reads (`hit["content"]`,
+    `hit.get("metrics")`) for code that consumes plain items.
+    """
+    
+    __slots__ = ("namespace", "item", "score")
+    
+    def __init__(self, namespace: str, item: Dict[str, Any], score: float = 0.0):
+        object.__setattr__(self, "namespace", namespace)
+        object.__setattr__(self, "item", item)
+        object.__setattr__(self, "score", score)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("KnowledgeHit is immutable")
+    
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("KnowledgeHit is immutable")
+    
+    @property
+    def id(self) -> str:
+        return self.item["id"]
+    
+    @property
+    def content(self) -> str:
+        return self.item["content"]
+    
+    @property
+    def metrics(self) -> List[str]:
+        return self.item.get("metrics", [])
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == "namespace":
+            return self.namespace
+        if key == "score":
+            return self.score
+        return self.item[key]
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "namespace":
+            return self.namespace
+        if key == "score":
+            return self.score
+        return self.item.get(key, default)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize a plain dict (for serialization only)"""
+        return {**self.item, "namespace": self.namespace, "score": round(self.score, 4)}
+    
+    def __repr__(self) -> str:
+        return (
+            f"KnowledgeHit(namespace={self.namespace!r}, "
+            f"id={self.item.get('id')!r}, score={self.score:.4f})"
+        )
 
 
 class RAGEngine:
@@ -140,46 +209,238 @@ class RAGEngine:
         ],
     }
     
-    def __init__(self):
-        # In production, initialize vector DB client
-        # self.client = QdrantClient(
-        #     host=settings.QDRANT_HOST,
-        #     port=settings.QDRANT_PORT,
-        #     api_key=settings.QDRANT_API_KEY,
-        # )
-        pass
+    def __init__(self, store: Optional[VectorStore] = None):
+        self.embedding_cache = get_embedding_cache()
+        self.embedder = self.embedding_cache.embedder
+        self.store = store or get_vector_store()
+        self.search_cache: TTLCache[List[KnowledgeHit]] = TTLCache(
+            max_entries=settings.SEARCH_CACHE_SIZE,
+            ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+        )
+        # Identical searches in flight share one store query
+        self.searches: SingleFlight[List[KnowledgeHit]] = SingleFlight()
+        self.stats_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            max_entries=settings.SEARCH_CACHE_SIZE,
+            ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+        )
+    
+    async def _ensure_namespace(self, namespace: str) -> bool:
+        """
+        Make the shared shard of a namespace available.
+        
+        Built-in namespaces are seeded from KNOWLEDGE_BASE the first time
+        their shard is created. Returns False for namespaces with no shared
+        shard.
+        """
+        
+        if namespace in self.store.seeded:
+            return True
+        
+        seed_items = self.KNOWLEDGE_BASE.get(namespace)
+        if not await self.store.open(namespace, create=seed_items is not None):
+            return False
+        
+        if seed_items and await self.store.count(namespace) == 0:
+            vectors = await self.embedder.embed([item["content"] for item in seed_items])
+            await self.store.add(namespace, list(seed_items), vectors, only_if_empty=True)
+        
+        self.store.seeded.add(namespace)
+        return True
+    
+    async def count(self, namespace: str, tenant_id: Optional[str] = None) -> int:
+        """Items in a namespace shard (shared when tenant_id is None)"""
+        
+        if tenant_id is None:
+            await self._ensure_namespace(namespace)
+        return await self.store.count(namespace, tenant_id)
+    
+    async def facets(
+        self,
+        namespace: str,
+        field: str,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Items per value of `metrics` / `tags`, over shared plus tenant knowledge"""
+        
+        await self._ensure_namespace(namespace)
+        tenants = [None, tenant_id] if tenant_id else [None]
+        return await self.store.facets(namespace, field, tenants)
+    
+    async def add_items(
+        self,
+        namespace: str,
+        items: List[Dict[str, Any]],
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        """
+        Embed and append items to a namespace shard (created if needed).
+        
+        Searches keep running against the rows published before the batch.
+        
+        Args:
+            namespace: Target namespace
+            items: Knowledge items with at least `id` and `content`
+            tenant_id: Owner of the items; None adds shared MAI knowledge
+        """
+        
+        validate_namespace(namespace)
+        if tenant_id:
+            items = [{**item, "tenant_id": tenant_id} for item in items]
+        else:
+            await self._ensure_namespace(namespace)
+        
+        vectors = await self.embedder.embed([item["content"] for item in items])
+        await self.store.add(namespace, items, vectors, tenant_id=tenant_id)
     
     async def search(
         self,
         namespace: str,
         query: str,
         limit: int = 5,
-    ) -> List[Dict[str, Any]]:
+        tenant_id: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> List[KnowledgeHit]:
         """
         Search within a specific namespace.
         
+        Searches the shared shard and, with a tenant, that tenant's private
+        shard. Filters are resolved inside the store before scoring, so
+        filtered searches still return up to `limit` matching hits.
+        
+        The query embedding comes from the shared embedding cache, so
+        repeated questions are only embedded once, and identical searches
+        running concurrently are coalesced into one.
+        
         Args:
             namespace: Knowledge namespace to search
             query: Search query
             limit: Maximum results to return
+            tenant_id: Tenant whose private knowledge is included
+            metrics: Only items tagged with any of these metrics
+            tags: Only items with any of these document tags
             
         Returns:
-            List of relevant knowledge items
+            Knowledge hits ordered by cosine similarity
         """
         
         logger.debug(f"Searching namespace '{namespace}' for: {query[:50]}...")
         
-        # In production, use vector similarity search
-        # results = self.client.search(
-        #     collection_name=namespace,
-        #     query_vector=embed(query),
-        #     limit=limit,
-        # )
+        validate_namespace(namespace)
+        
+        if limit <= 0:
+            return []
+        
+        key = (
+            namespace,
+            normalize_text(query),
+            limit,
+            tenant_id,
+            tuple(sorted(metrics or ())),
+            tuple(sorted(tags or ())),
+        )
+        
+        async def run() -> List[KnowledgeHit]:
+            query_vector = await self.embedding_cache.embed_query(query)
+            return await self._search_vector(namespace, query_vector, limit, tenant_id, metrics, tags)
+        
+        return list(await self.searches.do(key, run))
+    
+    async def _search_vector(
+        self,
+        namespace: str,
+        query_vector: Any,
+        limit: int,
+        tenant_id: Optional[str],
+        metrics: Optional[List[str]],
+        tags: Optional[List[str]],
+    ) -> List[KnowledgeHit]:
+        await self._ensure_namespace(namespace)
+        results = await self.store.search(
+            namespace,
+            query_vector,
+            limit,
+            tenants=[None, tenant_id] if tenant_id else [None],
+            filters={"metrics": metrics, "tags": tags},
+        )
+        return [KnowledgeHit(namespace, item, score) for item, score in results]
+    
+    async def list_namespaces(self, tenant_id: Optional[str] = None) -> List[str]:
+        """Built-in namespaces plus every namespace with shared or tenant knowledge"""
+        
+        return sorted(set(self.KNOWLEDGE_BASE) | set(await self.store.namespaces(tenant_id)))
+    
+    async def search_all(
+        self,
+        query: str,
+        namespaces: Optional[Sequence[str]] = None,
+        limit: int = 10,
+        tenant_id: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> List[KnowledgeHit]:
+        """
+        Search several namespaces at once and return one fused ranking.
+        
+        The query is embedded once and every namespace is searched
+        concurrently; all namespaces share the embedder, so cosine scores
+        are directly comparable and hits are merged by score.
+        
+        Results are cached for SEARCH_CACHE_TTL_SECONDS. The cache key
+        includes the generation of every shard involved, so an add to any
+        of them makes the entry unreachable immediately; the TTL bounds
+        staleness for writes made by other processes.
+        
+        Args:
+            query: Search query
+            namespaces: Namespaces to search (default: all visible to the tenant)
+            limit: Maximum results to return overall
+            tenant_id: Tenant whose private knowledge is included
+            metrics: Only items tagged with any of these metrics
+            tags: Only items with any of these document tags
+            
+        Returns:
+            Knowledge hits from all namespaces ordered by cosine similarity
+        """
+        
+        if limit <= 0:
+            return []
+        
+        if namespaces is None:
+            namespaces = await self.list_namespaces(tenant_id)
+        namespaces = sorted(set(namespaces))
+        # Seed first so the generations in the key are the ones searched
+        await asyncio.gather(*(self._ensure_namespace(namespace) for namespace in namespaces))
+        
+        tenants = [None, tenant_id] if tenant_id else [None]
+        key = (
+            normalize_text(query),
+            tuple(namespaces),
+            limit,
+            tenant_id,
+            tuple(sorted(metrics or ())),
+            tuple(sorted(tags or ())),
+            tuple(self.store.generation(ns, tenant) for ns in namespaces for tenant in tenants),
+        )
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            # A copy, as in `search`: callers cannot reorder or trim the cached ranking
+            return list(cached)
+        
+        query_vector = await self.embedding_cache.embed_query(query)
+        results_per_namespace = await asyncio.gather(*(
+            self._search_vector(namespace, query_vector, limit, tenant_id, metrics, tags)
+            for namespace in namespaces
+        ))
         
-        # For now, return all items from namespace
-        items = self.KNOWLEDGE_BASE.get(namespace, [])
+        hits = sorted(
+            (hit for results in results_per_namespace for hit in results),
+            key=lambda hit: hit.score,
+            reverse=True,
+        )[:limit]
         
-        return items[:limit]
+        self.search_cache.set(key, list(hits))
+        return hits
     
     async def retrieve_multi_namespace(
         self,
@@ -187,53 +448,149 @@ class RAGEngine:
         namespaces: List[str],
         context: Optional[Dict[str, Any]] = None,
         limit_per_namespace: int = 3,
-    ) -> List[Dict[str, Any]]:
+        tenant_id: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> List[KnowledgeHit]:
         """
         Retrieve context from multiple namespaces.
         
+        Namespaces are searched concurrently. Results are returned as
+        read-only `KnowledgeHit` views over the stored items, so the
+        shared knowledge base is never mutated.
+        
         Args:
             query: Search query
             namespaces: List of namespaces to search
             context: Additional context for filtering
             limit_per_namespace: Max results per namespace
+            tenant_id: Tenant whose private knowledge is included
+            metrics: Only items tagged with any of these metrics
+            tags: Only items with any of these document tags
             
         Returns:
-            Combined list of relevant knowledge items
+            Combined list of relevant knowledge items, in namespace order
         """
         
         logger.info(f"Multi-namespace retrieval from: {namespaces}")
         
-        all_results = []
-        
-        for namespace in namespaces:
-            results = await self.search(
+        results_per_namespace = await asyncio.gather(*(
+            self.search(
                 namespace=namespace,
                 query=query,
                 limit=limit_per_namespace,
+                tenant_id=tenant_id,
+                metrics=metrics,
+                tags=tags,
             )
-            
-            for result in results:
-                result["namespace"] = namespace
-                all_results.append(result)
+            for namespace in namespaces
+        ))
+        
+        all_results = [
+            hit
+            for results in results_per_namespace
+            for hit in results
+        ]
         
         logger.debug(f"Retrieved {len(all_results)} total items")
         
         return all_results
     
-    async def get_namespace_context(
+    async def find_items(
+        self,
+        namespace: str,
+        metrics: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        tenant_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[KnowledgeHit]:
+        """
+        Items of a namespace with any of the given metrics / tags.
+        
+        Answered from the metric and tag postings maintained at ingestion
+        ("which items mention CAC Payback" is a dictionary lookup), no
+        query embedding or scoring involved. Hits carry a score of 0.
+        
+        Args:
+            namespace: Knowledge namespace
+            metrics: Items tagged with any of these metrics
+            tags: Items with any of these document tags
+            tenant_id: Tenant whose private knowledge is included
+            limit: Maximum items (default: all)
+        """
+        
+        await self._ensure_namespace(namespace)
+        items = await self.store.lookup(
+            namespace,
+            {"metrics": metrics, "tags": tags},
+            tenants=[None, tenant_id] if tenant_id else [None],
+            limit=limit,
+        )
+        return [KnowledgeHit(namespace, item) for item in items]
+    
+    async def namespace_stats(
         self,
         namespace: str,
+        tenant_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Get summary context for a namespace"""
+        """
+        Item count and metric / tag frequencies of a namespace.
         
-        items = self.KNOWLEDGE_BASE.get(namespace, [])
+        Covers shared plus tenant-private items. Frequencies come from the
+        postings kept up to date as items are added; the result is cached
+        like search results, keyed on the shard generations.
+        """
+        
+        await self._ensure_namespace(namespace)
+        tenants = [None, tenant_id] if tenant_id else [None]
+        key = (namespace, tenant_id, tuple(self.store.generation(namespace, tenant) for tenant in tenants))
+        cached = self.stats_cache.get(key)
+        if cached is not None:
+            # A copy, as in `search_all`: callers cannot edit the cached frequencies
+            return _copy_stats(cached)
+        
+        counts = [await self.store.count(namespace, tenant) for tenant in tenants]
+        stats = {
+            "namespace": namespace,
+            "item_count": sum(counts),
+            "metrics": _by_frequency(await self.store.facets(namespace, "metrics", tenants)),
+            "tags": _by_frequency(await self.store.facets(namespace, "tags", tenants)),
+        }
+        self.stats_cache.set(key, _copy_stats(stats))
+        return stats
+    
+    async def get_namespace_context(
+        self,
+        namespace: str,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Get summary context for a namespace (shared plus tenant-private items)"""
         
+        stats = await self.namespace_stats(namespace, tenant_id)
         return {
             "namespace": namespace,
-            "item_count": len(items),
-            "metrics": list(set(
-                metric
-                for item in items
-                for metric in item.get("metrics", [])
-            )),
+            "item_count": stats["item_count"],
+            "metrics": list(stats["metrics"]),
         }
+
+
+def _copy_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    return {**stats, "metrics": dict(stats["metrics"]), "tags": dict(stats["tags"])}
+
+
+def _by_frequency(counts: Dict[str, int]) -> Dict[str, int]:
+    """Facet counts, most frequent first"""
+    return dict(sorted(counts.items(), key=lambda entry: (-entry[1], entry[0])))
+
+
+_rag_engine: Optional[RAGEngine] = None
+
+
+def get_rag_engine() -> RAGEngine:
+    """Get the process-wide RAG engine over the configured vector store"""
+    global _rag_engine
+
+    if _rag_engine is None:
+        _rag_engine = RAGEngine()
+
+    return _rag_engine
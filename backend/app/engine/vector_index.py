@@ -0,0 +1,719 @@
+"""
+MAI Vector Index
+
+In-process vector index for a single knowledge namespace.
+
+Appends are incremental: the vector buffer grows geometrically and new rows
+are written past the published row count before the count is advanced.
+Searches read a snapshot (`count` rows of the current buffer), so they never
+wait for, or observe a half-written, ingestion batch.
+
+A namespace can also keep quantized codes (see `app.engine.quantization`)
+and an IVF partitioning (see `app.engine.ann`). Searches then only score
+the rows of the probed lists, scan the compact codes, and re-rank a
+shortlist against the exact float32 vectors, which then move out of the
+process heap into a memory-mapped scratch file. Metadata filters are resolved
+to candidate rows through postings (see `app.engine.filters`) before any
+scoring.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.engine.ann import IVFPartitioner
+from app.engine.filters import PostingIndex
+from app.engine.quantization import VectorCodec
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+# Rows encoded per block when building codes for a whole namespace
+ENCODE_BLOCK_ROWS = 65536
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k <= 0 or len(scores) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _code_rows(codes: Dict[str, np.ndarray]) -> int:
+    return min((len(array) for array in codes.values()), default=0)
+
+
+def _held_bytes(array: np.ndarray) -> int:
+    """Bytes of an array held in process memory (memory-mapped arrays hold none)"""
+    return 0 if isinstance(array, np.memmap) else array.nbytes
+
+
+class NamespaceIndex:
+    """
+    Append-only vector index for one namespace.
+
+    Items are stored by reference; `vectors[i]` is the L2-normalized
+    embedding of `items[i]`. Items whose `id` is already indexed are
+    skipped, so re-ingesting a document does not duplicate its chunks.
+
+    Once codes serve the scans, the float32 vectors are only read to
+    re-rank shortlists, so they are moved to an unlinked temporary file
+    and memory-mapped: the heap holds the codes, and the OS pages in the
+    re-ranked rows on demand.
+
+    Args:
+        namespace: Namespace id
+        dimension: Embedding dimension
+        model_tag: Embedder that produced the vectors
+        codec: Optional codec; searches scan its codes once it is trained
+        rerank_candidates: Shortlist re-ranked with exact vectors
+            (0 returns the approximate scores)
+        ann: Optional IVF partitioner; searches probe it once it is trained
+    """
+
+    INITIAL_CAPACITY = 64
+    # Filtered candidate sets up to this size are scanned exactly instead of
+    # being intersected with the probed IVF lists (which can miss rare values)
+    FILTERED_SCAN_ROWS = 20000
+
+    def __init__(
+        self,
+        namespace: str,
+        dimension: int,
+        model_tag: str,
+        codec: Optional[VectorCodec] = None,
+        rerank_candidates: int = 100,
+        ann: Optional[IVFPartitioner] = None,
+    ):
+        self.namespace = namespace
+        self.dimension = dimension
+        self.model_tag = model_tag
+        self.codec = codec
+        self.rerank_candidates = rerank_candidates
+        self.ann = ann
+        self.filters = PostingIndex()
+        self.items: List[Dict[str, Any]] = []
+        self._ids: Set[str] = set()
+        self._vectors = np.zeros((self.INITIAL_CAPACITY, dimension), dtype=np.float32)
+        # Code arrays by field; the dict is swapped whole, never filled in place past `count`
+        self._codes: Dict[str, np.ndarray] = {}
+        # Scratch file backing `_vectors` once the index is quantized
+        self._spill: Optional[IO[bytes]] = None
+        self.count = 0
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Published vectors (read-only view)"""
+        view = self._vectors[:self.count]
+        view.setflags(write=False)
+        return view
+
+    @property
+    def quantized(self) -> bool:
+        """Whether searches currently scan codes instead of float32 vectors"""
+        return self.codec is not None and 0 < self.count <= _code_rows(self._codes)
+
+    @property
+    def partitioned(self) -> bool:
+        """Whether searches currently probe IVF lists instead of every row"""
+        return self.ann is not None and self.ann.is_trained and 0 < self.count <= self.ann.rows
+
+    def _encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """Encode vectors block by block, one array per codec field"""
+        blocks = [
+            self.codec.encode(np.asarray(vectors[start:start + ENCODE_BLOCK_ROWS], dtype=np.float32))
+            for start in range(0, len(vectors), ENCODE_BLOCK_ROWS)
+        ]
+        return {
+            name: np.concatenate([block[name] for block in blocks]).astype(dtype).reshape(len(vectors), width)
+            for name, dtype, width in self.codec.fields()
+        }
+
+    def _unseen(self, items: List[Dict[str, Any]], vectors: np.ndarray) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Drop items (and their vectors) whose id is indexed or repeated in the batch"""
+        batch: Set[str] = set()
+        keep = []
+        for position, item in enumerate(items):
+            item_id = item.get("id")
+            if item_id is None:
+                keep.append(position)
+            elif item_id not in self._ids and item_id not in batch:
+                keep.append(position)
+                batch.add(item_id)
+        if len(keep) == len(items):
+            return items, vectors
+        return [items[position] for position in keep], vectors[keep]
+
+    def _publish_items(self, items: List[Dict[str, Any]]) -> None:
+        self.filters.add(items, len(self.items))
+        self.items.extend(items)
+        self._ids.update(item["id"] for item in items if item.get("id") is not None)
+
+    def _grow(self, array: np.ndarray, needed: int) -> np.ndarray:
+        if needed <= len(array):
+            return array
+        grown = np.zeros((max(needed, len(array) * 2),) + array.shape[1:], dtype=array.dtype)
+        grown[:self.count] = array[:self.count]
+        return grown
+
+    def _spill_rows(self, vectors: np.ndarray, start: int, needed: int) -> np.ndarray:
+        """Write rows to the scratch file from row `start` on; returns a map of the first `needed` rows"""
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="mai-vectors-")
+        self._spill.seek(start * self.dimension * 4)
+        self._spill.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self._spill.flush()
+        # A new map per append: searches holding the previous one keep reading valid rows
+        return np.memmap(self._spill, dtype=np.float32, mode="r", shape=(needed, self.dimension))
+
+    def append(self, items: List[Dict[str, Any]], vectors: np.ndarray, only_if_empty: bool = False) -> None:
+        """
+        Append a batch of items and their vectors.
+
+        Must not be interleaved with another append for the same index
+        (callers serialize writers); concurrent searches are safe.
+        """
+        if only_if_empty and self.count > 0:
+            return
+        if len(items) != len(vectors):
+            raise ValueError("items and vectors must have the same length")
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}")
+        items, vectors = self._unseen(items, vectors)
+        if not items:
+            return
+
+        needed = self.count + len(items)
+        if self._spill is not None:
+            self._vectors = self._spill_rows(vectors, self.count, needed)
+        else:
+            self._vectors = self._grow(self._vectors, needed)
+            self._vectors[self.count:needed] = vectors
+
+        if self.codec is not None:
+            if self._codes:
+                encoded = self._encode(vectors)
+                codes = {name: self._grow(array, needed) for name, array in self._codes.items()}
+                for name, array in codes.items():
+                    array[self.count:needed] = encoded[name]
+                self._codes = codes
+            elif self.codec.is_trained or self.codec.should_train(needed):
+                if not self.codec.is_trained:
+                    self.codec.train(self._vectors[:needed])
+                self._codes = self._encode(self._vectors[:needed])
+
+        if self.ann is not None:
+            if self.ann.is_trained:
+                self.ann.add(self.ann.assign(vectors), self.count)
+            elif self.ann.should_train(needed):
+                self.ann.train(self._vectors[:needed])
+                self.ann.rebuild(self.ann.assign(self._vectors[:needed]))
+
+        if self._codes and self._spill is None:
+            self._vectors = self._spill_rows(self._vectors[:needed], 0, needed)
+
+        self._publish_items(items)
+        # Publish last: readers only ever look at the first `count` rows
+        self.count = needed
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int,
+        nprobe: Optional[int] = None,
+        filters: Optional[Dict[str, Optional[List[str]]]] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Cosine search over the published rows.
+
+        Candidates are the rows matching the filters, narrowed to the probed
+        IVF lists once the partitioner is trained (unless the filtered set
+        is small enough to scan). With codes covering every published row,
+        candidates are shortlisted by approximate score and re-ranked
+        exactly; otherwise they are scored exactly.
+
+        Args:
+            query_vector: L2-normalized query embedding
+            limit: Maximum hits
+            nprobe: IVF lists to probe (defaults to the partitioner's)
+            filters: Field → values; rows must have any of the values of
+                every filtered field (see `PostingIndex.rows`)
+        """
+        count = self.count
+        if count == 0 or limit <= 0:
+            return []
+
+        rows = self.filters.rows(filters, count) if filters else None
+        if rows is not None and len(rows) == 0:
+            return []
+        if self.partitioned and (rows is None or len(rows) > self.FILTERED_SCAN_ROWS):
+            probed = self.ann.candidates(query_vector, count, nprobe)
+            rows = probed if rows is None else np.intersect1d(probed, rows, assume_unique=True)
+        codes = self._codes
+        if self.codec is None or count > _code_rows(codes):
+            vectors = self._vectors[:count] if rows is None else self._vectors[rows]
+            return self._rank(vectors @ query_vector, rows, limit)
+
+        approximate = self.codec.score(
+            query_vector,
+            {name: array[:count] if rows is None else array[rows] for name, array in codes.items()},
+        )
+        if self.rerank_candidates <= 0:
+            return self._rank(approximate, rows, limit)
+
+        shortlist = top_k(approximate, max(limit, self.rerank_candidates))
+        # Sorted rows keep the re-rank reads sequential on memory-mapped vectors
+        shortlist = np.sort(shortlist if rows is None else rows[shortlist])
+        return self._rank(self._vectors[shortlist] @ query_vector, shortlist, limit)
+
+    def lookup(
+        self,
+        filters: Dict[str, Optional[List[str]]],
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Published items matching the filters, in insertion order (no scoring)"""
+        rows = self.filters.rows(filters, self.count)
+        if rows is None:
+            rows = np.arange(self.count)
+        return [self.items[row] for row in rows[:limit]]
+
+    def _rank(
+        self,
+        scores: np.ndarray,
+        rows: Optional[np.ndarray],
+        limit: int,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Top hits, where `scores[i]` belongs to row `rows[i]` (or row i)"""
+        best = top_k(scores, limit)
+        row_ids = best if rows is None else rows[best]
+        return [(self.items[row], float(scores[i])) for i, row in zip(best, row_ids)]
+
+    def memory_profile(self) -> Dict[str, Any]:
+        """
+        Bytes scanned per vector by searches, versus float32 storage, and
+        the bytes of vectors and codes actually held in process memory
+        (memory-mapped files count as mapped, not held).
+        """
+        float_bytes = self.dimension * 4
+        quantized = self.quantized
+        arrays = [self._vectors, *self._codes.values()]
+        return {
+            "quantization": self.codec.name if self.codec is not None else "none",
+            "quantized": quantized,
+            "float_bytes_per_vector": float_bytes,
+            "scan_bytes_per_vector": self.codec.bytes_per_vector if quantized else float_bytes,
+            "rerank_candidates": self.rerank_candidates if quantized else 0,
+            "memory_bytes": sum(_held_bytes(array) for array in arrays),
+            "mapped_bytes": sum(array.nbytes for array in arrays if isinstance(array, np.memmap)),
+            "index": self.ann.name if self.ann is not None else "flat",
+            "partitioned": self.partitioned,
+            "nprobe": self.ann.nprobe if self.partitioned else None,
+        }
+
+
+class PersistentNamespaceIndex(NamespaceIndex):
+    """
+    Namespace index persisted as a raw float32 matrix opened with `numpy.memmap`.
+
+    Layout of `<directory>/<namespace>/`:
+    - meta.json: format version, model tag, dimension, codec, ANN and published row count
+    - vectors.f32: row-major float32 matrix (count × dimension), no header
+    - items.jsonl: one item per line, in row order
+    - codes.<field>.bin, codec.npz: quantized codes and trained codec state
+    - ivf.assign.bin, ivf.npz: IVF list of each row and the coarse centroids
+
+    Every worker maps `vectors.f32` read-only, so the matrix lives once in
+    the OS page cache no matter how many processes serve it, and opening an
+    index costs a `mmap` instead of re-embedding the namespace. With a
+    codec, searches scan the (also mapped) code files and only fault in the
+    float32 pages of the re-ranked shortlist, so the hot working set shrinks
+    to the codes. IVF lists are rebuilt in memory from the mapped
+    assignments, without re-training. Writers append under an exclusive
+    file lock and publish by atomically replacing meta.json; bytes past the
+    published count (a crashed writer) are ignored and truncated by the
+    next append. Other workers pick up new rows on `refresh()`.
+
+    Within a process, `refresh()` (called from the event loop) and
+    `append()` (run in a worker thread) share one lock, so a refresh never
+    reads the files while this handle is publishing its own append.
+    """
+
+    FORMAT_VERSION = 1
+    META_FILE = "meta.json"
+    VECTORS_FILE = "vectors.f32"
+    ITEMS_FILE = "items.jsonl"
+    CODEC_STATE_FILE = "codec.npz"
+    ANN_STATE_FILE = "ivf.npz"
+    ANN_ASSIGN_FILE = "ivf.assign.bin"
+    LOCK_FILE = ".lock"
+
+    def __init__(
+        self,
+        root: str,
+        namespace: str,
+        dimension: int,
+        model_tag: str,
+        codec: Optional[VectorCodec] = None,
+        rerank_candidates: int = 100,
+        ann: Optional[IVFPartitioner] = None,
+    ):
+        super().__init__(namespace, dimension, model_tag, codec, rerank_candidates, ann)
+        self.directory = os.path.join(root, namespace)
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._items_offset = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(
+        cls,
+        root: str,
+        namespace: str,
+        dimension: int,
+        model_tag: str,
+        create: bool = False,
+        codec: Optional[VectorCodec] = None,
+        rerank_candidates: int = 100,
+        ann: Optional[IVFPartitioner] = None,
+    ) -> Optional["PersistentNamespaceIndex"]:
+        """
+        Open a persisted namespace index.
+
+        Files written by another model or dimension are discarded; codes and
+        IVF assignments written with another configuration are rebuilt from
+        the float32 vectors. Returns None when nothing is persisted and
+        `create` is False.
+        """
+        index = cls(root, namespace, dimension, model_tag, codec, rerank_candidates, ann)
+        meta = index._read_meta()
+
+        if meta is None and not create:
+            return None
+
+        os.makedirs(index.directory, exist_ok=True)
+        with index._file_lock():
+            meta = index._read_meta()
+            if meta is not None and not index._is_compatible(meta):
+                logger.warning(
+                    f"Discarding persisted index '{namespace}' "
+                    f"({meta.get('model_tag')} != {model_tag})"
+                )
+                meta = None
+            if meta is None:
+                index._reset_files()
+            else:
+                count = meta["count"]
+                codes_count = meta.get("codes_count", 0) if index._has_codes(meta) else 0
+                ann_count = meta.get("ann_count", 0) if index._has_ann(meta) else 0
+                rebuild_codes = index._needs_build(meta, index.codec, "codec", "codes_count")
+                rebuild_ann = index._needs_build(meta, index.ann, "ann", "ann_count")
+                if rebuild_codes:
+                    codes_count = index._build_codes(count)
+                if rebuild_ann:
+                    ann_count = index._build_ann(count)
+                if rebuild_codes or rebuild_ann:
+                    meta = index._write_meta(count, codes_count, ann_count)
+                index._load_rows(meta)
+
+        return index
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _codes_file(self, field: str) -> str:
+        return f"codes.{field}.bin"
+
+    def _is_compatible(self, meta: Dict[str, Any]) -> bool:
+        return (
+            meta.get("version") == self.FORMAT_VERSION
+            and meta.get("model_tag") == self.model_tag
+            and meta.get("dimension") == self.dimension
+        )
+
+    @staticmethod
+    def _covers(meta: Dict[str, Any], component: Any, key: str, count_key: str) -> bool:
+        """Whether persisted data of `component` covers every published row"""
+        return (
+            component is not None
+            and meta.get(key) == component.config()
+            and 0 < meta["count"] <= meta.get(count_key, 0)
+        )
+
+    def _has_codes(self, meta: Dict[str, Any]) -> bool:
+        return self._covers(meta, self.codec, "codec", "codes_count")
+
+    def _has_ann(self, meta: Dict[str, Any]) -> bool:
+        return self._covers(meta, self.ann, "ann", "ann_count")
+
+    def _needs_build(self, meta: Dict[str, Any], component: Any, key: str, count_key: str) -> bool:
+        """Whether persisted codes / assignments must be (re)built on open"""
+        if component is None or self._covers(meta, component, key, count_key):
+            return False
+        if meta.get(key) == component.config() and meta.get(count_key, 0) == 0:
+            # Same configuration, not trained yet: only build once there are enough rows
+            return component.is_trained and meta["count"] > 0 or component.should_train(meta["count"])
+        return meta["count"] > 0
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive cross-process lock for writers"""
+        with open(self._path(self.LOCK_FILE), "a+") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(self.META_FILE), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, count: int, codes_count: int = 0, ann_count: int = 0) -> Dict[str, Any]:
+        meta = {
+            "version": self.FORMAT_VERSION,
+            "namespace": self.namespace,
+            "model_tag": self.model_tag,
+            "dimension": self.dimension,
+            "dtype": "float32",
+            "count": count,
+            "codec": self.codec.config() if self.codec is not None else None,
+            "codes_count": codes_count,
+            "ann": self.ann.config() if self.ann is not None else None,
+            "ann_count": ann_count,
+        }
+        temporary = self._path(f"{self.META_FILE}.tmp")
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self._path(self.META_FILE))
+        return meta
+
+    def _replace_empty(self, name: str) -> None:
+        # Replace (never truncate) files: other workers may still map the old inode
+        temporary = self._path(f"{name}.tmp")
+        open(temporary, "wb").close()
+        os.replace(temporary, self._path(name))
+
+    def _reset_files(self) -> None:
+        for name in (self.VECTORS_FILE, self.ITEMS_FILE):
+            self._replace_empty(name)
+        self._write_meta(0)
+        self.items = []
+        self._ids = set()
+        self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        self._codes = {}
+        self.filters = PostingIndex()
+        self._items_offset = 0
+        self.count = 0
+
+    def _map(self, name: str, dtype: Any, count: int, width: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros((0, width), dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode="r", shape=(count, width))
+
+    def _save_state(self, component: Any, name: str) -> None:
+        temporary = self._path(f"{name}.tmp")
+        with open(temporary, "wb") as handle:
+            np.savez(handle, **component.state())
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self._path(name))
+
+    def _load_state(self, component: Any, name: str) -> None:
+        with np.load(self._path(name)) as state:
+            component.load_state({key: state[key] for key in state.files})
+
+    def _write_rows(self, name: str, array: np.ndarray, start: int) -> None:
+        """Write rows of a fixed-width file from `start` on, dropping any unpublished tail"""
+        row_bytes = array.itemsize * int(np.prod(array.shape[1:]))
+        with open(self._path(name), "r+b") as handle:
+            handle.truncate(start * row_bytes)
+            handle.seek(start * row_bytes)
+            handle.write(np.ascontiguousarray(array).tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def _write_codes(self, encoded: Dict[str, np.ndarray], start: int) -> None:
+        for name, dtype, width in self.codec.fields():
+            self._write_rows(self._codes_file(name), encoded[name].astype(dtype).reshape(-1, width), start)
+
+    def _build_codes(self, count: int) -> int:
+        """Train the codec if needed and encode every persisted row; returns rows encoded"""
+        if not self.codec.is_trained and not self.codec.should_train(count):
+            return 0
+
+        vectors = self._map(self.VECTORS_FILE, np.float32, count, self.dimension)
+        logger.info(f"Building {self.codec.name} codes for '{self.namespace}' ({count} rows)")
+        if not self.codec.is_trained:
+            self.codec.train(vectors)
+        self._save_state(self.codec, self.CODEC_STATE_FILE)
+
+        for name, _, _ in self.codec.fields():
+            self._replace_empty(self._codes_file(name))
+        for start in range(0, count, ENCODE_BLOCK_ROWS):
+            self._write_codes(self._encode(vectors[start:start + ENCODE_BLOCK_ROWS]), start)
+        return count
+
+    def _build_ann(self, count: int) -> int:
+        """Train the IVF centroids if needed and assign every persisted row; returns rows assigned"""
+        if not self.ann.is_trained and not self.ann.should_train(count):
+            return 0
+
+        vectors = self._map(self.VECTORS_FILE, np.float32, count, self.dimension)
+        logger.info(f"Building IVF lists for '{self.namespace}' ({count} rows, {self.ann.lists} lists)")
+        if not self.ann.is_trained:
+            self.ann.train(vectors)
+        self._save_state(self.ann, self.ANN_STATE_FILE)
+
+        self._replace_empty(self.ANN_ASSIGN_FILE)
+        self._write_rows(self.ANN_ASSIGN_FILE, self.ann.assign(vectors), 0)
+        # Lists are rebuilt from the assignment file by _load_rows
+        self.ann.rows = 0
+        return count
+
+    def _load_rows(self, meta: Dict[str, Any]) -> None:
+        """Map the published rows (codes, IVF lists) and read the item lines not loaded yet"""
+        count = meta["count"]
+        if count <= self.count:
+            return
+
+        new_items = []
+        with open(self._path(self.ITEMS_FILE), "rb") as handle:
+            handle.seek(self._items_offset)
+            while len(self.items) + len(new_items) < count:
+                line = handle.readline()
+                if not line:
+                    raise RuntimeError(f"Persisted index '{self.namespace}' is missing items")
+                new_items.append(json.loads(line))
+            offset = handle.tell()
+
+        if self._has_codes(meta):
+            if not self.codec.is_trained:
+                # Trained by another worker
+                self._load_state(self.codec, self.CODEC_STATE_FILE)
+            self._codes = {
+                name: self._map(self._codes_file(name), dtype, count, width)
+                for name, dtype, width in self.codec.fields()
+            }
+        else:
+            self._codes = {}
+
+        if self._has_ann(meta):
+            assignment = self._map(self.ANN_ASSIGN_FILE, np.int32, count, 1).reshape(-1)
+            if not self.ann.is_trained:
+                self._load_state(self.ann, self.ANN_STATE_FILE)
+                self.ann.rebuild(assignment)
+            elif self.ann.rows == 0 or self.ann.rows > count:
+                self.ann.rebuild(assignment)
+            else:
+                self.ann.add(np.asarray(assignment[self.ann.rows:]), self.ann.rows)
+
+        self._vectors = self._map(self.VECTORS_FILE, np.float32, count, self.dimension)
+        self._publish_items(new_items)
+        self._items_offset = offset
+        self.count = count
+
+    def refresh(self) -> None:
+        """Pick up rows appended by other processes"""
+        # Never wait on a write from the event loop: an append in flight
+        # publishes everything up to its own rows when it finishes
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self) -> None:
+        meta = self._read_meta()
+        if meta is None:
+            return
+        if not self._is_compatible(meta) or meta["count"] < self.count:
+            # Rebuilt elsewhere: unpublish rows first, then reload from scratch
+            self.count = 0
+            self.items = []
+            self._ids = set()
+            self._items_offset = 0
+            self._codes = {}
+            self.filters = PostingIndex()
+            if self.ann is not None:
+                self.ann.rows = 0
+            self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+            if not self._is_compatible(meta):
+                return
+        self._load_rows(meta)
+
+    def append(self, items: List[Dict[str, Any]], vectors: np.ndarray, only_if_empty: bool = False) -> None:
+        """
+        Persist and publish a batch of items.
+
+        Args:
+            items: Items to append
+            vectors: Their embeddings
+            only_if_empty: Skip the write if the index already has rows
+                (used to seed a namespace from several workers at once)
+        """
+        if len(items) != len(vectors):
+            raise ValueError("items and vectors must have the same length")
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}")
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            if only_if_empty and self.count > 0:
+                return
+            items, vectors = self._unseen(items, vectors)
+            if not items:
+                return
+
+            row_bytes = self.dimension * 4
+            with open(self._path(self.VECTORS_FILE), "r+b") as handle:
+                handle.truncate(self.count * row_bytes)
+                handle.seek(self.count * row_bytes)
+                handle.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            with open(self._path(self.ITEMS_FILE), "r+b") as handle:
+                handle.truncate(self._items_offset)
+                handle.seek(self._items_offset)
+                for item in items:
+                    handle.write(json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            new_count = self.count + len(items)
+
+            codes_count = 0
+            if self.quantized:
+                self._write_codes(self._encode(vectors), self.count)
+                codes_count = new_count
+            elif self.codec is not None:
+                codes_count = self._build_codes(new_count)
+
+            ann_count = 0
+            if self.partitioned:
+                self._write_rows(self.ANN_ASSIGN_FILE, self.ann.assign(vectors), self.count)
+                ann_count = new_count
+            elif self.ann is not None:
+                ann_count = self._build_ann(new_count)
+
+            self._load_rows(self._write_meta(new_count, codes_count, ann_count))
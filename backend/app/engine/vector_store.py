@@ -0,0 +1,710 @@
+"""
+MAI Vector Store
+
+Storage backends behind `RAGEngine`. Every namespace holds a shared shard
+(MAI knowledge) and one shard per tenant (private knowledge); a search
+covers the shared shard plus the caller's tenant shard.
+
+Backends (VECTOR_STORE_BACKEND):
+- memory: in-process NumPy indexes (`app.engine.vector_index`), persisted
+  and memory-mapped when KNOWLEDGE_INDEX_DIR is set. For tests and
+  single-node installs.
+- qdrant: one Qdrant collection per namespace with tenants as a payload
+  index, through a single pooled async client per process (gRPC when
+  available) and batched, concurrent upserts.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+from app.engine.ann import build_partitioner
+from app.engine.embeddings import get_embedder
+from app.engine.filters import FILTER_FIELDS
+from app.engine.quantization import build_codec
+from app.engine.vector_index import NamespaceIndex, PersistentNamespaceIndex
+
+
+Filters = Optional[Dict[str, Optional[List[str]]]]
+
+NAMESPACE_ID_RE = re.compile(r"^[a-z][a-z0-9_]{1,62}$")
+TENANT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def validate_namespace(namespace: str) -> str:
+    """A namespace id, or ValueError if it could address another shard or path"""
+    if not isinstance(namespace, str) or not NAMESPACE_ID_RE.match(namespace):
+        raise ValueError(f"Invalid namespace id: {namespace!r}")
+    return namespace
+
+
+def validate_tenant(tenant_id: Optional[str]) -> Optional[str]:
+    """A tenant id (None for shared knowledge), or ValueError"""
+    if tenant_id is not None and not TENANT_ID_RE.match(tenant_id):
+        raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+    return tenant_id
+
+
+def shard_name(namespace: str, tenant_id: Optional[str] = None) -> str:
+    """
+    Index shard holding a namespace's shared (no tenant) or tenant-private items.
+
+    Both parts are validated, so neither can carry "@", a path separator
+    or "..": the name always addresses exactly one (namespace, tenant)
+    pair and stays inside KNOWLEDGE_INDEX_DIR.
+    """
+    validate_namespace(namespace)
+    validate_tenant(tenant_id)
+    return f"{namespace}@{tenant_id}" if tenant_id else namespace
+
+
+def namespace_config(namespace: str) -> Dict[str, Any]:
+    """Index options for a namespace (KNOWLEDGE_NAMESPACE_CONFIG, "*" as default)"""
+    config = settings.KNOWLEDGE_NAMESPACE_CONFIG
+    return {**config.get("*", {}), **config.get(namespace, {})}
+
+
+class VectorStore(ABC):
+    """
+    Base class for vector store backends.
+
+    Shards are addressed by (namespace, tenant_id); tenant_id None is the
+    shared shard. Items are plain dicts with at least `id` and `content`.
+    """
+
+    name: str
+
+    def __init__(self, dimension: int, model_tag: str):
+        self.dimension = dimension
+        self.model_tag = model_tag
+        # Shared shards already seeded (or found non-empty) by RAGEngine
+        self.seeded: Set[str] = set()
+        # Bumped whenever a shard changes, so derived caches can key on it
+        self._generations: Dict[str, int] = {}
+
+    def _bump(self, shard: str) -> None:
+        self._generations[shard] = self._generations.get(shard, 0) + 1
+
+    def generation(self, namespace: str, tenant_id: Optional[str] = None) -> int:
+        """Counter that changes whenever a shard's content changes in this process"""
+        return self._generations.get(shard_name(namespace, tenant_id), 0)
+
+    @abstractmethod
+    async def namespaces(self, tenant_id: Optional[str] = None) -> List[str]:
+        """Namespaces with a shared shard or a shard of `tenant_id`"""
+        pass
+
+    @abstractmethod
+    async def open(self, namespace: str, tenant_id: Optional[str] = None, create: bool = False) -> bool:
+        """Make a shard available; returns False if it does not exist and `create` is False"""
+        pass
+
+    @abstractmethod
+    async def count(self, namespace: str, tenant_id: Optional[str] = None) -> int:
+        """Items in a shard"""
+        pass
+
+    @abstractmethod
+    async def add(
+        self,
+        namespace: str,
+        items: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        tenant_id: Optional[str] = None,
+        only_if_empty: bool = False,
+    ) -> None:
+        """Append items and their (L2-normalized) vectors to a shard, creating it if needed"""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        namespace: str,
+        query_vector: np.ndarray,
+        limit: int,
+        tenants: Sequence[Optional[str]] = (None,),
+        filters: Filters = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Top items across the given shards, best first"""
+        pass
+
+    @abstractmethod
+    async def facets(
+        self,
+        namespace: str,
+        field: str,
+        tenants: Sequence[Optional[str]] = (None,),
+    ) -> Dict[str, int]:
+        """Items per value of a filterable field across the given shards"""
+        pass
+
+    @abstractmethod
+    async def lookup(
+        self,
+        namespace: str,
+        filters: Filters,
+        tenants: Sequence[Optional[str]] = (None,),
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Items matching the filters across the given shards, without a query"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalVectorStore(VectorStore):
+    """In-process NumPy backend (memory-mapped when KNOWLEDGE_INDEX_DIR is set)"""
+
+    name = "memory"
+
+    def __init__(self, dimension: int, model_tag: str):
+        super().__init__(dimension, model_tag)
+        self._indexes: Dict[str, NamespaceIndex] = {}
+        self._write_locks: Dict[str, asyncio.Lock] = {}
+        self._last_refresh: Dict[str, float] = {}
+        # Shards found missing on disk, by time of the check
+        self._missing: Dict[str, float] = {}
+
+    async def _open_index(self, shard: str, create: bool) -> Optional[NamespaceIndex]:
+        """Open (or create) the index for a shard"""
+        config = namespace_config(shard.split("@", 1)[0])
+        codec = build_codec(config, self.dimension)
+        ann = build_partitioner(config, self.dimension)
+        rerank_candidates = config.get("rerank_candidates", 100)
+
+        if settings.KNOWLEDGE_INDEX_DIR:
+            return await asyncio.to_thread(
+                PersistentNamespaceIndex.open,
+                settings.KNOWLEDGE_INDEX_DIR,
+                shard,
+                self.dimension,
+                self.model_tag,
+                create,
+                codec,
+                rerank_candidates,
+                ann,
+            )
+        if not create:
+            return None
+        return NamespaceIndex(
+            shard,
+            self.dimension,
+            self.model_tag,
+            codec=codec,
+            rerank_candidates=rerank_candidates,
+            ann=ann,
+        )
+
+    def _maybe_refresh(self, index: NamespaceIndex) -> None:
+        """Pick up rows other workers appended to a persisted index"""
+        if not isinstance(index, PersistentNamespaceIndex):
+            return
+        now = time.monotonic()
+        if now - self._last_refresh.get(index.namespace, 0.0) >= settings.KNOWLEDGE_INDEX_REFRESH_SECONDS:
+            self._last_refresh[index.namespace] = now
+            count = index.count
+            index.refresh()
+            if index.count != count:
+                self._bump(index.namespace)
+
+    def generation(self, namespace: str, tenant_id: Optional[str] = None) -> int:
+        index = self._indexes.get(shard_name(namespace, tenant_id))
+        if index is not None:
+            self._maybe_refresh(index)
+        return super().generation(namespace, tenant_id)
+
+    async def namespaces(self, tenant_id: Optional[str] = None) -> List[str]:
+        shards = set(self._indexes)
+        root = settings.KNOWLEDGE_INDEX_DIR
+        if root and os.path.isdir(root):
+            shards.update(
+                name for name in os.listdir(root)
+                if os.path.isfile(os.path.join(root, name, PersistentNamespaceIndex.META_FILE))
+            )
+        names = set()
+        for shard in shards:
+            namespace, _, owner = shard.partition("@")
+            if not owner or owner == tenant_id:
+                names.add(namespace)
+        return sorted(names)
+
+    async def get_index(
+        self,
+        namespace: str,
+        tenant_id: Optional[str] = None,
+        create: bool = False,
+    ) -> Optional[NamespaceIndex]:
+        """The index of a shard, or None if it does not exist and `create` is False"""
+        shard = shard_name(namespace, tenant_id)
+        index = self._indexes.get(shard)
+        if index is not None:
+            self._maybe_refresh(index)
+            return index
+
+        checked_at = self._missing.get(shard)
+        if not create and checked_at is not None:
+            if time.monotonic() - checked_at < settings.KNOWLEDGE_INDEX_REFRESH_SECONDS:
+                return None
+
+        index = await self._open_index(shard, create)
+        if index is None:
+            self._missing[shard] = time.monotonic()
+            return None
+
+        self._missing.pop(shard, None)
+        # Another request may have opened the index while we were awaiting
+        return self._indexes.setdefault(shard, index)
+
+    async def open(self, namespace: str, tenant_id: Optional[str] = None, create: bool = False) -> bool:
+        return await self.get_index(namespace, tenant_id, create) is not None
+
+    async def count(self, namespace: str, tenant_id: Optional[str] = None) -> int:
+        index = await self.get_index(namespace, tenant_id)
+        return index.count if index is not None else 0
+
+    async def add(
+        self,
+        namespace: str,
+        items: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        tenant_id: Optional[str] = None,
+        only_if_empty: bool = False,
+    ) -> None:
+        shard = shard_name(namespace, tenant_id)
+        lock = self._write_locks.setdefault(shard, asyncio.Lock())
+        async with lock:
+            index = await self.get_index(namespace, tenant_id, create=True)
+            if isinstance(index, PersistentNamespaceIndex):
+                # File writes and fsync stay off the event loop
+                await asyncio.to_thread(index.append, items, vectors, only_if_empty)
+            elif any(
+                component is not None and component.should_train(index.count + len(items))
+                for component in (index.codec, index.ann)
+            ):
+                # So does codebook / centroid training
+                await asyncio.to_thread(index.append, items, vectors, only_if_empty)
+            else:
+                index.append(items, vectors, only_if_empty)
+        self._bump(shard)
+
+    async def search(
+        self,
+        namespace: str,
+        query_vector: np.ndarray,
+        limit: int,
+        tenants: Sequence[Optional[str]] = (None,),
+        filters: Filters = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        shards = [await self.get_index(namespace, tenant_id) for tenant_id in tenants]
+        hits = [
+            hit
+            for index in shards
+            if index is not None and index.count > 0
+            for hit in index.search(query_vector, limit, filters=filters)
+        ]
+        if len(shards) > 1:
+            hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:limit]
+
+    async def facets(
+        self,
+        namespace: str,
+        field: str,
+        tenants: Sequence[Optional[str]] = (None,),
+    ) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for tenant_id in tenants:
+            index = await self.get_index(namespace, tenant_id)
+            if index is None:
+                continue
+            for value, count in index.filters.counts(field).items():
+                counts[value] = counts.get(value, 0) + count
+        return counts
+
+    async def lookup(
+        self,
+        namespace: str,
+        filters: Filters,
+        tenants: Sequence[Optional[str]] = (None,),
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        for tenant_id in tenants:
+            index = await self.get_index(namespace, tenant_id)
+            if index is not None:
+                remaining = None if limit is None else limit - len(items)
+                items.extend(index.lookup(filters or {}, remaining))
+        return items
+
+
+class QdrantVectorStore(VectorStore):
+    """
+    Qdrant backend.
+
+    Each namespace maps to one collection (suffixed with the embedding
+    model, so a model change starts fresh collections) with keyword payload
+    indexes on the tenant and the filterable fields; shards are tenant
+    filters inside the collection, so a search over the shared and tenant
+    shards is a single query. Internal payload keys start with "_" and are
+    stripped from returned items.
+    """
+
+    name = "qdrant"
+    SHARED_TENANT = "_shared"
+    PQ_COMPRESSION_RATIOS = (4, 8, 16, 32, 64)
+
+    def __init__(
+        self,
+        client: Any,
+        dimension: int,
+        model_tag: str,
+        prefix: str = "mai_",
+        batch_size: int = 256,
+        concurrency: int = 4,
+    ):
+        super().__init__(dimension, model_tag)
+        self.client = client
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._collections: Set[str] = set()
+        self._collections_checked_at = 0.0
+
+    def _suffix(self) -> str:
+        return "_" + hashlib.sha1(self.model_tag.encode("utf-8")).hexdigest()[:8]
+
+    def _collection(self, namespace: str) -> str:
+        return f"{self.prefix}{validate_namespace(namespace)}{self._suffix()}"
+
+    @staticmethod
+    def _tenant_key(tenant_id: Optional[str]) -> str:
+        return validate_tenant(tenant_id) or QdrantVectorStore.SHARED_TENANT
+
+    def _point_id(self, namespace: str, tenant_id: Optional[str], item_id: str) -> str:
+        # Deterministic ids: re-ingesting an item overwrites it instead of duplicating it
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"mai:{namespace}:{self._tenant_key(tenant_id)}:{item_id}"))
+
+    def _quantization_config(self, config: Dict[str, Any]) -> Any:
+        from qdrant_client import models
+
+        quantization = config.get("quantization", "none")
+        if quantization == "int8":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=True),
+            )
+        if quantization == "pq":
+            ratio = self.dimension * 4 / config.get("pq_subvectors", 16)
+            nearest = min(self.PQ_COMPRESSION_RATIOS, key=lambda candidate: abs(candidate - ratio))
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio(f"x{nearest}"),
+                    always_ram=True,
+                ),
+            )
+        return None
+
+    async def _collection_names(self) -> Set[str]:
+        response = await self.client.get_collections()
+        self._collections_checked_at = time.monotonic()
+        return {collection.name for collection in response.collections}
+
+    async def _ensure_collection(self, namespace: str, create: bool) -> bool:
+        name = self._collection(namespace)
+        if name in self._collections:
+            return True
+        if not create and time.monotonic() - self._collections_checked_at < settings.KNOWLEDGE_INDEX_REFRESH_SECONDS:
+            return False
+
+        if name not in await self._collection_names():
+            if not create:
+                return False
+            await self._create_collection(namespace, name)
+
+        self._collections.add(name)
+        return True
+
+    async def _create_collection(self, namespace: str, name: str) -> None:
+        from qdrant_client import models
+
+        config = namespace_config(namespace)
+        logger.info(f"Creating Qdrant collection '{name}'")
+        try:
+            await self.client.create_collection(
+                collection_name=name,
+                vectors_config=models.VectorParams(
+                    size=self.dimension,
+                    distance=models.Distance.COSINE,
+                    on_disk=config.get("on_disk"),
+                ),
+                hnsw_config=models.HnswConfigDiff(m=config.get("hnsw_m", 16)),
+                quantization_config=self._quantization_config(config),
+            )
+        except Exception:
+            # Another worker may have created it first
+            if name not in await self._collection_names():
+                raise
+            return
+
+        for field in ("_tenant",) + tuple(f"_{field}" for field in FILTER_FIELDS):
+            await self.client.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=models.PayloadSchemaType.KEYWORD,
+            )
+
+    def _filter(self, tenants: Sequence[Optional[str]], filters: Filters = None) -> Any:
+        from qdrant_client import models
+
+        must = [
+            models.FieldCondition(
+                key="_tenant",
+                match=models.MatchAny(any=[self._tenant_key(tenant_id) for tenant_id in tenants]),
+            )
+        ]
+        for field, values in (filters or {}).items():
+            if not values:
+                continue
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Unsupported filter field '{field}'")
+            must.append(models.FieldCondition(
+                key=f"_{field}",
+                match=models.MatchAny(any=sorted({value.strip().casefold() for value in values})),
+            ))
+        return models.Filter(must=must)
+
+    @staticmethod
+    def _item(payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in payload.items() if not key.startswith("_")}
+
+    async def open(self, namespace: str, tenant_id: Optional[str] = None, create: bool = False) -> bool:
+        return await self._ensure_collection(namespace, create)
+
+    async def count(self, namespace: str, tenant_id: Optional[str] = None) -> int:
+        if not await self._ensure_collection(namespace, create=False):
+            return 0
+        response = await self.client.count(
+            collection_name=self._collection(namespace),
+            count_filter=self._filter([tenant_id]),
+            exact=True,
+        )
+        return response.count
+
+    async def add(
+        self,
+        namespace: str,
+        items: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        tenant_id: Optional[str] = None,
+        only_if_empty: bool = False,
+    ) -> None:
+        from qdrant_client import models
+
+        await self._ensure_collection(namespace, create=True)
+        if only_if_empty and await self.count(namespace, tenant_id) > 0:
+            return
+
+        name = self._collection(namespace)
+        points = [
+            models.PointStruct(
+                id=self._point_id(namespace, tenant_id, item["id"]),
+                vector=vector.tolist(),
+                payload={
+                    **item,
+                    "_tenant": self._tenant_key(tenant_id),
+                    **{
+                        f"_{field}": sorted({value.strip().casefold() for value in item.get(field) or []})
+                        for field in FILTER_FIELDS
+                    },
+                },
+            )
+            for item, vector in zip(items, vectors)
+        ]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def upsert(batch: List[Any]) -> None:
+            async with semaphore:
+                await self.client.upsert(collection_name=name, points=batch, wait=True)
+
+        await asyncio.gather(*(
+            upsert(points[start:start + self.batch_size])
+            for start in range(0, len(points), self.batch_size)
+        ))
+        self._bump(shard_name(namespace, tenant_id))
+
+    async def namespaces(self, tenant_id: Optional[str] = None) -> List[str]:
+        suffix = self._suffix()
+        names = []
+        for collection in sorted(await self._collection_names()):
+            if not (collection.startswith(self.prefix) and collection.endswith(suffix)):
+                continue
+            namespace = collection[len(self.prefix):-len(suffix)]
+            visible = await self.client.count(
+                collection_name=collection,
+                count_filter=self._filter([None, tenant_id] if tenant_id else [None]),
+                exact=False,
+            )
+            if visible.count > 0:
+                names.append(namespace)
+        return names
+
+    async def search(
+        self,
+        namespace: str,
+        query_vector: np.ndarray,
+        limit: int,
+        tenants: Sequence[Optional[str]] = (None,),
+        filters: Filters = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        from qdrant_client import models
+
+        if limit <= 0 or not await self._ensure_collection(namespace, create=False):
+            return []
+
+        config = namespace_config(namespace)
+        search_params = models.SearchParams(
+            hnsw_ef=config.get("hnsw_ef"),
+            quantization=models.QuantizationSearchParams(rescore=True)
+            if config.get("quantization", "none") != "none" else None,
+        )
+        points = await self.client.search(
+            collection_name=self._collection(namespace),
+            query_vector=np.asarray(query_vector, dtype=np.float32).tolist(),
+            query_filter=self._filter(tenants, filters),
+            limit=limit,
+            with_payload=True,
+            search_params=search_params,
+        )
+        return [(self._item(point.payload or {}), float(point.score)) for point in points]
+
+    async def facets(
+        self,
+        namespace: str,
+        field: str,
+        tenants: Sequence[Optional[str]] = (None,),
+    ) -> Dict[str, int]:
+        if not await self._ensure_collection(namespace, create=False):
+            return {}
+
+        counts: Dict[str, int] = {}
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=self._collection(namespace),
+                scroll_filter=self._filter(tenants),
+                limit=1024,
+                offset=offset,
+                with_payload=[field],
+                with_vectors=False,
+            )
+            for point in points:
+                for value in (point.payload or {}).get(field) or []:
+                    counts[value] = counts.get(value, 0) + 1
+            if offset is None:
+                return counts
+
+    async def lookup(
+        self,
+        namespace: str,
+        filters: Filters,
+        tenants: Sequence[Optional[str]] = (None,),
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        if not await self._ensure_collection(namespace, create=False):
+            return []
+
+        items: List[Dict[str, Any]] = []
+        offset = None
+        while limit is None or len(items) < limit:
+            page = 1024 if limit is None else min(1024, limit - len(items))
+            points, offset = await self.client.scroll(
+                collection_name=self._collection(namespace),
+                scroll_filter=self._filter(tenants, filters),
+                limit=page,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            items.extend(self._item(point.payload or {}) for point in points)
+            if offset is None:
+                break
+        return items
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def _qdrant_client() -> Any:
+    """The process-wide Qdrant client (pooled connections, gRPC when available)"""
+    from qdrant_client import AsyncQdrantClient
+
+    if settings.QDRANT_LOCATION:
+        return AsyncQdrantClient(location=settings.QDRANT_LOCATION)
+
+    prefer_grpc = settings.QDRANT_PREFER_GRPC
+    if prefer_grpc:
+        try:
+            import grpc  # noqa: F401
+        except ImportError:
+            logger.warning("grpcio not installed, using the Qdrant REST API")
+            prefer_grpc = False
+
+    return AsyncQdrantClient(
+        host=settings.QDRANT_HOST,
+        port=settings.QDRANT_PORT,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        prefer_grpc=prefer_grpc,
+        api_key=settings.QDRANT_API_KEY,
+        https=settings.QDRANT_HTTPS,
+        timeout=settings.QDRANT_TIMEOUT,
+    )
+
+
+def build_vector_store(backend: str, dimension: int, model_tag: str) -> VectorStore:
+    """Create the vector store for a backend name"""
+    if backend == "memory":
+        return LocalVectorStore(dimension, model_tag)
+    if backend == "qdrant":
+        return QdrantVectorStore(
+            _qdrant_client(),
+            dimension,
+            model_tag,
+            prefix=settings.QDRANT_COLLECTION_PREFIX,
+            batch_size=settings.QDRANT_UPSERT_BATCH_SIZE,
+            concurrency=settings.QDRANT_UPSERT_CONCURRENCY,
+        )
+    raise ValueError(f"Unknown vector store backend '{backend}'")
+
+
+_vector_store: Optional[VectorStore] = None
+
+
+def get_vector_store() -> VectorStore:
+    """Get the process-wide vector store (VECTOR_STORE_BACKEND)"""
+    global _vector_store
+
+    if _vector_store is None:
+        embedder = get_embedder()
+        _vector_store = build_vector_store(settings.VECTOR_STORE_BACKEND, embedder.dimension, embedder.model_tag)
+        logger.info(f"Vector store initialized: {_vector_store.name}")
+
+    return _vector_store
+
+
+async def close_vector_store() -> None:
+    """Release backend connections (application shutdown)"""
+    global _vector_store
+
+    if _vector_store is not None:
+        await _vector_store.close()
+        _vector_store = None
@@ -9,6 +9,7 @@ from loguru import logger
 from datetime import datetime
 
 from app.config import settings
+from app.integrations.sync import modified_since
 
 
 class GoogleAdsClient:
@@ -51,6 +52,7 @@ class GoogleAdsClient:
         start_date: str,
         end_date: str,
         status_filter: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
         """
         Fetch campaign data from Google Ads.
@@ -59,6 +61,8 @@ class GoogleAdsClient:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             status_filter: Optional status filter
+            updated_since: Only campaigns modified after this time (UTC),
+                for incremental syncs
             
         Returns:
             List of campaign data dictionaries
@@ -79,6 +83,7 @@ class GoogleAdsClient:
                 "conversions": 90,
                 "spend": 4500.00,
                 "revenue": 18000.00,
+                "updated_time": "2024-01-10T09:00:00+00:00",
             },
             {
                 "id": "ga_987654321",
@@ -89,6 +94,7 @@ class GoogleAdsClient:
                 "conversions": 72,
                 "spend": 7200.00,
                 "revenue": 14400.00,
+                "updated_time": "2024-01-12T14:30:00+00:00",
             },
             {
                 "id": "ga_456789123",
@@ -99,10 +105,12 @@ class GoogleAdsClient:
                 "conversions": 50,
                 "spend": 2500.00,
                 "revenue": 7500.00,
+                "updated_time": "2024-01-15T08:15:00+00:00",
             },
         ]
         
-        return demo_campaigns
+        # Only campaigns modified after the sync watermark
+        return modified_since(demo_campaigns, updated_since)
     
     async def fetch_ad_groups(
         self,
@@ -9,6 +9,7 @@ from loguru import logger
 from datetime import datetime
 
 from app.config import settings
+from app.integrations.sync import modified_since
 
 
 class MetaAdsClient:
@@ -51,6 +52,7 @@ class MetaAdsClient:
         start_date: str,
         end_date: str,
         status_filter: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
         """
         Fetch campaign data from Meta Ads.
@@ -59,6 +61,8 @@ class MetaAdsClient:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             status_filter: Optional status filter
+            updated_since: Only campaigns modified after this time (UTC),
+                for incremental syncs
             
         Returns:
             List of campaign data dictionaries
@@ -79,6 +83,7 @@ class MetaAdsClient:
                 "conversions": 108,
                 "spend": 5400.00,
                 "revenue": 21600.00,
+                "updated_time": "2024-01-11T10:00:00+00:00",
             },
             {
                 "id": "meta_222222222",
@@ -89,6 +94,7 @@ class MetaAdsClient:
                 "conversions": 28,
                 "spend": 3500.00,
                 "revenue": 5600.00,
+                "updated_time": "2024-01-13T16:45:00+00:00",
             },
             {
                 "id": "meta_333333333",
@@ -99,10 +105,12 @@ class MetaAdsClient:
                 "conversions": 90,
                 "spend": 1800.00,
                 "revenue": 9000.00,
+                "updated_time": "2024-01-14T11:20:00+00:00",
             },
         ]
         
-        return demo_campaigns
+        # Only campaigns modified after the sync watermark
+        return modified_since(demo_campaigns, updated_since)
     
     async def fetch_ad_sets(
         self,
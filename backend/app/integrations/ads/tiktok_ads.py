@@ -9,6 +9,7 @@ from loguru import logger
 from datetime import datetime
 
 from app.config import settings
+from app.integrations.sync import modified_since
 
 
 class TikTokAdsClient:
@@ -51,6 +52,7 @@ class TikTokAdsClient:
         start_date: str,
         end_date: str,
         status_filter: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
         """
         Fetch campaign data from TikTok Ads.
@@ -59,6 +61,8 @@ class TikTokAdsClient:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             status_filter: Optional status filter
+            updated_since: Only campaigns modified after this time (UTC),
+                for incremental syncs
             
         Returns:
             List of campaign data dictionaries
@@ -79,6 +83,7 @@ class TikTokAdsClient:
                 "conversions": 135,
                 "spend": 6750.00,
                 "revenue": 20250.00,
+                "updated_time": "2024-01-09T18:00:00+00:00",
             },
             {
                 "id": "tiktok_222222222",
@@ -89,6 +94,7 @@ class TikTokAdsClient:
                 "conversions": 64,
                 "spend": 12000.00,
                 "revenue": 12800.00,
+                "updated_time": "2024-01-12T07:30:00+00:00",
             },
             {
                 "id": "tiktok_333333333",
@@ -99,10 +105,12 @@ class TikTokAdsClient:
                 "conversions": 98,
                 "spend": 4200.00,
                 "revenue": 14700.00,
+                "updated_time": "2024-01-16T13:10:00+00:00",
             },
         ]
         
-        return demo_campaigns
+        # Only campaigns modified after the sync watermark
+        return modified_since(demo_campaigns, updated_since)
     
     async def fetch_ad_groups(
         self,
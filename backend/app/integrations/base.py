@@ -1,45 +1,321 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import json
+import random
+import time
 import httpx
 from loguru import logger
 from app.config import settings
+from app.core.http import get_http_pool
+from app.integrations.pagination import PageRequest, Pagination
+from app.integrations.ratelimit import get_rate_limiter, parse_retry_after, usage_pause
+from app.integrations.resilience import get_circuit_breaker, get_latency_tracker, hedged
+from app.integrations.response_cache import get_response_cache
+
+# Safe to resend after a transport error or a transient 5xx
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+TRANSIENT_STATUSES = {502, 503, 504}
+
 
 class BaseIntegrationClient:
     """Base client for all integrations"""
     
+    # Rate limit key; defaults to the class name without "Client", lowercased
+    provider: Optional[str] = None
+    
+    # Credential fields naming the account (one quota each); never list
+    # tokens that rotate, such as OAuth access tokens
+    account_fields: Tuple[str, ...] = ("account_id", "account_name", "client_id", "customer_id", "advertiser_id")
+    
     def __init__(self, base_url: str, credentials: Optional[Dict] = None):
         self.base_url = base_url
         self.credentials = credentials or {}
         self.headers: Dict[str, str] = {}
         
-    async def _make_request(
-        self, 
-        method: str, 
-        endpoint: str, 
-        params: Optional[Dict] = None, 
+    @property
+    def provider_name(self) -> str:
+        return self.provider or self.__class__.__name__.removesuffix("Client").lower()
+        
+    def _credential_key(self) -> str:
+        """
+        Stable, non-reversible id of the account behind this client (one quota each).
+        
+        Built from the base URL and the `account_fields` of the credentials,
+        never from headers, so a token refresh keeps the rate limiter bucket
+        and the cached responses of the account.
+        """
+        account = {field: self.credentials[field] for field in self.account_fields if self.credentials.get(field)}
+        material = json.dumps({"base_url": self.base_url, "account": account}, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()[:16]
+        
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Retry-After / usage headers when present, else exponential backoff with full jitter"""
+        if response is not None:
+            delay = parse_retry_after(response.headers.get("retry-after"))
+            if delay is None:
+                delay, _ = usage_pause(response.headers)
+            if delay is not None:
+                return min(delay, settings.INTEGRATION_MAX_RETRY_AFTER_SECONDS)
+        return random.uniform(0, settings.INTEGRATION_BACKOFF_SECONDS * (2 ** attempt))
+        
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
         data: Optional[Dict] = None,
-        headers: Optional[Dict] = None
-    ) -> Dict[str, Any]:
-        """Generic method to make HTTP requests"""
-        url = f"{self.base_url}{endpoint}"
+        headers: Optional[Dict] = None,
+        cache: bool = False
+    ) -> httpx.Response:
+        """
+        Send a request on the shared connection pool and return the raw response.
+        
+        Requests are paced by the provider's rate limiter. A 429 is retried
+        after Retry-After (the limiter pauses and shrinks its concurrency);
+        transport errors and 502/503/504 are retried for idempotent methods.
+        Each endpoint has a circuit breaker that fails fast with
+        `CircuitOpenError` while the provider is failing, and GETs are
+        hedged after the endpoint's p95 latency when hedging is enabled.
+        
+        With `cache=True` a GET goes through the response cache: a body
+        still fresh under max-age is returned without a request, otherwise
+        the request is conditional (If-None-Match / If-Modified-Since) and
+        a 304 is answered from the cached body.
+        """
+        # Absolute URLs (pagination links) are sent as they are
+        url = endpoint if endpoint.startswith(("http://", "https://")) else f"{self.base_url}{endpoint}"
+        path = httpx.URL(url).path
         req_headers = {**self.headers, **(headers or {})}
+        limiter = get_rate_limiter(self.provider_name, self._credential_key())
+        breaker = get_circuit_breaker(self.provider_name, path)
+        latency = get_latency_tracker(self.provider_name, path)
+        retry_transient = method.upper() in IDEMPOTENT_METHODS
+        hedge = settings.INTEGRATION_HEDGING_ENABLED and method.upper() == "GET"
+        max_retries = settings.INTEGRATION_MAX_RETRIES
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.request(
+        response_cache = None
+        cached = None
+        if cache and settings.INTEGRATION_CACHE_ENABLED and method.upper() == "GET":
+            response_cache = get_response_cache()
+            cache_key = response_cache.key_for(self.provider_name, self._credential_key(), url, params)
+            cached = await response_cache.lookup(cache_key)
+            if cached is not None:
+                if cached.is_fresh():
+                    return response_cache.serve_fresh(cached, httpx.Request(method, url, params=params))
+                req_headers.update(cached.conditional_headers())
+        
+        async def send_once() -> httpx.Response:
+            async with limiter.slot():
+                started = time.monotonic()
+                response = await get_http_pool().request(
                     method, 
                     url, 
                     headers=req_headers, 
                     params=params, 
                     json=data
                 )
+            if response.status_code < 500:
+                latency.add(time.monotonic() - started)
+            return response
+        
+        for attempt in range(max_retries + 1):
+            last = attempt == max_retries
+            breaker.check()
+            hedge_delay = latency.percentile(0.95) if hedge else None
+            try:
+                if hedge_delay is not None:
+                    response = await hedged(send_once, hedge_delay)
+                else:
+                    response = await send_once()
+            except httpx.TransportError as e:
+                breaker.record(False)
+                if not retry_transient or last:
+                    logger.error(f"Connection Error {self.__class__.__name__}: {str(e)}")
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Connection Error {self.__class__.__name__}: {e!r}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except asyncio.CancelledError:
+                # Abandoned (e.g. a prefetched page nobody reads): no outcome to record
+                breaker.release()
+                raise
+            except Exception:
+                breaker.record(False)
+                raise
+            
+            # A 429 is a healthy provider pushing back; the rate limiter handles it
+            breaker.record(response.status_code < 500)
+            limiter.observe(response.status_code, response.headers)
+            if response.status_code == 429:
+                delay = self._retry_delay(attempt, response)
+                # Later requests of this provider wait out the pause in limiter.slot()
+                limiter.throttle(delay)
+                if not last:
+                    logger.warning(f"{self.__class__.__name__} throttled (429), retrying in {delay:.2f}s")
+                    continue
+            if response.status_code in TRANSIENT_STATUSES and retry_transient and not last:
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"{self.__class__.__name__} returned {response.status_code}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            if response.status_code == 304 and cached is not None:
+                return await response_cache.serve_not_modified(cache_key, cached, response)
+            
+            try:
                 response.raise_for_status()
-                return response.json()
             except httpx.HTTPStatusError as e:
                 logger.error(f"API Error {self.__class__.__name__}: {e.response.status_code} - {e.response.text}")
                 raise
-            except Exception as e:
-                logger.error(f"Connection Error {self.__class__.__name__}: {str(e)}")
-                raise
+            if response_cache is not None:
+                await response_cache.store(cache_key, response)
+            return response
+        
+        raise RuntimeError("unreachable")  # pragma: no cover - the last attempt returns or raises
+
+    @asynccontextmanager
+    async def _stream(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request and expose its body as a stream (for large exports).
+        
+        Rate limiting, the circuit breaker and the 429 / transient-status
+        retries of `_send` apply until the response headers arrive; once
+        the body is being read, failures propagate to the caller. The rate
+        limiter slot is held while the body streams.
+        
+        Usage:
+            async with self._stream("GET", "/export", params=params) as response:
+                async for line in response.aiter_lines():
+                    ...
+        """
+        url = endpoint if endpoint.startswith(("http://", "https://")) else f"{self.base_url}{endpoint}"
+        req_headers = {**self.headers, **(headers or {})}
+        limiter = get_rate_limiter(self.provider_name, self._credential_key())
+        breaker = get_circuit_breaker(self.provider_name, httpx.URL(url).path)
+        retry_transient = method.upper() in IDEMPOTENT_METHODS
+        max_retries = settings.INTEGRATION_MAX_RETRIES
+        
+        started = False
+        for attempt in range(max_retries + 1):
+            last = attempt == max_retries
+            breaker.check()
+            delay = 0.0
+            recorded = False
+            async with limiter.slot():
+                try:
+                    async with get_http_pool().stream(method, url, headers=req_headers, params=params) as response:
+                        breaker.record(response.status_code < 500)
+                        recorded = True
+                        limiter.observe(response.status_code, response.headers)
+                        if not response.is_success:
+                            await response.aread()
+                        if response.status_code == 429 and not last:
+                            # Later requests of this provider wait out the pause in limiter.slot()
+                            limiter.throttle(self._retry_delay(attempt, response))
+                            logger.warning(f"{self.__class__.__name__} throttled (429), retrying")
+                            continue
+                        if response.status_code in TRANSIENT_STATUSES and retry_transient and not last:
+                            delay = self._retry_delay(attempt, response)
+                            logger.warning(
+                                f"{self.__class__.__name__} returned {response.status_code}, retrying in {delay:.2f}s"
+                            )
+                        else:
+                            if not response.is_success:
+                                logger.error(
+                                    f"API Error {self.__class__.__name__}: {response.status_code} - {response.text}"
+                                )
+                                response.raise_for_status()
+                            started = True
+                            yield response
+                            return
+                except httpx.TransportError as e:
+                    # Errors while the caller reads the body are not retried
+                    if started:
+                        raise
+                    breaker.record(False)
+                    if not retry_transient or last:
+                        logger.error(f"Connection Error {self.__class__.__name__}: {str(e)}")
+                        raise
+                    delay = self._retry_delay(attempt)
+                    logger.warning(f"Connection Error {self.__class__.__name__}: {e!r}, retrying in {delay:.2f}s")
+                except asyncio.CancelledError:
+                    if not recorded:
+                        breaker.release()
+                    raise
+                except Exception:
+                    if not recorded:
+                        breaker.record(False)
+                    raise
+            await asyncio.sleep(delay)
+        
+        raise RuntimeError("unreachable")  # pragma: no cover - the last attempt yields or raises
+
+    async def _make_request(
+        self, 
+        method: str, 
+        endpoint: str, 
+        params: Optional[Dict] = None, 
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        cache: bool = False
+    ) -> Dict[str, Any]:
+        """Generic method to make HTTP requests (`cache=True` revalidates cached GETs)"""
+        response = await self._send(method, endpoint, params=params, data=data, headers=headers, cache=cache)
+        return response.json()
+
+    async def paginate(
+        self,
+        endpoint: str,
+        pagination: Pagination,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Stream the records of a paginated GET endpoint.
+        
+        The next page is requested as soon as the current one arrives and
+        downloads while the caller processes the current records, so at
+        most two pages are held in memory.
+        
+        Args:
+            endpoint: First page endpoint
+            pagination: How the provider pages (see app.integrations.pagination)
+            params: Query params sent with every page
+            headers: Extra headers sent with every page
+        
+        Yields:
+            Records, in page order
+        """
+        def fetch(request: PageRequest) -> "asyncio.Task[httpx.Response]":
+            page_endpoint, page_params = request
+            return asyncio.ensure_future(self._send("GET", page_endpoint, params=page_params, headers=headers))
+        
+        request = pagination.first(endpoint, dict(params or {}))
+        pending: Optional["asyncio.Task[httpx.Response]"] = fetch(request)
+        try:
+            while pending is not None:
+                response = await pending
+                pending = None
+                payload = response.json()
+                items = pagination.items(payload)
+                next_request = pagination.next(request, response, payload, items)
+                if next_request is not None:
+                    request = next_request
+                    pending = fetch(request)
+                for item in items:
+                    yield item
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
 
     async def check_connection(self) -> bool:
         """Abstract method to check connection"""
@@ -1,4 +1,6 @@
+from typing import Any, Dict, List
 from app.integrations.base import BaseIntegrationClient
+from app.integrations.loader import DataLoader
 from app.config import settings
 
 class ShopifyClient(BaseIntegrationClient):
@@ -7,6 +9,16 @@ class ShopifyClient(BaseIntegrationClient):
         super().__init__(f"https://{shop_url}/admin/api/2024-01")
         self.headers = {"X-Shopify-Access-Token": settings.SHOPIFY_ACCESS_TOKEN}
         
+    async def get_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Products by ID in one call (Admin REST accepts up to 250 ids)"""
+        params = {"ids": ",".join(product_ids), "limit": len(product_ids)}
+        data = await self._make_request("GET", "/products.json", params=params)
+        return {str(product["id"]): product for product in data.get("products", [])}
+        
+    def product_loader(self) -> DataLoader[str, Dict[str, Any]]:
+        """Request-scoped batching loader dispatching through get_products"""
+        return DataLoader(self.get_products, max_batch_size=250)
+        
     async def check_connection(self) -> bool:
         return bool(settings.SHOPIFY_ACCESS_TOKEN)
 
@@ -1,9 +1,10 @@
-from typing import Optional, Dict, List, Any
-import httpx
-from loguru import logger
+from typing import Optional, Dict, List, Any, AsyncIterator
 from app.config import settings
+from app.integrations.base import BaseIntegrationClient
+from app.integrations.loader import DataLoader, fan_out
+from app.integrations.pagination import PageNumberPagination
 
-class VTEXClient:
+class VTEXClient(BaseIntegrationClient):
     """
     Client for interacting with VTEX APIs.
     References:
@@ -11,37 +12,31 @@ class VTEXClient:
     - OMS API: https://developers.vtex.com/docs/api-reference/orders-api
     """
     
-    def __init__(self):
-        self.account_name = settings.VTEX_ACCOUNT_NAME
-        self.environment = settings.VTEX_ENVIRONMENT
-        self.base_url = f"https://{self.account_name}.{self.environment}.com.br"
+    def __init__(self, credentials: Optional[Dict] = None):
+        # Priority: Tenant credentials > Env Vars
+        credentials = credentials or {}
+        self.account_name = credentials.get("account_name") or settings.VTEX_ACCOUNT_NAME
+        self.environment = credentials.get("environment") or settings.VTEX_ENVIRONMENT
+        super().__init__(f"https://{self.account_name}.{self.environment}.com.br", credentials)
         self.headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
-            "X-VTEX-API-AppKey": settings.VTEX_APP_KEY,
-            "X-VTEX-API-AppToken": settings.VTEX_APP_TOKEN
+            "X-VTEX-API-AppKey": credentials.get("app_key") or settings.VTEX_APP_KEY,
+            "X-VTEX-API-AppToken": credentials.get("app_token") or settings.VTEX_APP_TOKEN
         }
     
-    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Generic method to make HTTP requests to VTEX"""
-        url = f"{self.base_url}{endpoint}"
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.request(method, url, headers=self.headers, params=params, json=data)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"VTEX API Error: {e.response.status_code} - {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"VTEX Connection Error: {str(e)}")
-                raise
-
     async def get_product_by_id(self, product_id: str) -> Dict[str, Any]:
         """Get product details by ID"""
         # Catalog API - Get Product by ID
         endpoint = f"/api/catalog/pvt/product/{product_id}"
-        return await self._make_request("GET", endpoint)
+        # Catalog data changes rarely; revalidate instead of refetching
+        return await self._make_request("GET", endpoint, cache=True)
+
+    async def get_sku_by_id(self, sku_id: str) -> Dict[str, Any]:
+        """Get SKU details (images, dimensions, specifications) by ID"""
+        # Catalog API - Get SKU and context
+        endpoint = f"/api/catalog_system/pvt/sku/stockkeepingunitbyid/{sku_id}"
+        return await self._make_request("GET", endpoint, cache=True)
 
     async def get_order_by_id(self, order_id: str) -> Dict[str, Any]:
         """Get order details by ID"""
@@ -49,17 +44,41 @@ class VTEXClient:
         endpoint = f"/api/oms/pvt/orders/{order_id}"
         return await self._make_request("GET", endpoint)
 
-    async def list_orders(self, page: int = 1, per_page: int = 15) -> Dict[str, Any]:
-        """List orders"""
+    async def list_orders(self, page: int = 1, per_page: int = 15, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """List orders (extra params are OMS filters, e.g. f_creationDate)"""
         # OMS API - List Orders
         endpoint = "/api/oms/pvt/orders"
         params = {
             "page": page,
             "per_page": per_page,
-            "orderBy": "creationDate,desc"
+            "orderBy": "creationDate,desc",
+            **(params or {})
         }
         return await self._make_request("GET", endpoint, params=params)
 
+    # VTEX has no bulk get-by-ID for these resources, so loaders fan out the
+    # single-ID calls (which keep the catalog response cache)
+    def product_loader(self) -> DataLoader[str, Dict[str, Any]]:
+        """Request-scoped batching loader of get_product_by_id"""
+        return DataLoader(fan_out(self.get_product_by_id))
+
+    def sku_loader(self) -> DataLoader[str, Dict[str, Any]]:
+        """Request-scoped batching loader of get_sku_by_id"""
+        return DataLoader(fan_out(self.get_sku_by_id))
+
+    def order_loader(self) -> DataLoader[str, Dict[str, Any]]:
+        """Request-scoped batching loader of get_order_by_id"""
+        return DataLoader(fan_out(self.get_order_by_id))
+
+    def iter_orders(self, per_page: int = 100, params: Optional[Dict] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream order summaries of every page (OMS List Orders), newest first"""
+        pagination = PageNumberPagination(page_size=per_page, items_key="list", pages_key="paging.pages")
+        return self.paginate(
+            "/api/oms/pvt/orders",
+            pagination,
+            params={"orderBy": "creationDate,desc", **(params or {})},
+        )
+
     async def check_connection(self) -> bool:
         """Verify if credentials are valid by making a lightweight call"""
         try:
@@ -0,0 +1,143 @@
+"""
+DataLoader-style batching of per-ID integration lookups.
+
+`load(key)` calls issued within one event-loop tick are collected,
+deduplicated and dispatched together: through the provider's bulk
+endpoint when it has one (`batch_fn`), otherwise as a bounded concurrent
+fan-out of the single-ID call (`fan_out`). Results are cached on the
+loader, so a loader is meant to live for one request or job and be
+dropped with it; it is not shared between requests or workers.
+
+Usage:
+    products = client.product_loader()
+    items = await products.load_many(product_ids)   # one dispatch, N unique ids
+    again = await products.load(product_ids[0])     # served from the loader
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from app.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Bulk loader function: unique keys in, key -> value (or exception) out.
+# Keys missing from the mapping fail with KeyError.
+BatchFn = Callable[[List[K]], Awaitable[Dict[K, Union[V, BaseException]]]]
+
+
+def fan_out(load_one: Callable[[K], Awaitable[V]], concurrency: Optional[int] = None) -> BatchFn:
+    """
+    Batch function for providers without a bulk endpoint.
+
+    Runs the single-ID call for every key with at most `concurrency` in
+    flight (the provider's rate limiter still applies); one failing key
+    does not fail the others.
+    """
+    limit = concurrency or settings.INTEGRATION_LOADER_CONCURRENCY
+
+    async def batch(keys: List[K]) -> Dict[K, Union[V, BaseException]]:
+        semaphore = asyncio.Semaphore(limit)
+
+        async def one(key: K) -> Union[V, BaseException]:
+            async with semaphore:
+                return await load_one(key)
+
+        results = await asyncio.gather(*(one(key) for key in keys), return_exceptions=True)
+        return dict(zip(keys, results))
+
+    return batch
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Per-request batching and caching of keyed lookups.
+
+    Failed keys are not cached, so loading them again retries.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: Optional[int] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size or settings.INTEGRATION_LOADER_MAX_BATCH
+        self._cache: Dict[K, "asyncio.Future[V]"] = {}
+        self._queue: List[Tuple[K, "asyncio.Future[V]"]] = []
+        self._scheduled = False
+
+        self.loads = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.keys_dispatched = 0
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """Future of the value of `key`, dispatched with the other keys of this tick"""
+        self.loads += 1
+        future = self._cache.get(key)
+        if future is not None:
+            self.cache_hits += 1
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._queue.append((key, future))
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    def load_many(self, keys: Iterable[K]) -> "asyncio.Future[List[V]]":
+        """Future of the values of `keys`, in order; the first failure is raised"""
+        return asyncio.gather(*(self.load(key) for key in keys))
+
+    def prime(self, key: K, value: V) -> None:
+        """Seed the cache (e.g. with records a list call already returned)"""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """Forget one key (after a write) or everything"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queued, self._queue, self._scheduled = self._queue, [], False
+        for start in range(0, len(queued), self.max_batch_size):
+            chunk = queued[start:start + self.max_batch_size]
+            self.batches += 1
+            self.keys_dispatched += len(chunk)
+            asyncio.ensure_future(self._run_batch(chunk))
+
+    async def _run_batch(self, chunk: List[Tuple[K, "asyncio.Future[V]"]]) -> None:
+        # A key cleared and loaded again within one tick is queued twice
+        keys = list(dict.fromkeys(key for key, _ in chunk))
+        try:
+            results = await self.batch_fn(keys)
+        except Exception as e:
+            results = {key: e for key in keys}
+
+        for key, future in chunk:
+            if future.done():
+                continue
+            result = results[key] if key in results else KeyError(key)
+            if isinstance(result, BaseException):
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                future.set_exception(result)
+                # Mark the exception retrieved when nobody awaits this key anymore
+                future.add_done_callback(lambda done: done.exception())
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self.loads,
+            "cache_hits": self.cache_hits,
+            "batches": self.batches,
+            "keys_dispatched": self.keys_dispatched,
+            "cached": len(self._cache),
+        }
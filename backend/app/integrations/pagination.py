@@ -0,0 +1,159 @@
+"""
+Pagination strategies for integration APIs.
+
+`BaseIntegrationClient.paginate` streams the records of a paginated
+endpoint; a strategy describes how a provider pages: which request comes
+first, where the records are in a page, and which request (if any)
+follows. Supported styles:
+
+- `PageNumberPagination`: ?page=N&per_page=M (VTEX OMS, Nuvemshop)
+- `OffsetPagination`: ?offset=N&limit=M
+- `CursorPagination`: an opaque cursor from the payload (Meta Graph
+  `paging.cursors.after`, HubSpot `paging.next.after`)
+- `LinkHeaderPagination`: RFC 8288 `Link: <...>; rel="next"` (Shopify)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+# (endpoint or absolute URL, query params)
+PageRequest = Tuple[str, Optional[Dict[str, Any]]]
+
+
+def dig(payload: Any, path: Optional[str]) -> Any:
+    """Value at a dotted path ("paging.cursors.after"), None when missing"""
+    if not path:
+        return payload
+    value = payload
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class Pagination:
+    """
+    How a provider pages its results.
+
+    Args:
+        items_key: Dotted path of the record list in a page (None = the page is the list)
+    """
+
+    def __init__(self, items_key: Optional[str] = None):
+        self.items_key = items_key
+
+    def first(self, endpoint: str, params: Dict[str, Any]) -> PageRequest:
+        return endpoint, params
+
+    def items(self, payload: Any) -> List[Any]:
+        return dig(payload, self.items_key) or []
+
+    def next(self, request: PageRequest, response: httpx.Response, payload: Any, items: List[Any]) -> Optional[PageRequest]:
+        """Request of the following page, None after the last one"""
+        raise NotImplementedError
+
+
+class PageNumberPagination(Pagination):
+    """?page=N&per_page=M; stops at `pages_key` when the API reports it, else on a short page"""
+
+    def __init__(
+        self,
+        page_size: int = 100,
+        page_param: str = "page",
+        size_param: str = "per_page",
+        start: int = 1,
+        items_key: Optional[str] = None,
+        pages_key: Optional[str] = None,
+    ):
+        super().__init__(items_key)
+        self.page_size = page_size
+        self.page_param = page_param
+        self.size_param = size_param
+        self.start = start
+        self.pages_key = pages_key
+
+    def first(self, endpoint: str, params: Dict[str, Any]) -> PageRequest:
+        return endpoint, {**params, self.page_param: self.start, self.size_param: self.page_size}
+
+    def next(self, request: PageRequest, response: httpx.Response, payload: Any, items: List[Any]) -> Optional[PageRequest]:
+        endpoint, params = request
+        page = params[self.page_param]
+        pages = dig(payload, self.pages_key) if self.pages_key else None
+        if pages is not None:
+            if page - self.start + 1 >= int(pages):
+                return None
+        elif len(items) < self.page_size:
+            return None
+        return endpoint, {**params, self.page_param: page + 1}
+
+
+class OffsetPagination(Pagination):
+    """?offset=N&limit=M; stops at `total_key` when reported, else on a short page"""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        offset_param: str = "offset",
+        limit_param: str = "limit",
+        items_key: Optional[str] = None,
+        total_key: Optional[str] = None,
+    ):
+        super().__init__(items_key)
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.total_key = total_key
+
+    def first(self, endpoint: str, params: Dict[str, Any]) -> PageRequest:
+        return endpoint, {**params, self.offset_param: 0, self.limit_param: self.limit}
+
+    def next(self, request: PageRequest, response: httpx.Response, payload: Any, items: List[Any]) -> Optional[PageRequest]:
+        endpoint, params = request
+        offset = params[self.offset_param] + len(items)
+        total = dig(payload, self.total_key) if self.total_key else None
+        if not items or (total is not None and offset >= int(total)) or (total is None and len(items) < self.limit):
+            return None
+        return endpoint, {**params, self.offset_param: offset}
+
+
+class CursorPagination(Pagination):
+    """Opaque cursor read from `cursor_key` and sent back as `cursor_param`"""
+
+    def __init__(
+        self,
+        cursor_key: str,
+        cursor_param: str = "cursor",
+        page_size: Optional[int] = None,
+        size_param: str = "limit",
+        items_key: Optional[str] = None,
+    ):
+        super().__init__(items_key)
+        self.cursor_key = cursor_key
+        self.cursor_param = cursor_param
+        self.page_size = page_size
+        self.size_param = size_param
+
+    def first(self, endpoint: str, params: Dict[str, Any]) -> PageRequest:
+        if self.page_size is not None:
+            params = {**params, self.size_param: self.page_size}
+        return endpoint, params
+
+    def next(self, request: PageRequest, response: httpx.Response, payload: Any, items: List[Any]) -> Optional[PageRequest]:
+        endpoint, params = request
+        cursor = dig(payload, self.cursor_key)
+        if not cursor or not items:
+            return None
+        return endpoint, {**(params or {}), self.cursor_param: cursor}
+
+
+class LinkHeaderPagination(Pagination):
+    """Follows the absolute URL of the `rel="next"` Link header (it carries the query)"""
+
+    def next(self, request: PageRequest, response: httpx.Response, payload: Any, items: List[Any]) -> Optional[PageRequest]:
+        url = response.links.get("next", {}).get("url")
+        if not url or not items:
+            return None
+        return url, None
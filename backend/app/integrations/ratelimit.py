@@ -0,0 +1,258 @@
+"""
+Client-side rate limiting for integration APIs.
+
+Ad and ecommerce APIs enforce quotas per app and per account. Each
+(provider, credential) pair gets a `ProviderLimiter`:
+
+- a token bucket pacing requests to the configured rate and burst,
+- an adaptive concurrency limit (AIMD): it grows by one slot per window
+  of successful requests and halves when the provider throttles,
+- a pause honouring `Retry-After` and provider usage headers
+  (`X-RateLimit-*` / `RateLimit-*`, Meta's `X-App-Usage` and
+  `X-Business-Use-Case-Usage`), so the next request waits out the ban
+  instead of extending it.
+
+Large syncs therefore run at the quota without tripping bans. Limits are
+per worker process; size them as a share of the provider quota.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+
+from app.config import settings
+
+
+DEFAULT_RATE_LIMIT = {"rate": 10.0, "burst": 20.0, "max_concurrency": 8}
+
+# Meta usage percentage from which requests are slowed down
+USAGE_THROTTLE_PERCENT = 90.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(when.timestamp() - now, 0.0)
+
+
+def usage_pause(headers: Mapping[str, str], now: Optional[float] = None) -> Tuple[Optional[float], bool]:
+    """
+    Read provider usage headers.
+
+    Returns:
+        (seconds to pause or None, whether the quota is nearly spent)
+    """
+    now = time.time() if now is None else now
+
+    remaining = headers.get("x-ratelimit-remaining") or headers.get("ratelimit-remaining")
+    reset = headers.get("x-ratelimit-reset") or headers.get("ratelimit-reset")
+    if remaining is not None:
+        try:
+            if float(remaining) <= 0:
+                wait = float(reset) if reset is not None else None
+                # Epoch timestamps (GitHub style) vs delta seconds
+                if wait is not None and wait > 1e9:
+                    wait = wait - now
+                return (max(wait, 0.0) if wait is not None else None), True
+        except ValueError:
+            pass
+
+    # Meta Graph API: {"<id>": [{"call_count": 28, ..., "estimated_time_to_regain_access": 5}]}
+    business_usage = headers.get("x-business-use-case-usage")
+    if business_usage:
+        try:
+            entries = [entry for group in json.loads(business_usage).values() for entry in group]
+        except (ValueError, AttributeError, TypeError):
+            entries = []
+        minutes = max((entry.get("estimated_time_to_regain_access") or 0 for entry in entries), default=0)
+        if minutes:
+            return minutes * 60.0, True
+
+    # Meta app / ad account usage: percentages of the quota
+    near_limit = False
+    for name in ("x-app-usage", "x-ad-account-usage"):
+        value = headers.get(name)
+        if not value:
+            continue
+        try:
+            usage = json.loads(value)
+        except ValueError:
+            continue
+        percents = [v for v in usage.values() if isinstance(v, (int, float))]
+        if percents and max(percents) >= USAGE_THROTTLE_PERCENT:
+            near_limit = True
+
+    return None, near_limit
+
+
+class TokenBucket:
+    """Requests per second with a burst allowance, pausable until a deadline"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 = available now)"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.wait_time()
+            if wait <= 0:
+                self.tokens -= 1
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for `seconds` and restart from an empty bucket"""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = max(self.updated, self.paused_until)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit that grows additively on success and halves on throttling"""
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.limit = max(float(self.min_limit), self.limit / 2)
+
+
+class ProviderLimiter:
+    """
+    Token bucket + adaptive concurrency for one (provider, credential).
+
+    Usage:
+        limiter = get_rate_limiter("vtex", credential_key)
+        async with limiter.slot():
+            response = await send()
+        limiter.observe(response.status_code, response.headers)
+    """
+
+    def __init__(self, rate: float, burst: float, max_concurrency: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.requests = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+            self.requests += 1
+            yield
+        finally:
+            await self.concurrency.release()
+
+    def throttle(self, seconds: Optional[float] = None) -> None:
+        """The provider pushed back: shrink concurrency and optionally pause"""
+        self.throttled += 1
+        self.concurrency.on_throttle()
+        if seconds:
+            self.bucket.pause(seconds)
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adapt to a response (429 handling is left to the caller's retry loop)"""
+        if status_code == 429:
+            return
+        pause, near_limit = usage_pause(headers)
+        if pause or near_limit:
+            self.throttle(pause)
+        elif status_code < 400:
+            self.concurrency.on_success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.bucket.rate,
+            "burst": self.bucket.capacity,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "paused_for": round(max(self.bucket.paused_until - time.monotonic(), 0.0), 3),
+            "requests": self.requests,
+            "throttled": self.throttled,
+        }
+
+
+_limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+
+
+def rate_limit_config(provider: str) -> Dict[str, Any]:
+    """INTEGRATION_RATE_LIMITS entry for the provider over "*" over the defaults"""
+    config = dict(DEFAULT_RATE_LIMIT)
+    config.update(settings.INTEGRATION_RATE_LIMITS.get("*", {}))
+    config.update(settings.INTEGRATION_RATE_LIMITS.get(provider, {}))
+    return config
+
+
+def get_rate_limiter(provider: str, credential_key: str = "default") -> ProviderLimiter:
+    """Get the limiter of a provider for one credential (tenant account)"""
+    key = (provider, credential_key)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        config = rate_limit_config(provider)
+        limiter = ProviderLimiter(
+            rate=float(config["rate"]),
+            burst=float(config["burst"]),
+            max_concurrency=int(config["max_concurrency"]),
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Any]:
+    """Per-provider limiter state, credentials identified by their key only"""
+    stats: Dict[str, Any] = {}
+    for (provider, credential_key), limiter in _limiters.items():
+        stats.setdefault(provider, {})[credential_key] = limiter.stats()
+    return stats
@@ -0,0 +1,262 @@
+"""
+Circuit breakers and hedged requests for integration calls.
+
+When a provider degrades, every request to it would otherwise wait for the
+full timeout and workers pile up. A `CircuitBreaker` per provider endpoint
+tracks the failure rate over a sliding window: past the threshold it
+opens and calls fail fast with `CircuitOpenError`; after a cool-down it
+lets a few probes through (half-open) and closes again when they succeed.
+A probe that never reports back (cancelled) frees its slot, and one that
+has not reported within the cool-down is given up on.
+
+Idempotent GETs can be hedged: when the first attempt has not answered
+after the endpoint's p95 latency, a duplicate is sent and the first
+response wins, cutting tail latency at the cost of a few extra calls.
+
+State is per worker process and exposed through `resilience_stats()`.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+from app.config import settings
+
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Path segments that identify a resource rather than an endpoint
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[\w.:-]+$")
+
+
+class CircuitOpenError(Exception):
+    """The provider endpoint is failing; the call was not attempted"""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"Circuit open for {key}, retry in {retry_in:.1f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+
+def endpoint_key(provider: str, path: str) -> str:
+    """Breaker key with resource ids collapsed: /api/oms/pvt/orders/123-01 → /api/oms/pvt/orders/{id}"""
+    path = path.split("?", 1)[0]
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{provider}:{'/'.join(segments) or '/'}"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker with closed / open / half-open states.
+
+    Usage:
+        breaker = get_circuit_breaker("vtex", "/api/oms/pvt/orders")
+        breaker.check()          # raises CircuitOpenError when open
+        try:
+            response = await send()
+        except asyncio.CancelledError:
+            breaker.release()    # no outcome: free the probe slot
+            raise
+        except Exception:
+            breaker.record(False)
+            raise
+        breaker.record(response.status_code < 500)
+    """
+
+    def __init__(
+        self,
+        key: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+    ):
+        self.key = key
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._window: Deque[Tuple[float, bool]] = deque()
+        self._probes = 0
+        self._probed_at = 0.0
+        self.rejected = 0
+        self.opened = 0
+
+    def _prune(self, now: float) -> None:
+        while self._window and self._window[0][0] < now - self.window_seconds:
+            self._window.popleft()
+
+    def _open(self, now: float) -> None:
+        logger.warning(f"Circuit opened for {self.key} ({self.open_seconds:.0f}s)")
+        self.state = OPEN
+        self.opened_at = now
+        self.opened += 1
+        self._probes = 0
+
+    def check(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        now = time.monotonic()
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.open_seconds - now
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.key, retry_in)
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                retry_in = self._probed_at + self.open_seconds - now
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.key, retry_in)
+                # The probes never reported back: stop waiting for them
+                logger.warning(f"Circuit probes for {self.key} timed out, probing again")
+                self._probes = 0
+            self._probes += 1
+            self._probed_at = now
+
+    def release(self) -> None:
+        """Give back the slot of an admitted call that ended without an outcome (e.g. cancelled)"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, success: bool) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            if success:
+                self.state = CLOSED
+                self._window.clear()
+            else:
+                self._open(now)
+            return
+        if self.state == OPEN:
+            # A call admitted before the breaker opened
+            return
+
+        self._window.append((now, success))
+        self._prune(now)
+        failures = sum(1 for _, ok in self._window if not ok)
+        if len(self._window) >= self.min_calls and failures / len(self._window) >= self.failure_rate:
+            self._open(now)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._prune(now)
+        calls = len(self._window)
+        failures = sum(1 for _, ok in self._window if not ok)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in": round(max(self.opened_at + self.open_seconds - now, 0.0), 3) if self.state == OPEN else 0.0,
+        }
+
+
+class LatencyTracker:
+    """Recent latencies of one endpoint, for the hedging delay"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-quantile of the recent samples, None until enough were seen"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_hedges = {"sent": 0, "won": 0}
+
+
+async def hedged(send: Callable[[], Awaitable[T]], delay: float) -> T:
+    """
+    Run `send`; if it has not finished after `delay` seconds, run it again.
+
+    The first successful result wins and the other attempt is cancelled.
+    If both fail, the first error is raised.
+    """
+    first = asyncio.ensure_future(send())
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+
+        _hedges["sent"] += 1
+        second = asyncio.ensure_future(send())
+        tasks.append(second)
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    _hedges["won"] += int(task is second)
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def get_circuit_breaker(provider: str, path: str) -> CircuitBreaker:
+    """Get the breaker of a provider endpoint, configured from settings"""
+    key = endpoint_key(provider, path)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            key,
+            failure_rate=settings.INTEGRATION_BREAKER_FAILURE_RATE,
+            min_calls=settings.INTEGRATION_BREAKER_MIN_CALLS,
+            window_seconds=settings.INTEGRATION_BREAKER_WINDOW_SECONDS,
+            open_seconds=settings.INTEGRATION_BREAKER_OPEN_SECONDS,
+        )
+        _breakers[key] = breaker
+    return breaker
+
+
+def get_latency_tracker(provider: str, path: str) -> LatencyTracker:
+    key = endpoint_key(provider, path)
+    tracker = _latencies.get(key)
+    if tracker is None:
+        tracker = LatencyTracker()
+        _latencies[key] = tracker
+    return tracker
+
+
+def resilience_stats() -> Dict[str, Any]:
+    """Breaker state and latency percentiles per endpoint, hedging counters"""
+    endpoints = {}
+    for key, breaker in _breakers.items():
+        stats = breaker.stats()
+        tracker = _latencies.get(key)
+        if tracker is not None:
+            for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95)):
+                value = tracker.percentile(q)
+                stats[name] = round(value * 1000, 1) if value is not None else None
+        endpoints[key] = stats
+    return {"endpoints": endpoints, "hedges": dict(_hedges)}
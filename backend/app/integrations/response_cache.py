@@ -0,0 +1,268 @@
+"""
+Conditional-request cache for integration GETs.
+
+Bodies of cacheable responses are stored with their validators (ETag,
+Last-Modified) and Cache-Control max-age:
+- Memory: per-process LRU bounded by entries and body bytes
+- Disk (optional): `SQLiteStore` table that survives restarts and is
+  shared by every worker on the node (one row per response)
+
+A cached entry still fresh under max-age is served without a request;
+otherwise the request is revalidated with If-None-Match /
+If-Modified-Since and a 304 is answered from the cache. Keys include the
+provider and the credential key, so accounts never share entries.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.core.sqlite_store import SQLiteStore
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Cache-Control directives, lowercased (valueless directives map to None)"""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+class CachedResponse:
+    """A response body with the validators needed to revalidate it"""
+
+    __slots__ = ("body", "content_type", "etag", "last_modified", "max_age", "stored_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        content_type: Optional[str],
+        etag: Optional[str],
+        last_modified: Optional[str],
+        max_age: Optional[float],
+        stored_at: float,
+    ):
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+        self.stored_at = stored_at
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> Optional["CachedResponse"]:
+        """Entry for a 200 response, None when it is not cacheable"""
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        if "no-store" in directives:
+            return None
+        max_age = None
+        if "no-cache" in directives:
+            max_age = 0.0
+        elif directives.get("max-age"):
+            try:
+                max_age = float(directives["max-age"])
+            except ValueError:
+                max_age = None
+        entry = cls(
+            body=response.content,
+            content_type=response.headers.get("content-type"),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            max_age=max_age,
+            stored_at=time.time(),
+        )
+        # Without validators or a lifetime there is nothing to reuse
+        if entry.etag is None and entry.last_modified is None and not entry.max_age:
+            return None
+        return entry
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if not self.max_age:
+            return False
+        return (now or time.time()) - self.stored_at < self.max_age
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def revalidated(self, response: httpx.Response) -> None:
+        """Refresh after a 304, which may carry updated validators and max-age"""
+        self.etag = response.headers.get("etag", self.etag)
+        self.last_modified = response.headers.get("last-modified", self.last_modified)
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        if "no-cache" in directives:
+            self.max_age = 0.0
+        elif directives.get("max-age"):
+            try:
+                self.max_age = float(directives["max-age"])
+            except ValueError:
+                pass
+        self.stored_at = time.time()
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        headers = {"content-type": self.content_type} if self.content_type else {}
+        if self.etag is not None:
+            headers["etag"] = self.etag
+        if self.last_modified is not None:
+            headers["last-modified"] = self.last_modified
+        return httpx.Response(200, headers=headers, content=self.body, request=request)
+
+    def meta(self) -> str:
+        """Everything but the body, as the JSON stored next to it on disk"""
+        return json.dumps({
+            "content_type": self.content_type,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "max_age": self.max_age,
+            "stored_at": self.stored_at,
+        })
+
+    @classmethod
+    def from_row(cls, body: bytes, meta: str) -> "CachedResponse":
+        return cls(body=body, **json.loads(meta))
+
+
+class ResponseCache:
+    """
+    Integration response cache with an in-memory LRU and an optional disk tier.
+
+    Used by `BaseIntegrationClient._send(..., cache=True)`; lookups return
+    the entry to serve (when fresh) or to revalidate.
+    """
+
+    def __init__(
+        self,
+        max_memory_entries: int = 10000,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 100000,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._memory_bytes = 0
+        self.disk = SQLiteStore(disk_path, "integration_responses", max_disk_entries) if disk_path else None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.fresh_hits = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key_for(provider: str, credential_key: str, url: str, params: Optional[Dict] = None) -> str:
+        """Cache key: hash of provider, account and the full request URL"""
+        full_url = str(httpx.URL(url, params=params)) if params else url
+        payload = f"{provider}\0{credential_key}\0{full_url}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.size
+        if entry.size > self.max_memory_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_bytes += entry.size
+        while len(self._memory) > self.max_memory_entries or self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size
+
+    async def lookup(self, key: str) -> Optional[CachedResponse]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry
+
+        if self.disk is not None:
+            row = await asyncio.to_thread(self.disk.get, key)
+            if row is not None:
+                entry = CachedResponse.from_row(*row)
+                self.disk_hits += 1
+                self._remember(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    def serve_fresh(self, entry: CachedResponse, request: httpx.Request) -> httpx.Response:
+        """Answer without a request while the entry is within max-age"""
+        self.fresh_hits += 1
+        self.bytes_saved += entry.size
+        return entry.to_response(request)
+
+    async def serve_not_modified(self, key: str, entry: CachedResponse, response: httpx.Response) -> httpx.Response:
+        """Answer a 304 from the cached body"""
+        self.not_modified += 1
+        self.bytes_saved += entry.size
+        entry.revalidated(response)
+        self._remember(key, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, entry.body, entry.meta())
+        return entry.to_response(response.request)
+
+    async def store(self, key: str, response: httpx.Response) -> None:
+        entry = CachedResponse.from_response(response)
+        if entry is None:
+            return
+        self._remember(key, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, entry.body, entry.meta())
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+        self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for both tiers"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "fresh_hits": self.fresh_hits,
+            "not_modified": self.not_modified,
+            "hit_rate": round((self.fresh_hits + self.not_modified) / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_capacity_bytes": self.max_memory_bytes,
+            "disk_enabled": self.disk is not None,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide integration response cache configured in settings"""
+    global _response_cache
+
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_memory_entries=settings.INTEGRATION_CACHE_SIZE,
+            max_memory_bytes=settings.INTEGRATION_CACHE_MAX_BYTES,
+            disk_path=settings.INTEGRATION_CACHE_PATH,
+            max_disk_entries=settings.INTEGRATION_CACHE_MAX_DISK_ENTRIES,
+        )
+
+    return _response_cache
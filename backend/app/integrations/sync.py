@@ -0,0 +1,251 @@
+"""
+Incremental sync state for integrations.
+
+Each (tenant, integration, resource) keeps a `SyncWatermark`: the
+provider's last cursor, the latest modification time seen and the last
+ETag. A sync asks `plan_sync` what to fetch: only records changed since
+the watermark, or, on the first run, when the request scope changed or
+every SYNC_FULL_RECONCILE_HOURS, everything (a full reconciliation pass
+that repairs anything an incremental pass missed).
+
+A campaign's modification time only covers its settings: its metrics
+keep changing for days (late conversions) without touching it. So the
+change filter only applies to date ranges whose metrics had settled
+(SYNC_METRICS_SETTLE_DAYS) at the last sync; more recent ranges are
+re-pulled on every pass and `upsert_campaigns` writes what changed.
+
+Writes go through `upsert_campaigns`, which updates changed rows, inserts
+new ones and skips identical ones, so re-syncing unchanged data costs no
+DB writes.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.integrations import SyncWatermark
+from app.models.user import Campaign
+from app.schemas.campaign import CampaignMetrics
+
+
+# Campaign columns a sync overwrites
+CAMPAIGN_FIELDS = ("name", "status", "impressions", "clicks", "conversions", "spend", "revenue")
+
+
+def parse_modified(value: Any) -> Optional[datetime]:
+    """Provider modification timestamps (ISO 8601 strings or datetimes) as naive UTC"""
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def modified_since(
+    records: Iterable[Dict[str, Any]],
+    updated_since: Optional[datetime],
+    modified_key: str = "updated_time",
+) -> List[Dict[str, Any]]:
+    """Records modified after `updated_since` (all of them when it is None or a record has no timestamp)"""
+    if updated_since is None:
+        return list(records)
+    selected = []
+    for record in records:
+        modified = parse_modified(record.get(modified_key))
+        if modified is None or modified > updated_since:
+            selected.append(record)
+    return selected
+
+
+class SyncPlan:
+    """What a sync run fetches"""
+
+    def __init__(self, watermark: SyncWatermark, full: bool, reason: str, changed_only: bool = True):
+        self.watermark = watermark
+        self.full = full
+        self.reason = reason
+        # False when metrics of the range may have changed since the last sync
+        self.changed_only = changed_only and not full
+
+    @property
+    def updated_since(self) -> Optional[datetime]:
+        return self.watermark.last_modified_at if self.changed_only else None
+
+    @property
+    def cursor(self) -> Optional[str]:
+        return self.watermark.cursor if self.changed_only else None
+
+    @property
+    def etag(self) -> Optional[str]:
+        return None if self.full else self.watermark.etag
+
+
+async def get_watermark(db: AsyncSession, tenant_id: str, integration: str, resource: str) -> SyncWatermark:
+    """The tenant's watermark of a resource (added to the session when new)"""
+    result = await db.execute(
+        select(SyncWatermark).where(
+            SyncWatermark.tenant_id == tenant_id,
+            SyncWatermark.integration == integration,
+            SyncWatermark.resource == resource,
+        )
+    )
+    watermark = result.scalar_one_or_none()
+    if watermark is None:
+        watermark = SyncWatermark(tenant_id=tenant_id, integration=integration, resource=resource, records_synced=0)
+        db.add(watermark)
+    return watermark
+
+
+async def plan_sync(
+    db: AsyncSession,
+    tenant_id: str,
+    integration: str,
+    resource: str,
+    scope: Optional[str] = None,
+    force_full: bool = False,
+    now: Optional[datetime] = None,
+    metrics_end: Optional[date] = None,
+) -> SyncPlan:
+    """
+    Decide between an incremental pass and a full reconciliation.
+
+    Args:
+        metrics_end: Last day of the metrics the sync stores; an incremental
+            pass re-pulls every record while that day had not settled at
+            the last sync, instead of only the records modified since
+    """
+    now = now or datetime.utcnow()
+    watermark = await get_watermark(db, tenant_id, integration, resource)
+    reconcile_every = timedelta(hours=settings.SYNC_FULL_RECONCILE_HOURS)
+
+    if force_full:
+        reason = "requested"
+    elif watermark.last_sync_at is None:
+        reason = "first sync"
+    elif watermark.scope != scope:
+        reason = "scope changed"
+    elif watermark.last_full_sync_at is None or now - watermark.last_full_sync_at >= reconcile_every:
+        reason = "reconciliation due"
+    else:
+        settled_through = (watermark.last_sync_at - timedelta(days=settings.SYNC_METRICS_SETTLE_DAYS)).date()
+        if metrics_end is not None and metrics_end >= settled_through:
+            return SyncPlan(watermark, full=False, reason="metrics not settled", changed_only=False)
+        return SyncPlan(watermark, full=False, reason="incremental")
+
+    if watermark.scope != scope:
+        watermark.cursor = None
+        watermark.last_modified_at = None
+        watermark.etag = None
+        watermark.scope = scope
+    return SyncPlan(watermark, full=True, reason=reason)
+
+
+def complete_sync(
+    plan: SyncPlan,
+    records: Iterable[Dict[str, Any]],
+    modified_key: str = "updated_time",
+    cursor: Optional[str] = None,
+    etag: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> None:
+    """Advance the watermark after the fetched records were stored"""
+    now = now or datetime.utcnow()
+    watermark = plan.watermark
+    records = list(records)
+
+    modified = [parse_modified(record.get(modified_key)) for record in records]
+    latest = max((value for value in modified if value is not None), default=None)
+    if latest is not None and (watermark.last_modified_at is None or latest > watermark.last_modified_at):
+        watermark.last_modified_at = latest
+    if cursor is not None:
+        watermark.cursor = cursor
+    if etag is not None:
+        watermark.etag = etag
+
+    watermark.records_synced = len(records)
+    watermark.last_sync_at = now
+    if plan.full:
+        watermark.last_full_sync_at = now
+
+
+async def upsert_campaigns(
+    db: AsyncSession,
+    user_id: str,
+    tenant_id: str,
+    platform: str,
+    records: List[Dict[str, Any]],
+    start_date: str,
+    end_date: str,
+) -> Dict[str, int]:
+    """
+    Store fetched campaigns of one date range, writing only what changed.
+
+    Returns:
+        Counts of created, updated and unchanged campaigns
+    """
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    if not records:
+        return counts
+
+    result = await db.execute(
+        select(Campaign).where(
+            Campaign.tenant_id == tenant_id,
+            Campaign.platform == platform,
+            Campaign.start_date == start_date,
+            Campaign.end_date == end_date,
+            Campaign.external_id.in_([record["id"] for record in records]),
+        )
+    )
+    existing = {campaign.external_id: campaign for campaign in result.scalars()}
+    now = datetime.utcnow()
+
+    for record in records:
+        values = {
+            "name": record["name"],
+            "status": record["status"],
+            "impressions": record["impressions"],
+            "clicks": record["clicks"],
+            "conversions": record["conversions"],
+            "spend": record["spend"],
+            "revenue": record.get("revenue", 0),
+        }
+        campaign = existing.get(record["id"])
+        if campaign is not None and all(getattr(campaign, field) == values[field] for field in CAMPAIGN_FIELDS):
+            counts["unchanged"] += 1
+            continue
+
+        if campaign is None:
+            campaign = Campaign(
+                user_id=user_id,
+                tenant_id=tenant_id,
+                external_id=record["id"],
+                platform=platform,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            db.add(campaign)
+            counts["created"] += 1
+        else:
+            counts["updated"] += 1
+
+        for field, value in values.items():
+            setattr(campaign, field, value)
+        # Calculate derived metrics
+        metrics = CampaignMetrics.calculate_derived(
+            impressions=campaign.impressions,
+            clicks=campaign.clicks,
+            conversions=campaign.conversions,
+            spend=campaign.spend,
+            revenue=campaign.revenue,
+        )
+        campaign.ctr = metrics.ctr
+        campaign.cpc = metrics.cpc
+        campaign.cpa = metrics.cpa
+        campaign.roas = metrics.roas
+        campaign.synced_at = now
+
+    return counts
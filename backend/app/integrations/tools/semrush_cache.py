@@ -0,0 +1,513 @@
+"""
+API-unit-aware persistent cache for SEMrush reports.
+
+Every SEMrush report line costs paid API units, and the same domains and
+keywords are re-queried daily. Report results are stored in the
+database (`ProviderReportCache`), keyed by report type, database,
+target, export columns and the remaining params, and reused until their
+per-report TTL expires. The data is market data, so entries are shared
+by every tenant.
+
+Misses go through a per-tenant monthly unit budget (`UnitBudget`): the
+worst-case cost (`display_limit` lines) is reserved before the call and
+settled with the real cost afterwards. A call that would exceed the
+budget is refused with `UnitBudgetExceeded`; one that only collides with
+in-flight reservations waits for them to settle. Units spent and saved
+are recorded per tenant and month (`ProviderUnitUsage`).
+
+Usage:
+    semrush = CachedSemrushClient(SemrushClient(credentials), tenant_id)
+    keywords = await semrush.domain_organic("loja.com.br", db="br", limit=500)
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.singleflight import SingleFlight
+from app.db.session import async_session
+from app.integrations.tools.semrush import (
+    DOMAIN_ORGANIC_COLUMNS,
+    DOMAIN_RANKS_COLUMNS,
+    PHRASE_COLUMNS,
+    PHRASE_ORGANIC_COLUMNS,
+    SemrushClient,
+)
+from app.models.integrations import ProviderReportCache, ProviderUnitUsage
+
+PROVIDER = "semrush"
+
+# API units per returned line (SEMrush price list)
+REPORT_UNIT_COSTS: Dict[str, int] = {
+    "domain_ranks": 10,
+    "domain_rank": 10,
+    "domain_organic": 10,
+    "domain_adwords": 20,
+    "phrase_this": 10,
+    "phrase_all": 10,
+    "phrase_organic": 10,
+    "phrase_related": 40,
+    "phrase_fullsearch": 20,
+    "phrase_questions": 40,
+    "phrase_kdi": 50,
+}
+DEFAULT_UNIT_COST = 10
+
+# Hours a result stays valid; keyword metrics only change monthly,
+# rankings daily. SEMRUSH_CACHE_TTL_HOURS overrides per report type.
+REPORT_TTL_HOURS: Dict[str, float] = {
+    "domain_ranks": 24.0,
+    "domain_rank": 24.0,
+    "domain_organic": 24.0,
+    "domain_adwords": 24.0,
+    "phrase_organic": 24.0,
+    "phrase_this": 168.0,
+    "phrase_all": 168.0,
+    "phrase_related": 168.0,
+    "phrase_fullsearch": 168.0,
+    "phrase_questions": 168.0,
+    "phrase_kdi": 168.0,
+}
+DEFAULT_TTL_HOURS = 24.0
+
+# Params that identify the report target
+TARGET_PARAMS = ("domain", "phrase", "url")
+
+
+class UnitBudgetExceeded(Exception):
+    """A SEMrush call would take the tenant past its monthly unit budget"""
+
+    def __init__(self, tenant_id: str, needed: int, remaining: int):
+        super().__init__(f"SEMrush unit budget exceeded for tenant {tenant_id}: needs {needed}, {remaining} left")
+        self.tenant_id = tenant_id
+        self.needed = needed
+        self.remaining = remaining
+
+
+def unit_cost(report_type: str) -> int:
+    return REPORT_UNIT_COSTS.get(report_type, DEFAULT_UNIT_COST)
+
+
+def report_ttl(report_type: str) -> timedelta:
+    hours = settings.SEMRUSH_CACHE_TTL_HOURS.get(report_type, REPORT_TTL_HOURS.get(report_type, DEFAULT_TTL_HOURS))
+    return timedelta(hours=hours)
+
+
+def estimate_units(report_type: str, params: Dict[str, Any]) -> int:
+    """Worst-case cost: every requested line returned"""
+    return unit_cost(report_type) * max(int(params.get("display_limit") or 1), 1)
+
+
+def report_key(report_type: str, export_columns: str, params: Dict[str, Any]) -> str:
+    """Cache key: hash of report type, columns and every param except the API key"""
+    material = json.dumps(
+        {
+            "type": report_type,
+            "columns": export_columns,
+            "params": {name: str(value) for name, value in params.items() if name != "key"},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    return (now or datetime.utcnow()).strftime("%Y-%m")
+
+
+async def _record_usage(
+    session_factory: Callable[[], AsyncSession],
+    tenant_id: str,
+    units_spent: int = 0,
+    units_saved: int = 0,
+    calls: int = 0,
+    cache_hits: int = 0,
+) -> None:
+    """Add to the tenant's usage of the current month (atomic increments)"""
+    period = current_period()
+    values = {
+        "units_spent": ProviderUnitUsage.units_spent + units_spent,
+        "units_saved": ProviderUnitUsage.units_saved + units_saved,
+        "calls": ProviderUnitUsage.calls + calls,
+        "cache_hits": ProviderUnitUsage.cache_hits + cache_hits,
+    }
+    where = (
+        ProviderUnitUsage.tenant_id == tenant_id,
+        ProviderUnitUsage.provider == PROVIDER,
+        ProviderUnitUsage.period == period,
+    )
+    async with session_factory() as session:
+        result = await session.execute(update(ProviderUnitUsage).where(*where).values(**values))
+        if result.rowcount == 0:
+            session.add(
+                ProviderUnitUsage(
+                    tenant_id=tenant_id,
+                    provider=PROVIDER,
+                    period=period,
+                    units_spent=units_spent,
+                    units_saved=units_saved,
+                    calls=calls,
+                    cache_hits=cache_hits,
+                )
+            )
+            try:
+                await session.commit()
+                return
+            except IntegrityError:
+                # Another worker created the row first
+                await session.rollback()
+                await session.execute(update(ProviderUnitUsage).where(*where).values(**values))
+        await session.commit()
+
+
+async def get_usage(
+    tenant_id: str,
+    period: Optional[str] = None,
+    session_factory: Optional[Callable[[], AsyncSession]] = None,
+) -> Optional[ProviderUnitUsage]:
+    """The tenant's SEMrush usage of a month (default: current)"""
+    async with (session_factory or async_session)() as session:
+        result = await session.execute(
+            select(ProviderUnitUsage).where(
+                ProviderUnitUsage.tenant_id == tenant_id,
+                ProviderUnitUsage.provider == PROVIDER,
+                ProviderUnitUsage.period == (period or current_period()),
+            )
+        )
+        return result.scalar_one_or_none()
+
+
+class UnitBudget:
+    """
+    Per-tenant monthly unit accountant.
+
+    Spent units live in the database (shared by all workers); in-flight
+    reservations are per process.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self.session_factory = session_factory
+        self._reserved: Dict[str, int] = {}
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self.refused = 0
+        self.queued = 0
+
+    @staticmethod
+    def limit_for(tenant_id: str) -> Optional[int]:
+        """Monthly budget of a tenant, None for unlimited"""
+        limit = settings.SEMRUSH_TENANT_UNIT_BUDGETS.get(tenant_id, settings.SEMRUSH_MONTHLY_UNIT_BUDGET)
+        return limit or None
+
+    async def spent(self, tenant_id: str) -> int:
+        usage = await get_usage(tenant_id, session_factory=self.session_factory)
+        return usage.units_spent if usage else 0
+
+    async def reserve(self, tenant_id: str, units: int) -> None:
+        """
+        Reserve `units` before a call.
+
+        Raises:
+            UnitBudgetExceeded: The call does not fit in what is left of the
+                budget, or in-flight reservations did not settle within
+                SEMRUSH_BUDGET_WAIT_SECONDS
+        """
+        limit = self.limit_for(tenant_id)
+        if limit is None:
+            self._reserved[tenant_id] = self._reserved.get(tenant_id, 0) + units
+            return
+
+        condition = self._conditions.setdefault(tenant_id, asyncio.Condition())
+        async with condition:
+            waited = False
+            while True:
+                spent = await self.spent(tenant_id)
+                if spent + units > limit:
+                    self.refused += 1
+                    raise UnitBudgetExceeded(tenant_id, units, max(limit - spent, 0))
+                reserved = self._reserved.get(tenant_id, 0)
+                if spent + reserved + units <= limit:
+                    self._reserved[tenant_id] = reserved + units
+                    return
+                # Fits once in-flight calls settle below their worst case
+                if not waited:
+                    self.queued += 1
+                    waited = True
+                try:
+                    await asyncio.wait_for(condition.wait(), settings.SEMRUSH_BUDGET_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    self.refused += 1
+                    raise UnitBudgetExceeded(tenant_id, units, max(limit - spent - reserved, 0))
+
+    async def settle(self, tenant_id: str, reserved: int, spent: int) -> None:
+        """Release a reservation, recording the units the call really cost"""
+        try:
+            await _record_usage(self.session_factory, tenant_id, units_spent=spent, calls=1)
+        finally:
+            self._reserved[tenant_id] = max(self._reserved.get(tenant_id, 0) - reserved, 0)
+            condition = self._conditions.get(tenant_id)
+            if condition is not None:
+                async with condition:
+                    condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reserved": dict(self._reserved),
+            "queued": self.queued,
+            "refused": self.refused,
+        }
+
+
+class SemrushReportCache:
+    """
+    Process-wide SEMrush result cache (database-backed) and unit accountant.
+
+    Identical misses in flight at the same time share one call.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], AsyncSession]] = None):
+        self.session_factory = session_factory or async_session
+        self.budget = UnitBudget(self.session_factory)
+        self._flights: SingleFlight[Tuple[List[Dict[str, Any]], int]] = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+        self.units_spent = 0
+        self.units_saved = 0
+
+    async def _lookup(self, key: str, now: datetime) -> Optional[ProviderReportCache]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(ProviderReportCache).where(
+                    ProviderReportCache.provider == PROVIDER,
+                    ProviderReportCache.cache_key == key,
+                )
+            )
+            entry = result.scalar_one_or_none()
+            if entry is None or entry.expires_at <= now:
+                return None
+            entry.hits = (entry.hits or 0) + 1
+            await session.commit()
+            return entry
+
+    async def _store(
+        self,
+        key: str,
+        report_type: str,
+        export_columns: str,
+        params: Dict[str, Any],
+        rows: List[Dict[str, Any]],
+        units: int,
+    ) -> None:
+        if len(rows) > settings.SEMRUSH_CACHE_MAX_ROWS:
+            return
+        now = datetime.utcnow()
+        values = {
+            "report_type": report_type,
+            "database": params.get("database"),
+            "target": next((str(params[name]) for name in TARGET_PARAMS if params.get(name)), None),
+            "export_columns": export_columns,
+            "rows": rows,
+            "row_count": len(rows),
+            "units": units,
+            "fetched_at": now,
+            "expires_at": now + report_ttl(report_type),
+        }
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(ProviderReportCache).where(
+                    ProviderReportCache.provider == PROVIDER,
+                    ProviderReportCache.cache_key == key,
+                )
+            )
+            entry = result.scalar_one_or_none()
+            if entry is None:
+                session.add(ProviderReportCache(provider=PROVIDER, cache_key=key, hits=0, **values))
+            else:
+                for name, value in values.items():
+                    setattr(entry, name, value)
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Another worker stored the same report first
+                await session.rollback()
+
+    async def _fetch(
+        self,
+        client: SemrushClient,
+        tenant_id: str,
+        key: str,
+        report_type: str,
+        export_columns: str,
+        params: Dict[str, Any],
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        reserved = estimate_units(report_type, params)
+        await self.budget.reserve(tenant_id, reserved)
+        units = 0
+        try:
+            rows = [row async for row in client.stream_report(report_type, export_columns, params)]
+            units = unit_cost(report_type) * len(rows)
+        finally:
+            await self.budget.settle(tenant_id, reserved, units)
+        self.units_spent += units
+        await self._store(key, report_type, export_columns, params, rows, units)
+        return rows, units
+
+    async def report(
+        self,
+        client: SemrushClient,
+        tenant_id: str,
+        report_type: str,
+        export_columns: str,
+        params: Dict[str, Any],
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rows of a report, from the cache while it is fresh.
+
+        Args:
+            client: SEMrush client used on a miss
+            tenant_id: Tenant charged for the units of a miss
+            report_type: SEMrush `type`
+            export_columns: Column codes
+            params: Report params (domain / phrase, database, display_limit, ...)
+            refresh: Skip the cache lookup (the result is stored again)
+
+        Raises:
+            UnitBudgetExceeded: A miss does not fit in the tenant's budget
+        """
+        key = report_key(report_type, export_columns, params)
+        if not refresh:
+            entry = await self._lookup(key, datetime.utcnow())
+            if entry is not None:
+                self.hits += 1
+                self.units_saved += entry.units or 0
+                await _record_usage(self.session_factory, tenant_id, units_saved=entry.units or 0, cache_hits=1)
+                return [dict(row) for row in entry.rows]
+
+        started = False
+
+        async def fetch() -> Tuple[List[Dict[str, Any]], int]:
+            nonlocal started
+            started = True
+            return await self._fetch(client, tenant_id, key, report_type, export_columns, params)
+
+        rows, units = await self._flights.do(key, fetch)
+        if started:
+            self.misses += 1
+        else:
+            # Shared another caller's in-flight call
+            self.hits += 1
+            self.units_saved += units
+            await _record_usage(self.session_factory, tenant_id, units_saved=units, cache_hits=1)
+        logger.debug(f"SEMrush {report_type} {'fetched' if started else 'shared'}: {len(rows)} rows, {units} units")
+        return [dict(row) for row in rows]
+
+    async def usage(self, tenant_id: str) -> Dict[str, Any]:
+        """The tenant's units of the current month against its budget"""
+        usage = await get_usage(tenant_id, session_factory=self.session_factory)
+        spent = usage.units_spent if usage else 0
+        saved = usage.units_saved if usage else 0
+        calls = usage.calls if usage else 0
+        hits = usage.cache_hits if usage else 0
+        limit = self.budget.limit_for(tenant_id)
+        return {
+            "period": current_period(),
+            "units_spent": spent,
+            "units_saved": saved,
+            "calls": calls,
+            "cache_hits": hits,
+            "hit_rate": round(hits / (hits + calls), 4) if hits + calls else 0.0,
+            "budget": limit,
+            "remaining": max(limit - spent, 0) if limit is not None else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate and unit metrics of this worker"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "units_spent": self.units_spent,
+            "units_saved": self.units_saved,
+            "budget": self.budget.stats(),
+        }
+
+
+class CachedSemrushClient:
+    """
+    Tenant-scoped SEMrush reports through the persistent cache.
+
+    Results are lists of typed rows (see semrush_csv); use
+    `SemrushClient` directly to stream exports too large to cache.
+    """
+
+    def __init__(self, client: SemrushClient, tenant_id: str, cache: Optional[SemrushReportCache] = None):
+        self.client = client
+        self.tenant_id = tenant_id
+        self.cache = cache or get_semrush_cache()
+
+    async def report(
+        self,
+        report_type: str,
+        export_columns: str,
+        params: Dict[str, Any],
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return await self.cache.report(self.client, self.tenant_id, report_type, export_columns, params, refresh)
+
+    async def domain_overview(self, domain: str, db: str = "us") -> Dict[str, Any]:
+        rows = await self.report("domain_ranks", DOMAIN_RANKS_COLUMNS, {"domain": domain, "database": db})
+        return rows[0] if rows else {}
+
+    async def domain_organic(
+        self,
+        domain: str,
+        db: str = "us",
+        limit: int = 1000,
+        offset: int = 0,
+        export_columns: str = DOMAIN_ORGANIC_COLUMNS,
+    ) -> List[Dict[str, Any]]:
+        params = {"domain": domain, "database": db, "display_limit": limit, "display_offset": offset}
+        return await self.report("domain_organic", export_columns, params)
+
+    async def phrase_related(
+        self,
+        phrase: str,
+        db: str = "us",
+        limit: int = 1000,
+        export_columns: str = PHRASE_COLUMNS,
+    ) -> List[Dict[str, Any]]:
+        params = {"phrase": phrase, "database": db, "display_limit": limit}
+        return await self.report("phrase_related", export_columns, params)
+
+    async def phrase_organic(
+        self,
+        phrase: str,
+        db: str = "us",
+        limit: int = 100,
+        export_columns: str = PHRASE_ORGANIC_COLUMNS,
+    ) -> List[Dict[str, Any]]:
+        params = {"phrase": phrase, "database": db, "display_limit": limit}
+        return await self.report("phrase_organic", export_columns, params)
+
+
+_semrush_cache: Optional[SemrushReportCache] = None
+
+
+def get_semrush_cache() -> SemrushReportCache:
+    """Get the process-wide SEMrush report cache"""
+    global _semrush_cache
+
+    if _semrush_cache is None:
+        _semrush_cache = SemrushReportCache()
+
+    return _semrush_cache
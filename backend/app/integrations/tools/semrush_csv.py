@@ -0,0 +1,216 @@
+"""
+Incremental parser for SEMrush report exports.
+
+SEMrush answers every report as semicolon-separated text: a header row
+of human-readable column names, then one line per record, with columns
+in the order of the request's `export_columns` codes. Errors come back
+as a single `ERROR <code> :: <message>` line with a 200 status.
+
+Rows are parsed line by line as the body streams, typed per column code
+(`COLUMNS`) and keyed by snake_case field names, so a
+`domain_organic` export of any size is processed with bounded memory.
+`ColumnarReport` collects rows into compact typed arrays instead of
+per-row dicts when a whole export is needed at once.
+"""
+
+import csv
+from array import array
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemrushError(Exception):
+    """SEMrush answered `ERROR <code> :: <message>`"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"SEMrush error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+# SEMrush "ERROR 50 :: NOTHING FOUND" is an empty result, not a failure
+NOTHING_FOUND = 50
+
+
+def _int(value: str) -> Optional[int]:
+    return int(float(value)) if value else None
+
+
+def _float(value: str) -> Optional[float]:
+    return float(value) if value else None
+
+
+def _str(value: str) -> Optional[str]:
+    return value or None
+
+
+def _floats(value: str) -> List[float]:
+    return [float(part) for part in value.split(",") if part]
+
+
+def _strs(value: str) -> List[str]:
+    return [part for part in value.split(",") if part]
+
+
+# Export column code -> (field name, parser)
+COLUMNS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    # Domain reports
+    "Dn": ("domain", _str),
+    "Rk": ("rank", _int),
+    "Or": ("organic_keywords", _int),
+    "Ot": ("organic_traffic", _int),
+    "Oc": ("organic_cost", _float),
+    "Ad": ("adwords_keywords", _int),
+    "At": ("adwords_traffic", _int),
+    "Ac": ("adwords_cost", _float),
+    "Sh": ("pla_uniques", _int),
+    "Sv": ("pla_keywords", _int),
+    "Db": ("database", _str),
+    "Dt": ("date", _str),
+    # Keyword reports (domain_organic, phrase_*)
+    "Ph": ("keyword", _str),
+    "Po": ("position", _int),
+    "Pp": ("previous_position", _int),
+    "Pd": ("position_difference", _int),
+    "Nq": ("search_volume", _int),
+    "Cp": ("cpc", _float),
+    "Ur": ("url", _str),
+    "Tr": ("traffic_percent", _float),
+    "Tc": ("traffic_cost_percent", _float),
+    "Co": ("competition", _float),
+    "Nr": ("results", _int),
+    "Td": ("trends", _floats),
+    "Kd": ("keyword_difficulty", _float),
+    "Fk": ("serp_features", _strs),
+    "Fp": ("serp_feature_positions", _strs),
+    "In": ("intents", _strs),
+    "Ts": ("timestamp", _int),
+    "Rr": ("related_relevance", _float),
+}
+
+
+def split_columns(export_columns: str) -> List[str]:
+    return [code.strip() for code in export_columns.split(",") if code.strip()]
+
+
+def raise_error(line: str) -> None:
+    """Raise `SemrushError` for an ERROR line; NOTHING FOUND is a clean empty result"""
+    code_text, _, message = line[len("ERROR "):].partition("::")
+    try:
+        code = int(code_text.strip())
+    except ValueError:
+        code = -1
+    if code != NOTHING_FOUND:
+        raise SemrushError(code, message.strip())
+
+
+class RowParser:
+    """
+    Parses the lines of one report into typed row dicts.
+
+    Feed lines in order with `parse_line`; the header row, blank lines
+    and `ERROR 50 :: NOTHING FOUND` yield nothing.
+    """
+
+    def __init__(self, export_columns: str):
+        self.codes = split_columns(export_columns)
+        self.fields = [COLUMNS.get(code, (code.lower(), _str)) for code in self.codes]
+        self.header: Optional[List[str]] = None
+        self.rows = 0
+
+    def parse_line(self, line: str) -> Optional[Dict[str, Any]]:
+        line = line.strip("\r\n")
+        if not line:
+            return None
+        if self.header is None:
+            if line.startswith("ERROR "):
+                raise_error(line)
+                self.header = []
+                return None
+            self.header = next(csv.reader([line], delimiter=";"))
+            if len(self.header) != len(self.codes):
+                raise ValueError(
+                    f"SEMrush returned {len(self.header)} columns, expected {len(self.codes)} ({','.join(self.codes)})"
+                )
+            return None
+
+        if not self.header:
+            return None
+        values = next(csv.reader([line], delimiter=";"))
+        if len(values) != len(self.fields):
+            raise ValueError(f"Malformed SEMrush row {self.rows + 1}: {line[:200]!r}")
+        self.rows += 1
+        return {name: parse(value) for (name, parse), value in zip(self.fields, values)}
+
+
+async def parse_lines(lines: AsyncIterator[str], export_columns: str) -> AsyncIterator[Dict[str, Any]]:
+    """Typed rows of a streamed report body"""
+    parser = RowParser(export_columns)
+    async for line in lines:
+        row = parser.parse_line(line)
+        if row is not None:
+            yield row
+
+
+def parse_text(text: str, export_columns: str) -> List[Dict[str, Any]]:
+    """Typed rows of a report body already in memory"""
+    parser = RowParser(export_columns)
+    rows = (parser.parse_line(line) for line in text.splitlines())
+    return [row for row in rows if row is not None]
+
+
+class ColumnarReport:
+    """
+    A report held as columns: numeric fields in compact arrays (missing
+    values as NaN), everything else in lists.
+
+    Usage:
+        report = ColumnarReport("Ph,Po,Nq,Cp")
+        async for row in rows:
+            report.append(row)
+        volumes = report.array("search_volume")  # float64 numpy array
+    """
+
+    def __init__(self, export_columns: str):
+        self.fields: List[str] = []
+        self._numeric: Dict[str, array] = {}
+        self._other: Dict[str, List[Any]] = {}
+        for code in split_columns(export_columns):
+            name, parse = COLUMNS.get(code, (code.lower(), _str))
+            self.fields.append(name)
+            if parse in (_int, _float):
+                self._numeric[name] = array("d")
+            else:
+                self._other[name] = []
+        self.rows = 0
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for name, values in self._numeric.items():
+            value = row.get(name)
+            values.append(float("nan") if value is None else float(value))
+        for name, values in self._other.items():
+            values.append(row.get(name))
+        self.rows += 1
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def array(self, field: str) -> np.ndarray:
+        """Numeric column as a float64 array"""
+        return np.array(self._numeric[field], dtype=np.float64)
+
+    def column(self, field: str) -> List[Any]:
+        if field in self._numeric:
+            return self._numeric[field].tolist()
+        return self._other[field]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            field: self.array(field) if field in self._numeric else self._other[field]
+            for field in self.fields
+        }
+
+    def __len__(self) -> int:
+        return self.rows
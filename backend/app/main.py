@@ -10,6 +10,9 @@ import sys
 
 from app.config import settings
 from app.api.v1 import auth, decisions, users, campaigns, knowledge, integrations
+from app.core.http import close_http_pool, get_http_pool
+from app.engine.llm import close_llm_gateway
+from app.engine.vector_store import close_vector_store
 
 # Configure logging
 logger.remove()
@@ -28,8 +31,12 @@ async def lifespan(app: FastAPI):
     """Application lifecycle manager"""
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
+    get_http_pool()
     yield
     logger.info("Shutting down MAI API")
+    await close_vector_store()
+    await close_llm_gateway()
+    await close_http_pool()
 
 
 # Create FastAPI app
@@ -1,4 +1,5 @@
 # MAI Models Package
 from app.db.session import Base
 from app.models.user import User, APIKey, Decision, Campaign, AuditLog
-from app.models.integrations import Integration, TenantIntegration
+from app.models.integrations import Integration, TenantIntegration, SyncWatermark, ProviderReportCache, ProviderUnitUsage
+from app.models.commerce import Order, ExportCheckpoint
@@ -0,0 +1,61 @@
+from sqlalchemy import Column, String, DateTime, Float, Integer, UniqueConstraint, Index
+from sqlalchemy.sql import func
+import uuid
+from app.db.session import Base
+
+
+class Order(Base):
+    """
+    Ecommerce order imported from a platform (normalized for LTV, churn
+    and cohort analysis).
+    """
+    __tablename__ = "orders"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "platform", "external_id", name="uq_orders_tenant_platform_external"),
+        Index("ix_orders_tenant_customer_created", "tenant_id", "customer_id", "created_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String(36), nullable=False, index=True)
+
+    # Order info
+    platform = Column(String(50), nullable=False)  # vtex
+    external_id = Column(String(100), nullable=False)  # ID on the platform
+    customer_id = Column(String(100), nullable=True)  # platform profile id or email hash
+    status = Column(String(50), nullable=True)
+    sales_channel = Column(String(50), nullable=True)
+    currency = Column(String(3), nullable=True)
+
+    # Values (currency units)
+    total_value = Column(Float, default=0.0)
+    items_value = Column(Float, default=0.0)
+    discounts_value = Column(Float, default=0.0)
+    shipping_value = Column(Float, default=0.0)
+    items_count = Column(Integer, default=0)
+
+    # Timestamps (UTC)
+    created_at = Column(DateTime, nullable=False, index=True)  # order creation on the platform
+    last_change_at = Column(DateTime, nullable=True)
+    synced_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class ExportCheckpoint(Base):
+    """Progress of a bulk export, so an interrupted export resumes where it stopped"""
+    __tablename__ = "export_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "platform", "resource", name="uq_export_checkpoints_tenant_platform_resource"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String(36), nullable=False, index=True)
+    platform = Column(String(50), nullable=False)
+    resource = Column(String(50), nullable=False)  # orders
+
+    # Requested range and the end of the contiguous exported prefix
+    range_start = Column(DateTime, nullable=False)
+    range_end = Column(DateTime, nullable=False)
+    completed_through = Column(DateTime, nullable=False)
+    exported = Column(Integer, default=0)
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer, Text, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -50,3 +50,82 @@ class TenantIntegration(Base):
     
     # Relationships
     integration = relationship("Integration", back_populates="tenant_configs")
+
+
+class SyncWatermark(Base):
+    """
+    Incremental sync state of one resource of a tenant integration
+    (e.g. google_ads / campaigns): where the last sync stopped, so the
+    next one only fetches what changed.
+    """
+    __tablename__ = "sync_watermarks"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "integration", "resource", name="uq_sync_watermarks_tenant_integration_resource"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String(36), nullable=False, index=True)
+    integration = Column(String(50), nullable=False)  # Integration.key, e.g. 'meta_ads'
+    resource = Column(String(50), nullable=False)  # e.g. 'campaigns'
+    scope = Column(String(100), nullable=True)  # request scope the marks belong to, e.g. a date range
+
+    # High-water marks returned by the provider
+    cursor = Column(Text, nullable=True)
+    last_modified_at = Column(DateTime, nullable=True)
+    etag = Column(String(255), nullable=True)
+
+    last_sync_at = Column(DateTime, nullable=True)
+    last_full_sync_at = Column(DateTime, nullable=True)
+    records_synced = Column(Integer, default=0)  # fetched by the last sync
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
+
+
+class ProviderReportCache(Base):
+    """
+    Cached result of a paid provider report (e.g. a SEMrush export), shared
+    by every tenant since the data is not tenant-specific.
+    """
+    __tablename__ = "provider_report_cache"
+    __table_args__ = (
+        UniqueConstraint("provider", "cache_key", name="uq_provider_report_cache_provider_key"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    provider = Column(String(50), nullable=False)  # e.g. 'semrush'
+    cache_key = Column(String(64), nullable=False)  # hash of report, database, target, columns and params
+
+    report_type = Column(String(50), nullable=False)  # e.g. 'domain_organic'
+    database = Column(String(10), nullable=True)
+    target = Column(String(500), nullable=True)  # domain, phrase or url
+    export_columns = Column(String(255), nullable=True)
+
+    rows = Column(JSON, nullable=False, default=[])
+    row_count = Column(Integer, default=0)
+    units = Column(Integer, default=0)  # API units the fetch cost
+    hits = Column(Integer, default=0)
+
+    fetched_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ProviderUnitUsage(Base):
+    """API units a tenant spent (and saved through the cache) with a provider in one month"""
+    __tablename__ = "provider_unit_usage"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "provider", "period", name="uq_provider_unit_usage_tenant_provider_period"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String(36), nullable=False, index=True)
+    provider = Column(String(50), nullable=False)
+    period = Column(String(7), nullable=False)  # YYYY-MM (UTC)
+
+    units_spent = Column(Integer, default=0)
+    units_saved = Column(Integer, default=0)
+    calls = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
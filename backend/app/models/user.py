@@ -82,6 +82,7 @@ class Decision(Base):
     key_metrics = Column(JSON, nullable=True)
     hidden_risks = Column(JSON, nullable=True)
     strategic_principle = Column(Text, nullable=True)
+    context_packing = Column(JSON, nullable=True)  # prompt token budget and knowledge items used
     
     # Scoring
     impact_score = Column(Integer, nullable=True)
@@ -24,6 +24,7 @@ class CampaignSyncRequest(BaseModel):
     platform: AdPlatform
     start_date: str = Field(..., description="YYYY-MM-DD format")
     end_date: str = Field(..., description="YYYY-MM-DD format")
+    full_sync: bool = Field(False, description="Ignore the sync watermark and re-pull everything")
 
 
 class CampaignFilterRequest(BaseModel):
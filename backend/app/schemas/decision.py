@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from enum import Enum
 from datetime import datetime
 
@@ -113,6 +113,8 @@ class DecisionResponse(BaseModel):
     mai_decision: MAIDecision
     next_step: str
     validation_verdict: ValidationVerdict
+    # Token budget and knowledge items used for the diagnosis prompt
+    context_packing: Optional[Dict[str, Any]] = None
 
 
 class ValidationResponse(BaseModel):
@@ -0,0 +1,118 @@
+"""
+Export a tenant's VTEX order history into the local `orders` table.
+
+Lists orders by creation-date windows, fetches the details in parallel
+under the VTEX rate limit and upserts them in batches. Progress is
+checkpointed per window, so re-running the same command after an
+interruption resumes where it stopped. Prints orders per second.
+
+Usage:
+    python scripts/export_vtex_orders.py --tenant $TENANT_ID --start 2021-01-01 --end 2025-01-01
+
+    # Raise the client-side VTEX quota for the export worker
+    INTEGRATION_RATE_LIMITS='{"vtex": {"rate": 40, "burst": 80, "max_concurrency": 32}}' \\
+        python scripts/export_vtex_orders.py --tenant $TENANT_ID --start 2024-01-01 --detail-concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add backend to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def tenant_credentials(tenant_id: str):
+    """The tenant's configured VTEX credentials, None to fall back to VTEX_* settings"""
+    from sqlalchemy import select
+
+    from app.core.security_encryption import decrypt_string
+    from app.db.session import async_session
+    from app.models.integrations import Integration, TenantIntegration
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(TenantIntegration)
+            .join(Integration)
+            .where(TenantIntegration.tenant_id == tenant_id, Integration.key == "vtex")
+        )
+        config = result.scalar_one_or_none()
+    if config is None or not config.credentials_encrypted:
+        return None
+    return json.loads(decrypt_string(config.credentials_encrypted))
+
+
+async def export(args: argparse.Namespace) -> int:
+    from app.core.http import close_http_pool
+    from app.db.session import close_db, init_db
+    from app.integrations.ecommerce.vtex import VTEXClient
+    from app.integrations.ecommerce.vtex_export import VTEXOrderExporter
+
+    await init_db()
+    credentials = await tenant_credentials(args.tenant)
+    if credentials is None:
+        print("ℹ️  No VTEX integration configured for the tenant, using VTEX_* settings")
+
+    exporter = VTEXOrderExporter(
+        VTEXClient(credentials),
+        args.tenant,
+        window=timedelta(hours=args.window_hours) if args.window_hours else None,
+        window_concurrency=args.window_concurrency,
+        detail_concurrency=args.detail_concurrency,
+        batch_size=args.batch_size,
+    )
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.report_seconds)
+            stats = exporter.progress.to_dict()
+            print(
+                f"   ... {stats['orders']} orders, windows {stats['windows']}, "
+                f"{stats['orders_per_second']} orders/s, through {stats['completed_through']}"
+            )
+
+    reporter = asyncio.ensure_future(report())
+    try:
+        progress = await exporter.run(args.start, args.end, resume=not args.restart)
+    finally:
+        reporter.cancel()
+        await close_http_pool()
+        await close_db()
+
+    stats = progress.to_dict()
+    print(
+        f"📊 Exported {stats['orders']} orders ({stats['resumed_orders']} before resuming) in "
+        f"{stats['elapsed_seconds']}s — {stats['orders_per_second']} orders/s, {stats['requests']} requests"
+    )
+    if stats["failed"] or stats["failed_windows"]:
+        print(f"   ⚠️  {stats['failed']} orders and {stats['failed_windows']} windows failed; re-run to retry them")
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk export VTEX orders into the local orders table")
+    parser.add_argument("--tenant", required=True, help="Tenant owning the orders (and the VTEX integration)")
+    parser.add_argument("--start", type=datetime.fromisoformat, required=True, help="First creation date (UTC)")
+    parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        default=datetime.utcnow().replace(minute=0, second=0, microsecond=0),
+        help="Exclusive end (UTC, default: now); a re-run resumes its checkpoint even if the end moved",
+    )
+    parser.add_argument("--window-hours", type=float, default=None, help="Listing window (VTEX_EXPORT_WINDOW_HOURS)")
+    parser.add_argument("--window-concurrency", type=int, default=None)
+    parser.add_argument("--detail-concurrency", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--report-seconds", type=float, default=10.0)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and export the whole range")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(export(args)))
+
+
+if __name__ == "__main__":
+    main()
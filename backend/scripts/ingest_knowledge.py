@@ -0,0 +1,145 @@
+"""
+Ingest proprietary playbooks into a MAI knowledge namespace.
+
+Streams each file to the ingestion endpoint of a running MAI API (into the
+token owner's tenant shard) and prints per-file and overall throughput.
+With --local, files are ingested in-process straight into the persisted
+index at KNOWLEDGE_INDEX_DIR, which running workers pick up on their next
+refresh; this is how shared MAI knowledge is loaded (or a tenant's, with
+--tenant).
+
+Usage:
+    python scripts/ingest_knowledge.py growth_capital playbooks/*.md \\
+        --api-url http://localhost:8000 --token $MAI_ADMIN_TOKEN
+
+    KNOWLEDGE_INDEX_DIR=/var/lib/mai/knowledge_index \\
+        python scripts/ingest_knowledge.py growth_capital playbooks/*.md --local
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+# Add backend to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def ingest(args: argparse.Namespace) -> int:
+    url = f"{args.api_url.rstrip('/')}/api/v1/knowledge/namespaces/{args.namespace}/ingest"
+    headers = {"Authorization": f"Bearer {args.token}"}
+    params = [("metrics", metric) for metric in args.metric] + [("tags", tag) for tag in args.tag]
+
+    total_chunks = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    failures = 0
+
+    timeout = httpx.Timeout(args.timeout, connect=10.0)
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        for position, path in enumerate(args.files, start=1):
+            size = os.path.getsize(path)
+            print(f"[{position}/{len(args.files)}] {path} ({size / 1_048_576:.1f} MB)...")
+
+            with open(path, "rb") as handle:
+                response = await client.post(
+                    url,
+                    headers=headers,
+                    params=params,
+                    files={"files": (os.path.basename(path), handle)},
+                )
+
+            if response.status_code != 200:
+                failures += 1
+                print(f"   ❌ {response.status_code}: {response.text}")
+                continue
+
+            result = response.json()
+            total_chunks += result["chunks"]
+            total_bytes += size
+            print(
+                f"   ✅ {result['chunks']} chunks in {result['elapsed_seconds']}s "
+                f"({result['chunks_per_second']} chunks/s, {result['mb_per_second']} MB/s)"
+            )
+
+    elapsed = time.perf_counter() - started
+    print(f"📊 Ingested {total_chunks} chunks from {len(args.files) - failures} files in {elapsed:.1f}s")
+    if elapsed > 0:
+        print(f"   Throughput: {total_chunks / elapsed:.1f} chunks/s, {total_bytes / 1_048_576 / elapsed:.2f} MB/s")
+
+    return 1 if failures else 0
+
+
+async def ingest_local(args: argparse.Namespace) -> int:
+    from app.config import settings
+    from app.engine.ingestion import IngestionProgress, KnowledgeIngestor, iter_document_text
+    from app.engine.rag_engine import RAGEngine
+
+    if not settings.KNOWLEDGE_INDEX_DIR:
+        print("❌ --local requires KNOWLEDGE_INDEX_DIR to be set")
+        return 1
+
+    class LocalFile:
+        def __init__(self, handle):
+            self.file = handle
+
+        async def read(self, size: int = -1) -> bytes:
+            return self.file.read(size)
+
+    progress = IngestionProgress(args.namespace, tenant_id=args.tenant)
+    last_report = [0.0]
+
+    def report(current: IngestionProgress) -> None:
+        if current.elapsed - last_report[0] >= 2.0:
+            last_report[0] = current.elapsed
+            stats = current.to_dict()
+            print(
+                f"   ... {stats['documents']} files, {stats['chunks']} chunks, "
+                f"{stats['chunks_per_second']} chunks/s, {stats['mb_per_second']} MB/s"
+            )
+
+    async def documents():
+        for position, path in enumerate(args.files, start=1):
+            print(f"[{position}/{len(args.files)}] {path}")
+            with open(path, "rb") as handle:
+                yield os.path.basename(path), iter_document_text(LocalFile(handle), path, progress)
+
+    ingestor = KnowledgeIngestor(RAGEngine(), on_progress=report)
+    await ingestor.ingest(
+        args.namespace,
+        documents(),
+        metrics=args.metric or None,
+        progress=progress,
+        tenant_id=args.tenant,
+        tags=args.tag or None,
+    )
+
+    stats = progress.to_dict()
+    print(
+        f"📊 Ingested {stats['chunks']} chunks from {stats['documents']} files in "
+        f"{stats['elapsed_seconds']}s ({stats['chunks_per_second']} chunks/s, {stats['mb_per_second']} MB/s)"
+    )
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest documents into a MAI knowledge namespace")
+    parser.add_argument("namespace", help="Target namespace id (e.g. growth_capital)")
+    parser.add_argument("files", nargs="+", help="Markdown, text or PDF files")
+    parser.add_argument("--api-url", default=os.getenv("MAI_API_URL", "http://localhost:8000"))
+    parser.add_argument("--token", default=os.getenv("MAI_ADMIN_TOKEN", ""), help="Admin bearer token")
+    parser.add_argument("--metric", action="append", default=[], help="Metric to tag every chunk with")
+    parser.add_argument("--tag", action="append", default=[], help="Document tag for every chunk")
+    parser.add_argument("--tenant", default=None, help="With --local: tenant shard (default: shared knowledge)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-file timeout in seconds")
+    parser.add_argument("--local", action="store_true", help="Ingest in-process into KNOWLEDGE_INDEX_DIR")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(ingest_local(args) if args.local else ingest(args)))
+
+
+if __name__ == "__main__":
+    main()
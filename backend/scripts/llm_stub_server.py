@@ -0,0 +1,159 @@
+"""
+Local stub of an OpenAI-compatible chat-completions API.
+
+Answers POST /v1/chat/completions (plain and streaming) with canned text
+after a configurable latency, and can inject 429/503 errors, so the LLM
+gateway and the decision pipeline can be load-tested fully offline.
+
+Usage:
+    python scripts/llm_stub_server.py --port 8100 --latency-ms 800 --jitter-ms 200
+
+    LLM_ENABLED=true LLM_BASE_URL=http://localhost:8100/v1 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+DEFAULT_REPLY = (
+    "O LTV/CAC está abaixo do patamar saudável e o payback do CAC é longo. "
+    "Escalar agora aumenta a queima de caixa sem retorno comprovado. "
+    "Priorize retenção e eficiência antes de ampliar o investimento."
+)
+
+
+def _tokens(text):
+    """Rough token count (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def create_app(
+    latency_ms=500.0,
+    jitter_ms=0.0,
+    tokens_per_second=50.0,
+    error_rate=0.0,
+    reply=DEFAULT_REPLY,
+    seed=None,
+):
+    """
+    Build the stub app.
+
+    Args:
+        latency_ms: Time to first token (plain responses wait this long)
+        jitter_ms: Uniform +/- jitter added to the latency
+        tokens_per_second: Streaming pace after the first token (0 = no pacing)
+        error_rate: Fraction of requests answered with 429 or 503
+        reply: Assistant message returned for every request
+        seed: Seed for jitter and error injection
+    """
+    app = FastAPI(title="MAI LLM stub")
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    async def wait_first_token():
+        delay = latency_ms + rng.uniform(-jitter_ms, jitter_ms)
+        await asyncio.sleep(max(delay, 0.0) / 1000)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+
+        if error_rate and rng.random() < error_rate:
+            status_code = rng.choice([429, 503])
+            return JSONResponse(
+                {"error": {"message": "stub injected error", "type": "server_error"}},
+                status_code=status_code,
+                headers={"Retry-After": "0.05"} if status_code == 429 else None,
+            )
+
+        model = body.get("model", "stub")
+        prompt_tokens = sum(_tokens(message.get("content") or "") for message in body.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _tokens(reply),
+            "total_tokens": prompt_tokens + _tokens(reply),
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await wait_first_token()
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def events():
+            def chunk(delta, finish_reason=None):
+                return {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+
+            await wait_first_token()
+            yield f"data: {json.dumps(chunk({'role': 'assistant', 'content': ''}))}\n\n"
+            for word in reply.split(" "):
+                if tokens_per_second > 0:
+                    await asyncio.sleep(_tokens(word) / tokens_per_second)
+                yield f"data: {json.dumps(chunk({'content': word + ' '}), ensure_ascii=False)}\n\n"
+            yield f"data: {json.dumps(chunk({}, 'stop'))}\n\n"
+            if include_usage:
+                yield f"data: {json.dumps({'id': completion_id, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "mai"}]}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible chat-completions stub for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Streaming pace (0 = unpaced)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 429/503 responses")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    # h2c is not served by uvicorn; the gateway negotiates HTTP/1.1 against the stub
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 import pytest
 import asyncio
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Callable, Generator, List
+import httpx
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.config import settings
+from app.core import http as http_module
+from app.core.http import HTTPClientPool
 from app.db.session import Base, get_db
+from app.integrations import ratelimit, resilience, response_cache
+from app.integrations.base import BaseIntegrationClient
+from app.integrations.response_cache import ResponseCache
 from app.main import app
 from app.core.security import create_access_token
 from app.models.user import User
@@ -65,3 +72,47 @@ def normal_user_token(db) -> str:
     return create_access_token(
         data={"sub": "testuser@example.com", "id": "user_id_123", "tenant_id": "tenant_123"}
     )
+
+class ShopClient(BaseIntegrationClient):
+    """Integration client for a fake shop API (provider "shop")"""
+
+    def __init__(self, token: str = "t1", account: str = "shop-1"):
+        super().__init__("https://api.shop.test", {"account_id": account})
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+def scripted(*responses: httpx.Response) -> Callable[[httpx.Request], httpx.Response]:
+    """Handler answering with `responses` in order, then repeating the last one"""
+    queue = list(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+
+    return handler
+
+@pytest.fixture
+def serve(monkeypatch) -> Callable[[Callable], List[httpx.Request]]:
+    """
+    Fresh integration state (rate limiters, breakers, latencies, hedges and
+    a memory-only response cache) with fast retries and loose rate limits.
+    `serve(handler)` routes the shared HTTP pool to `handler` (sync or async)
+    and returns the list of requests it received.
+    """
+    monkeypatch.setattr(ratelimit, "_limiters", {})
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "_latencies", {})
+    monkeypatch.setattr(resilience, "_hedges", {"sent": 0, "won": 0})
+    monkeypatch.setattr(response_cache, "_response_cache", ResponseCache())
+    monkeypatch.setattr(settings, "INTEGRATION_RATE_LIMITS", {"*": {"rate": 1000, "burst": 1000}})
+    monkeypatch.setattr(settings, "INTEGRATION_BACKOFF_SECONDS", 0.001)
+    seen: List[httpx.Request] = []
+
+    def install(handler: Callable) -> List[httpx.Request]:
+        def record(request: httpx.Request):
+            seen.append(request)
+            return handler(request)
+
+        monkeypatch.setattr(http_module, "_http_pool", HTTPClientPool(transport=httpx.MockTransport(record)))
+        return seen
+
+    return install
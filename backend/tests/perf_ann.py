@@ -0,0 +1,96 @@
+import argparse
+import time
+import sys
+import os
+
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.engine.ann import IVFPartitioner
+from app.engine.quantization import build_codec
+from app.engine.vector_index import NamespaceIndex
+
+
+def synthetic_corpus(rows, dimension, centers=256, seed=0):
+    """Clustered unit vectors, closer to real embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    means = rng.standard_normal((centers, dimension)).astype(np.float32)
+    labels = rng.integers(0, centers, rows)
+    vectors = means[labels] + 0.5 * rng.standard_normal((rows, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def build_index(vectors, ann=None, codec=None, batch=10000):
+    index = NamespaceIndex("bench", vectors.shape[1], "bench", codec=codec, ann=ann)
+    items = [{"id": str(i)} for i in range(len(vectors))]
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), batch):
+        index.append(items[offset:offset + batch], vectors[offset:offset + batch])
+    return index, time.perf_counter() - start
+
+
+def measure(index, queries, ground_truth, k, nprobe=None):
+    latencies = []
+    found = 0
+    for query, expected in zip(queries, ground_truth):
+        start = time.perf_counter()
+        hits = index.search(query, k, nprobe)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found += len(expected & {int(item["id"]) for item, _ in hits})
+
+    latencies.sort()
+    return {
+        "recall": found / (k * len(queries)),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(0.95 * len(latencies))],
+    }
+
+
+def benchmark_ann(rows, dimension, lists, queries_count, k, quantization):
+    print(f"Benchmark: IVF vs brute force ({rows} × {dimension}, {lists} lists, k={k})...")
+
+    vectors = synthetic_corpus(rows, dimension)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(rows, queries_count, replace=False)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    flat, flat_build = build_index(vectors)
+    ground_truth = [set(np.argsort(-(vectors @ query))[:k]) for query in queries]
+    baseline = measure(flat, queries, ground_truth, k)
+
+    codec = build_codec({"quantization": quantization}, dimension)
+    ivf, ivf_build = build_index(
+        vectors,
+        ann=IVFPartitioner(dimension, lists=lists, min_train_rows=min(rows, 30 * lists)),
+        codec=codec,
+    )
+
+    print(f"📊 Results ({quantization} codes):")
+    print(f"   Build: flat {flat_build:.2f}s, ivf {ivf_build:.2f}s")
+    print(f"   {'index':<16}{'recall@' + str(k):>10}{'p50 ms':>10}{'p95 ms':>10}{'speedup':>10}")
+    print(f"   {'brute force':<16}{baseline['recall']:>10.3f}{baseline['p50']:>10.2f}{baseline['p95']:>10.2f}{1.0:>10.1f}")
+
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        if nprobe > lists:
+            break
+        result = measure(ivf, queries, ground_truth, k, nprobe)
+        speedup = baseline["p50"] / result["p50"] if result["p50"] > 0 else 0.0
+        label = f"ivf nprobe={nprobe}"
+        print(f"   {label:<16}{result['recall']:>10.3f}{result['p50']:>10.2f}{result['p95']:>10.2f}{speedup:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IVF recall/latency benchmark against brute force")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--lists", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--quantization", default="none", choices=["none", "int8", "pq"])
+    args = parser.parse_args()
+
+    benchmark_ann(args.rows, args.dimension, args.lists, args.queries, args.k, args.quantization)
@@ -0,0 +1,300 @@
+"""
+Retrieval quality and latency benchmark for RAGEngine.
+
+Generates a synthetic corpus spread over the built-in namespaces and a
+labeled query set (every query targets one chunk), then runs
+`RAGEngine.search` and `RAGEngine.retrieve_multi_namespace` under each
+index type and reports recall@k, MRR, p50/p95/p99 latency, build time
+and resident memory as JSON.
+
+Runs fully offline: embeddings come from the hashing embedder and the
+corpus is embedded once into a memory-mapped scratch file shared by all
+index types.
+
+    python tests/perf_retrieval.py --rows 100000 --queries 500 --output retrieval.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+from loguru import logger
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+
+# Never reach for a remote embedding provider
+settings.EMBEDDING_PROVIDER = "hashing"
+
+from app.engine.rag_engine import RAGEngine
+from app.engine.vector_store import LocalVectorStore
+
+NAMESPACES = sorted(RAGEngine.KNOWLEDGE_BASE)
+
+FILLER = (
+    "empresa cliente mercado receita custo canal campanha produto time meta "
+    "trimestre resultado análise dados crescimento risco caixa venda margem"
+).split()
+
+SYLLABLES = [c + v for c in "bcdfgklmnprstvz" for v in "aeiou"]
+
+CHUNK_WORDS = 12
+FILLER_WORDS = 4
+QUERY_WORDS = 4
+# Index of the code word inside a chunk's content
+CODE_POSITION = CHUNK_WORDS // 2
+
+
+def index_types(rows_per_namespace):
+    """Index configurations to compare (KNOWLEDGE_NAMESPACE_CONFIG entries)"""
+    lists = int(min(1024, max(16, 4 * np.sqrt(rows_per_namespace))))
+    ivf = {"index": "ivf", "ivf_lists": lists, "ivf_min_train_rows": min(rows_per_namespace, 30 * lists)}
+    return {
+        "flat": {},
+        "int8": {"quantization": "int8"},
+        "pq": {"quantization": "pq", "pq_min_train_rows": min(rows_per_namespace, 1024)},
+        "ivf": ivf,
+        "ivf_int8": {**ivf, "quantization": "int8"},
+    }
+
+
+def vocabulary(namespace):
+    """Topic words of a namespace, taken from its seed knowledge"""
+    words = set()
+    for item in RAGEngine.KNOWLEDGE_BASE[namespace]:
+        text = " ".join([item["content"], *item.get("metrics", [])])
+        words.update(word for word in re.findall(r"\w+", text.lower()) if len(word) > 3 and not word.isdigit())
+    return sorted(words)
+
+
+def code_word(number):
+    """Pronounceable token unique to one chunk, so queries have one right answer"""
+    syllables = []
+    # Four syllables at least: 75^4 codes cover 10M+ chunks, and long codes
+    # contribute enough character trigrams to stand out from topic words
+    while number or len(syllables) < 4:
+        number, digit = divmod(number, len(SYLLABLES))
+        syllables.append(SYLLABLES[digit])
+    return "".join(syllables)
+
+
+class SyntheticCorpus:
+    """Deterministic chunks: chunk `i` of a namespace is rebuilt on demand, never stored"""
+
+    def __init__(self, rows, seed=0):
+        self.rows_per_namespace = max(1, rows // len(NAMESPACES))
+        self.rows = self.rows_per_namespace * len(NAMESPACES)
+        self.seed = seed
+        self.vocabularies = {namespace: vocabulary(namespace) for namespace in NAMESPACES}
+
+    def _words(self, namespace_index, row):
+        rng = random.Random(self.seed * 1_000_003 + namespace_index * 100_000_007 + row)
+        topic = rng.sample(self.vocabularies[NAMESPACES[namespace_index]], CHUNK_WORDS)
+        filler = rng.sample(FILLER, FILLER_WORDS)
+        return topic, filler
+
+    def chunk(self, namespace_index, row):
+        topic, filler = self._words(namespace_index, row)
+        code = code_word(namespace_index * self.rows_per_namespace + row)
+        namespace = NAMESPACES[namespace_index]
+        return {
+            "id": f"{namespace}_{row}",
+            "content": " ".join(topic[:CODE_POSITION] + [code] + filler + topic[CODE_POSITION:]),
+            "metrics": [],
+        }
+
+    def batch(self, namespace_index, start, stop):
+        return [self.chunk(namespace_index, row) for row in range(start, stop)]
+
+    def queries(self, count, seed=1):
+        """(namespace, expected item id, query text) triples"""
+        rng = random.Random(seed)
+        labeled = []
+        for _ in range(count):
+            namespace_index = rng.randrange(len(NAMESPACES))
+            row = rng.randrange(self.rows_per_namespace)
+            item = self.chunk(namespace_index, row)
+            # A short span around the chunk's code word, like a remembered phrase
+            words = item["content"].split()
+            start = rng.randrange(CODE_POSITION - QUERY_WORDS + 1, CODE_POSITION + 1)
+            labeled.append((NAMESPACES[namespace_index], item["id"], " ".join(words[start:start + QUERY_WORDS])))
+        return labeled
+
+
+def resident_bytes():
+    """Current RSS (falls back to peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm", "r") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def quality(ranks, k):
+    """recall@k and MRR from the 1-based rank of the expected item (None = missed)"""
+    return {
+        f"recall@{k}": round(sum(1 for rank in ranks if rank is not None and rank <= k) / len(ranks), 4),
+        "mrr": round(sum(1.0 / rank for rank in ranks if rank is not None) / len(ranks), 4),
+    }
+
+
+def rank_of(hits, expected):
+    for position, hit in enumerate(hits, start=1):
+        if hit.id == expected:
+            return position
+    return None
+
+
+async def embed_corpus(corpus, embedder, path, batch):
+    """Embed every chunk once into a float32 memmap laid out namespace by namespace"""
+    vectors = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=(corpus.rows, embedder.dimension)
+    )
+    start = time.perf_counter()
+    for namespace_index in range(len(NAMESPACES)):
+        base = namespace_index * corpus.rows_per_namespace
+        for offset in range(0, corpus.rows_per_namespace, batch):
+            stop = min(offset + batch, corpus.rows_per_namespace)
+            items = corpus.batch(namespace_index, offset, stop)
+            vectors[base + offset:base + stop] = await embedder.embed([item["content"] for item in items])
+    vectors.flush()
+    return vectors, time.perf_counter() - start
+
+
+async def run_index_type(name, config, corpus, vectors, queries, k, batch, index_dir):
+    settings.KNOWLEDGE_NAMESPACE_CONFIG = {"*": config}
+    settings.KNOWLEDGE_INDEX_DIR = os.path.join(index_dir, name) if index_dir else None
+
+    gc.collect()
+    rss_before = resident_bytes()
+    embedder = RAGEngine().embedder
+    store = LocalVectorStore(embedder.dimension, embedder.model_tag)
+    engine = RAGEngine(store=store)
+
+    start = time.perf_counter()
+    for namespace_index, namespace in enumerate(NAMESPACES):
+        base = namespace_index * corpus.rows_per_namespace
+        for offset in range(0, corpus.rows_per_namespace, batch):
+            stop = min(offset + batch, corpus.rows_per_namespace)
+            await store.add(
+                namespace,
+                corpus.batch(namespace_index, offset, stop),
+                np.asarray(vectors[base + offset:base + stop]),
+            )
+    build_seconds = time.perf_counter() - start
+    rss_after = resident_bytes()
+
+    search_latencies, search_ranks = [], []
+    multi_latencies, multi_ranks = [], []
+    for namespace, expected, text in queries:
+        start = time.perf_counter()
+        hits = await engine.search(namespace, text, limit=k)
+        search_latencies.append((time.perf_counter() - start) * 1000)
+        search_ranks.append(rank_of(hits, expected))
+
+        start = time.perf_counter()
+        hits = await engine.retrieve_multi_namespace(text, NAMESPACES, limit_per_namespace=k)
+        multi_latencies.append((time.perf_counter() - start) * 1000)
+        multi_ranks.append(rank_of(sorted(hits, key=lambda hit: hit.score, reverse=True), expected))
+
+    profile = (await store.get_index(NAMESPACES[0])).memory_profile()
+    result = {
+        "config": config,
+        "build_seconds": round(build_seconds, 3),
+        "build_rows_per_second": round(corpus.rows / build_seconds, 1) if build_seconds > 0 else None,
+        "resident_mb": round(rss_after / 2**20, 1),
+        "resident_delta_mb": round((rss_after - rss_before) / 2**20, 1),
+        "index": profile,
+        "search": {**quality(search_ranks, k), **percentiles(search_latencies)},
+        "retrieve_multi_namespace": {**quality(multi_ranks, k), **percentiles(multi_latencies)},
+    }
+
+    await store.close()
+    del engine, store
+    return result
+
+
+async def benchmark_retrieval(rows, queries_count, k, types, batch, index_dir, seed):
+    corpus = SyntheticCorpus(rows, seed=seed)
+    queries = corpus.queries(queries_count, seed=seed + 1)
+    embedding_cache = RAGEngine().embedding_cache
+    configs = index_types(corpus.rows_per_namespace)
+
+    with tempfile.TemporaryDirectory(prefix="mai_perf_") as scratch:
+        print(f"Embedding {corpus.rows} chunks ({len(NAMESPACES)} namespaces)...", file=sys.stderr)
+        vectors, embed_seconds = await embed_corpus(
+            corpus, embedding_cache.embedder, os.path.join(scratch, "vectors.npy"), batch
+        )
+
+        # Latencies below measure retrieval only: query embeddings are warm
+        for _, _, text in queries:
+            await embedding_cache.embed_query(text)
+
+        results = {}
+        for name in types:
+            print(f"Index type {name}...", file=sys.stderr)
+            results[name] = await run_index_type(
+                name, configs[name], corpus, vectors, queries, k, batch, index_dir or None
+            )
+        del vectors
+
+    return {
+        "corpus": {
+            "rows": corpus.rows,
+            "namespaces": NAMESPACES,
+            "rows_per_namespace": corpus.rows_per_namespace,
+            "dimension": embedding_cache.embedder.dimension,
+            "embedder": embedding_cache.embedder.model_tag,
+            "embed_seconds": round(embed_seconds, 3),
+        },
+        "queries": queries_count,
+        "k": k,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RAGEngine recall/latency benchmark across index types")
+    parser.add_argument("--rows", type=int, default=10000, help="Total chunks (10k to 10M)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=list(index_types(1)), choices=list(index_types(1)))
+    parser.add_argument("--batch", type=int, default=10000, help="Rows per add() call")
+    parser.add_argument("--index-dir", default=None, help="Benchmark memory-mapped indexes under this directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    if args.index_dir:
+        os.makedirs(args.index_dir, exist_ok=True)
+
+    report = asyncio.run(benchmark_retrieval(
+        args.rows, args.queries, args.k, args.types, args.batch, args.index_dir, args.seed
+    ))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
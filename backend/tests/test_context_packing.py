@@ -0,0 +1,99 @@
+"""
+Tests for token-budgeted context packing.
+"""
+
+import pytest
+
+from app.engine.context_packing import ContextPacker, estimate_tokens
+from app.engine.orchestrator import DecisionOrchestrator
+from app.engine.rag_engine import KnowledgeHit
+
+
+def _hit(item_id, content, score, namespace="growth_capital"):
+    return KnowledgeHit(namespace, {"id": item_id, "content": content}, score)
+
+
+CONTEXT = {"company_stage": "traction", "decision_type": "growth", "cac": 500.0, "ltv": 1000.0, "churn_rate": None}
+
+
+class TestContextPacker:
+    """Tests for ContextPacker"""
+
+    def test_token_estimate(self):
+        """About one token per four characters of a word, one per punctuation mark"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("CAC") == 1
+        assert estimate_tokens("investimento") == 3
+        assert estimate_tokens("LTV/CAC > 3") == 5
+
+    def test_duplicates_are_dropped(self):
+        """Identical and heavily overlapping chunks are packed once"""
+        text = "CAC Payback ideal depende do estágio da empresa e da margem bruta do produto"
+        hits = [
+            _hit("a", text, 0.9),
+            _hit("b", text.upper(), 0.8, namespace="unit_economics"),
+            _hit("c", text + " recorrente", 0.7),
+            _hit("d", "Churn por receita importa mais que churn por cliente", 0.5),
+        ]
+
+        packed = ContextPacker(default_budget=1000).pack(CONTEXT, hits)
+
+        assert [hit.id for hit in packed.items] == ["a", "d"]
+        assert packed.duplicates == 2
+
+    def test_budget_is_respected_per_decision_type(self):
+        """Items are added while they fit the decision type's budget"""
+        hits = [_hit(str(i), f"tema {i} " + " ".join(f"palavra{i}x{j}" for j in range(20)), 1 - i / 100) for i in range(10)]
+        packer = ContextPacker(default_budget=200, budgets={"market": 2000})
+
+        small = packer.pack(CONTEXT, hits, "growth")
+        large = packer.pack(CONTEXT, hits, "market")
+
+        assert small.tokens <= 200
+        assert 0 < len(small.items) < len(large.items) == 10
+        assert small.over_budget == 10 - len(small.items)
+        assert small.to_dict()["items"][0] == {"namespace": "growth_capital", "id": "0", "score": 1.0, "tokens": small.item_tokens[0]}
+
+    def test_diversity_promotes_new_information(self):
+        """A slightly less relevant but different item beats a near-repeat"""
+        hits = [
+            _hit("a", "escalar aquisição eleva CAC marginal em canais pagos saturados", 0.90),
+            _hit("b", "escalar aquisição eleva CAC marginal em canais pagos", 0.89),
+            _hit("c", "retenção por coorte valida produto antes da escala", 0.85),
+        ]
+
+        packed = ContextPacker(default_budget=1000, diversity=0.5, duplicate_threshold=1.1).pack(CONTEXT, hits)
+
+        assert [hit.id for hit in packed.items] == ["a", "c", "b"]
+
+    def test_additional_data_is_trimmed_to_fit(self):
+        """Set context fields are kept; extra data only up to half the budget"""
+        context = {**CONTEXT, "additional_data": {f"campo_{i}": "valor " * 20 for i in range(20)}}
+
+        packed = ContextPacker(default_budget=300).pack(context, [])
+
+        assert "churn_rate" not in packed.facts
+        assert packed.facts["cac"] == 500.0
+        assert 0 < len(packed.facts["additional_data"]) < 20
+        assert packed.facts_tokens <= 150
+
+
+class TestDecisionPacking:
+    """Packing as part of the decision pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_evaluate_records_packing(self):
+        """The response carries the budget and the chosen knowledge items"""
+        orchestrator = DecisionOrchestrator()
+
+        result = await orchestrator.evaluate(
+            question="Devemos escalar investimento em tráfego pago?",
+            context={**CONTEXT, "churn_rate": 0.02},
+            user_id="user",
+            tenant_id="tenant",
+        )
+
+        packing = result.context_packing
+        assert packing["budget"] == orchestrator.context_packer.budget_for("growth")
+        assert packing["tokens"] <= packing["budget"]
+        assert packing["items"] and all(item["namespace"] and item["id"] for item in packing["items"])
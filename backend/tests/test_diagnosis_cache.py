@@ -0,0 +1,95 @@
+"""
+Tests for the semantic diagnosis cache.
+"""
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.engine import diagnosis_cache, llm
+from app.engine.diagnosis_cache import SemanticDiagnosisCache, context_signature
+from app.engine.embedding_cache import EmbeddingCache
+from app.engine.embeddings import HashingEmbedder
+from app.engine.llm import LLMGateway
+from app.engine.orchestrator import DecisionOrchestrator
+
+CONTEXT = {"company_stage": "traction", "decision_type": "growth", "ltv": 1200.0, "cac": 800.0, "churn_rate": 0.03}
+QUESTION = "Devemos escalar investimento em tráfego pago agora?"
+
+
+def _cache(**kwargs):
+    return SemanticDiagnosisCache(EmbeddingCache(HashingEmbedder(dimension=256), max_memory_entries=100), **kwargs)
+
+
+class TestSemanticDiagnosisCache:
+    """Tests for SemanticDiagnosisCache"""
+
+    def test_signature_buckets_metrics(self):
+        """Nearby metrics share a signature; crossing a band does not"""
+        assert context_signature(CONTEXT) == "traction|growth|ltv_cac=1|churn=1"
+        assert context_signature({**CONTEXT, "ltv": 1500.0, "churn_rate": 0.04}) == context_signature(CONTEXT)
+        assert context_signature({**CONTEXT, "ltv": 2500.0}) != context_signature(CONTEXT)
+        assert context_signature({"company_stage": "scale"}) == "scale|?|ltv_cac=?|churn=?"
+
+    @pytest.mark.asyncio
+    async def test_similar_question_in_same_situation_hits(self):
+        """Rewordings reuse the answer; other tasks and situations do not"""
+        cache = _cache(threshold=0.8)
+        await cache.set("diagnosis", QUESTION, CONTEXT, "acme", "answer")
+
+        assert await cache.get("diagnosis", "Devemos escalar o investimento em tráfego pago agora", CONTEXT, "acme") == "answer"
+        assert await cache.get("risks", QUESTION, CONTEXT, "acme") is None
+        assert await cache.get("diagnosis", QUESTION, {**CONTEXT, "churn_rate": 0.2}, "acme") is None
+        assert await cache.get("diagnosis", "Qual o tamanho do mercado endereçável?", CONTEXT, "acme") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["hit_rate"] == 0.25
+
+    @pytest.mark.asyncio
+    async def test_tenant_scope_and_ttl(self, monkeypatch):
+        """Tenant scope isolates answers; expired answers are dropped"""
+        tenant = _cache(scope="tenant")
+        shared = _cache(scope="global")
+        for cache in (tenant, shared):
+            await cache.set("diagnosis", QUESTION, CONTEXT, "acme", "answer")
+
+        assert await tenant.get("diagnosis", QUESTION, CONTEXT, "globex") is None
+        assert await shared.get("diagnosis", QUESTION, CONTEXT, "globex") == "answer"
+
+        now = diagnosis_cache.time.monotonic()
+        monkeypatch.setattr(diagnosis_cache.time, "monotonic", lambda: now + 7200)
+        assert await shared.get("diagnosis", QUESTION, CONTEXT, "globex") is None
+        assert shared.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_entries_are_bounded(self):
+        """The oldest answers are evicted beyond max_entries"""
+        cache = _cache(max_entries=2)
+        for index in range(3):
+            await cache.set("diagnosis", f"pergunta {index}", CONTEXT, None, str(index))
+
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["evictions"] == 1
+        assert await cache.get("diagnosis", "pergunta 0", CONTEXT) is None
+        assert await cache.get("diagnosis", "pergunta 2", CONTEXT) == "2"
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_skips_llm_on_hit(self, monkeypatch):
+        """A repeated question is answered from the cache without an LLM call"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Diagnóstico do LLM"}}]})
+
+        gateway = LLMGateway("http://stub/v1", None, "stub", transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(settings, "LLM_ENABLED", True)
+        monkeypatch.setattr(settings, "DIAGNOSIS_CACHE_ENABLED", True)
+        monkeypatch.setattr(llm, "_llm_gateway", gateway)
+        monkeypatch.setattr(diagnosis_cache, "_diagnosis_cache", _cache())
+        orchestrator = DecisionOrchestrator()
+
+        first = await orchestrator._generate_diagnosis(QUESTION, CONTEXT, [], "acme")
+        second = await orchestrator._generate_diagnosis(QUESTION + " ", CONTEXT, [], "acme")
+
+        assert first == second == "Diagnóstico do LLM"
+        assert len(calls) == 1
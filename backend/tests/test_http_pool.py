@@ -0,0 +1,84 @@
+"""
+Tests for the shared outbound HTTP client pool.
+"""
+
+import httpx
+import pytest
+
+from app.core import http as http_module
+from app.core.http import HTTPClientPool, close_http_pool, get_http_pool
+from app.core.oauth import GoogleOAuthProvider
+from app.integrations.ecommerce.vtex import VTEXClient
+from app.integrations.tools.semrush import SemrushClient
+
+
+@pytest.fixture
+def requests_seen(monkeypatch):
+    """Replace the process pool with one on a mock transport; yields the requests it served"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.host == "api.semrush.com":
+            return httpx.Response(200, text="API_UNITS\n1000")
+        if request.url.path.endswith("/token"):
+            return httpx.Response(200, json={"access_token": "t"})
+        return httpx.Response(200, json={"list": [], "path": request.url.path})
+
+    monkeypatch.setattr(http_module, "_http_pool", HTTPClientPool(transport=httpx.MockTransport(handler)))
+    yield seen
+
+
+class TestHTTPClientPool:
+    """Tests for HTTPClientPool"""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_origin(self):
+        """Requests to the same host reuse one client, other hosts get their own"""
+        pool = HTTPClientPool(transport=httpx.MockTransport(lambda request: httpx.Response(204)))
+
+        a = pool.client("https://api.example.com/v1/a")
+        b = pool.client("https://api.example.com/v2/b?x=1")
+        other = pool.client("https://other.example.com/")
+        await pool.request("GET", "https://api.example.com/v1/a")
+        await pool.request("GET", "https://api.example.com/v1/b")
+
+        assert a is b
+        assert other is not a
+        assert pool.stats()["hosts"]["https://api.example.com:443"]["requests"] == 2
+
+        await pool.close()
+        assert a.is_closed and other.is_closed
+
+    @pytest.mark.asyncio
+    async def test_close_resets_process_pool(self):
+        """close_http_pool drops the singleton, the next call builds a new pool"""
+        pool = get_http_pool()
+        await close_http_pool()
+        assert get_http_pool() is not pool
+        await close_http_pool()
+
+
+class TestClientsUsePool:
+    """Integration clients and OAuth providers send through the shared pool"""
+
+    @pytest.mark.asyncio
+    async def test_vtex_and_semrush(self, requests_seen):
+        """VTEX requests keep their auth headers; SEMrush checks parse no JSON"""
+        vtex = VTEXClient()
+        await vtex.list_orders(per_page=1)
+        assert await SemrushClient({"api_key": "k"}).check_connection() is True
+
+        order_request, semrush_request = requests_seen
+        assert order_request.url.path == "/api/oms/pvt/orders"
+        assert "x-vtex-api-appkey" in order_request.headers
+        assert semrush_request.url.params["type"] == "api_units"
+
+    @pytest.mark.asyncio
+    async def test_oauth_token_exchange(self, requests_seen):
+        """OAuth code exchange posts the form on the pooled client"""
+        tokens = await GoogleOAuthProvider().exchange_code("code-123")
+
+        assert tokens == {"access_token": "t"}
+        assert requests_seen[0].method == "POST"
+        assert b"code=code-123" in requests_seen[0].content
@@ -0,0 +1,173 @@
+"""
+Tests for incremental integration sync (watermarks + change-only upserts).
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.db.session import Base
+from app.integrations.ads.meta_ads import MetaAdsClient
+from app.integrations.sync import (
+    complete_sync,
+    get_watermark,
+    modified_since,
+    parse_modified,
+    plan_sync,
+    upsert_campaigns,
+)
+from app.models.user import Campaign
+
+TENANT = "tenant-1"
+USER = "user-1"
+SCOPE = "2024-01-01..2024-01-31"
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def sync_meta(session_factory, scope=SCOPE, force_full=False, now=None, metrics_end=None):
+    """One sync run of the demo Meta campaigns, returns (plan, fetched, counts)"""
+    async with session_factory() as db:
+        plan = await plan_sync(
+            db, TENANT, "meta_ads", "campaigns", scope=scope, force_full=force_full, now=now, metrics_end=metrics_end
+        )
+        records = await MetaAdsClient(user_id=USER).fetch_campaigns(
+            start_date="2024-01-01", end_date="2024-01-31", updated_since=plan.updated_since
+        )
+        counts = await upsert_campaigns(db, USER, TENANT, "meta", records, "2024-01-01", "2024-01-31")
+        complete_sync(plan, records, now=now)
+        await db.commit()
+    return plan, records, counts
+
+
+class TestPlanSync:
+    """Full vs incremental decisions"""
+
+    @pytest.mark.asyncio
+    async def test_first_sync_is_full_then_incremental(self, session_factory):
+        """The first run pulls everything, the next one only changes since the watermark"""
+        plan, records, counts = await sync_meta(session_factory)
+        assert plan.full and plan.reason == "first sync"
+        assert len(records) == 3
+        assert counts == {"created": 3, "updated": 0, "unchanged": 0}
+
+        plan, records, counts = await sync_meta(session_factory)
+        assert not plan.full
+        assert plan.updated_since == datetime(2024, 1, 14, 11, 20)
+        assert records == []
+        assert counts == {"created": 0, "updated": 0, "unchanged": 0}
+
+    @pytest.mark.asyncio
+    async def test_reconciliation_due(self, session_factory, monkeypatch):
+        """A full pass runs again once SYNC_FULL_RECONCILE_HOURS elapsed, writing nothing unchanged"""
+        monkeypatch.setattr(settings, "SYNC_FULL_RECONCILE_HOURS", 24.0)
+        start = datetime(2024, 2, 1)
+        await sync_meta(session_factory, now=start)
+
+        plan, _, _ = await sync_meta(session_factory, now=start + timedelta(hours=23))
+        assert not plan.full
+
+        plan, records, counts = await sync_meta(session_factory, now=start + timedelta(hours=25))
+        assert plan.full and plan.reason == "reconciliation due"
+        assert len(records) == 3
+        assert counts == {"created": 0, "updated": 0, "unchanged": 3}
+
+    @pytest.mark.asyncio
+    async def test_unsettled_metrics_are_pulled_again(self, session_factory, monkeypatch):
+        """Spend changes without touching updated_time, so recent ranges skip the change filter"""
+        monkeypatch.setattr(settings, "SYNC_METRICS_SETTLE_DAYS", 28)
+        start = datetime(2024, 2, 1)
+        await sync_meta(session_factory, now=start, metrics_end=date(2024, 1, 31))
+
+        plan, records, counts = await sync_meta(
+            session_factory, now=start + timedelta(hours=1), metrics_end=date(2024, 1, 31)
+        )
+        assert not plan.full and plan.reason == "metrics not settled"
+        assert plan.updated_since is None
+        assert len(records) == 3
+        assert counts == {"created": 0, "updated": 0, "unchanged": 3}
+
+        # Synced long after the range ended: metrics were final, only modified campaigns are fetched
+        later = datetime(2024, 6, 1)
+        await sync_meta(session_factory, now=later, force_full=True, metrics_end=date(2024, 1, 31))
+        plan, records, _ = await sync_meta(session_factory, now=later + timedelta(hours=1), metrics_end=date(2024, 1, 31))
+        assert plan.reason == "incremental"
+        assert records == []
+
+    @pytest.mark.asyncio
+    async def test_scope_change_resets_watermark(self, session_factory):
+        """Syncing another date range starts over with a full pass"""
+        await sync_meta(session_factory)
+
+        async with session_factory() as db:
+            plan = await plan_sync(db, TENANT, "meta_ads", "campaigns", scope="2024-02-01..2024-02-29")
+            assert plan.full and plan.reason == "scope changed"
+            assert plan.watermark.last_modified_at is None
+            assert plan.watermark.scope == "2024-02-01..2024-02-29"
+
+    @pytest.mark.asyncio
+    async def test_forced_full_sync(self, session_factory):
+        """full_sync ignores the watermark without dropping it"""
+        await sync_meta(session_factory)
+        plan, records, _ = await sync_meta(session_factory, force_full=True)
+        assert plan.full and plan.reason == "requested"
+        assert plan.updated_since is None
+        assert len(records) == 3
+
+        async with session_factory() as db:
+            watermark = await get_watermark(db, TENANT, "meta_ads", "campaigns")
+            assert watermark.last_modified_at == datetime(2024, 1, 14, 11, 20)
+            assert watermark.records_synced == 3
+
+
+class TestUpsertCampaigns:
+    """Change-only writes"""
+
+    @pytest.mark.asyncio
+    async def test_updates_only_changed_rows(self, session_factory):
+        """Only campaigns whose values changed are rewritten"""
+        records = await MetaAdsClient(user_id=USER).fetch_campaigns(start_date="2024-01-01", end_date="2024-01-31")
+        async with session_factory() as db:
+            await upsert_campaigns(db, USER, TENANT, "meta", records, "2024-01-01", "2024-01-31")
+            await db.commit()
+
+        changed = [dict(record) for record in records]
+        changed[1]["spend"] += 100
+        async with session_factory() as db:
+            counts = await upsert_campaigns(db, USER, TENANT, "meta", changed, "2024-01-01", "2024-01-31")
+            await db.commit()
+        assert counts == {"created": 0, "updated": 1, "unchanged": 2}
+
+        async with session_factory() as db:
+            result = await db.execute(select(Campaign).where(Campaign.external_id == changed[1]["id"]))
+            campaign = result.scalar_one()
+            assert campaign.spend == changed[1]["spend"]
+            assert campaign.cpa == round(campaign.spend / campaign.conversions, 2)
+
+    def test_parse_modified(self):
+        """Offsets are normalized to naive UTC"""
+        assert parse_modified("2024-01-11T10:00:00-03:00") == datetime(2024, 1, 11, 13, 0)
+        assert parse_modified("2024-01-11T10:00:00Z") == datetime(2024, 1, 11, 10, 0)
+        assert parse_modified(None) is None
+
+    def test_modified_since(self):
+        """Records after the watermark (and those without a timestamp) are kept"""
+        records = [
+            {"id": "a", "updated_time": "2024-01-10T09:00:00+00:00"},
+            {"id": "b", "updated_time": "2024-01-12T10:00:00-03:00"},
+            {"id": "c"},
+        ]
+        assert [r["id"] for r in modified_since(records, datetime(2024, 1, 12, 12, 0))] == ["b", "c"]
+        assert len(modified_since(records, None)) == 3
@@ -0,0 +1,127 @@
+"""
+Tests for DataLoader batching of per-ID integration lookups.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.integrations.ecommerce.clients import ShopifyClient
+from app.integrations.ecommerce.vtex import VTEXClient
+from app.integrations.loader import DataLoader, fan_out
+
+
+class RecordingBatch:
+    """Bulk function that records each dispatched batch"""
+
+    def __init__(self, missing=(), failing=()):
+        self.batches = []
+        self.missing = set(missing)
+        self.failing = set(failing)
+
+    async def __call__(self, keys):
+        self.batches.append(list(keys))
+        results = {}
+        for key in keys:
+            if key in self.failing:
+                results[key] = ValueError(key)
+            elif key not in self.missing:
+                results[key] = {"id": key}
+        return results
+
+
+class TestDataLoader:
+    """Batching, deduplication and the per-request cache"""
+
+    @pytest.mark.asyncio
+    async def test_one_tick_is_one_deduplicated_batch(self):
+        """Loads issued together are dispatched once, each key once"""
+        batch = RecordingBatch()
+        loader = DataLoader(batch)
+
+        results = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"))
+        assert results == [{"id": "a"}, {"id": "b"}, {"id": "a"}]
+        assert batch.batches == [["a", "b"]]
+
+        assert await loader.load_many(["b", "a"]) == [{"id": "b"}, {"id": "a"}]
+        assert len(batch.batches) == 1
+        assert loader.stats()["cache_hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size(self):
+        """Large ticks are split into bulk calls of max_batch_size"""
+        batch = RecordingBatch()
+        loader = DataLoader(batch, max_batch_size=4)
+        await loader.load_many([str(n) for n in range(10)])
+        assert [len(keys) for keys in batch.batches] == [4, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_per_key_and_not_cached(self):
+        """A failing or missing key fails alone and is retried on the next load"""
+        batch = RecordingBatch(missing={"gone"}, failing={"bad"})
+        loader = DataLoader(batch)
+
+        ok, gone, bad = await asyncio.gather(
+            loader.load("ok"), loader.load("gone"), loader.load("bad"), return_exceptions=True
+        )
+        assert ok == {"id": "ok"}
+        assert isinstance(gone, KeyError)
+        assert isinstance(bad, ValueError)
+
+        batch.failing.clear()
+        assert await loader.load("bad") == {"id": "bad"}
+        assert batch.batches[-1] == ["bad"]
+
+    @pytest.mark.asyncio
+    async def test_fan_out_bounds_concurrency(self):
+        """Without a bulk endpoint at most `concurrency` single calls run at once"""
+        active = 0
+        peak = 0
+
+        async def load_one(key):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return key.upper()
+
+        loader = DataLoader(fan_out(load_one, concurrency=3))
+        assert await loader.load_many(list("abcdefgh")) == list("ABCDEFGH")
+        assert peak == 3
+
+
+class TestClientLoaders:
+    """Provider loaders"""
+
+    @pytest.mark.asyncio
+    async def test_vtex_products_fan_out_unique_ids(self, serve):
+        """N lookups with repeats cost one request per unique product"""
+        seen = serve(lambda request: httpx.Response(200, json={"Id": request.url.path.rsplit("/", 1)[-1]}))
+        products = VTEXClient({"account_name": "shop", "app_key": "k", "app_token": "t"}).product_loader()
+
+        ids = ["1", "2", "3", "2", "1"]
+        assert [p["Id"] for p in await products.load_many(ids)] == ids
+        assert await products.load("3") == {"Id": "3"}
+        assert sorted(request.url.path for request in seen) == [f"/api/catalog/pvt/product/{n}" for n in "123"]
+
+    @pytest.mark.asyncio
+    async def test_shopify_products_use_bulk_endpoint(self, serve, monkeypatch):
+        """Shopify lookups go through one products.json?ids= call"""
+        monkeypatch.setattr(settings, "SHOPIFY_SHOP_URL", "shop.myshopify.com")
+
+        def handler(request):
+            ids = request.url.params["ids"].split(",")
+            return httpx.Response(200, json={"products": [{"id": int(i), "title": f"P{i}"} for i in ids if i != "9"]})
+
+        seen = serve(handler)
+        products = ShopifyClient().product_loader()
+        found, missing = await asyncio.gather(
+            products.load_many(["1", "2", "1"]), products.load("9"), return_exceptions=True
+        )
+        assert [p["title"] for p in found] == ["P1", "P2", "P1"]
+        assert isinstance(missing, KeyError)
+        assert len(seen) == 1
+        assert seen[0].url.params["ids"] == "1,2,9"
@@ -0,0 +1,113 @@
+"""
+Tests for paginated integration endpoints.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.integrations.ecommerce.vtex import VTEXClient
+from app.integrations.pagination import (
+    CursorPagination,
+    LinkHeaderPagination,
+    OffsetPagination,
+    PageNumberPagination,
+)
+from tests.conftest import ShopClient
+
+RECORDS = list(range(23))
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestPaginationStyles:
+    """Each pagination strategy walks every record exactly once"""
+
+    @pytest.mark.asyncio
+    async def test_page_number_short_page(self, serve):
+        """Without a page count the short last page ends the walk"""
+        def handler(request):
+            page, size = int(request.url.params["page"]), int(request.url.params["per_page"])
+            return httpx.Response(200, json=RECORDS[(page - 1) * size:page * size])
+
+        seen = serve(handler)
+        records = await collect(ShopClient().paginate("/items", PageNumberPagination(page_size=10)))
+
+        assert records == RECORDS
+        assert len(seen) == 3
+
+    @pytest.mark.asyncio
+    async def test_offset_with_total(self, serve):
+        """A reported total avoids requesting an empty page"""
+        def handler(request):
+            offset, limit = int(request.url.params["offset"]), int(request.url.params["limit"])
+            return httpx.Response(200, json={"data": RECORDS[offset:offset + limit], "total": len(RECORDS)})
+
+        seen = serve(handler)
+        pagination = OffsetPagination(limit=23, items_key="data", total_key="total")
+        assert await collect(ShopClient().paginate("/items", pagination)) == RECORDS
+        assert len(seen) == 1
+
+    @pytest.mark.asyncio
+    async def test_cursor(self, serve):
+        """Cursor from the payload is sent back until it is absent"""
+        def handler(request):
+            start = int(request.url.params.get("after", 0))
+            chunk = RECORDS[start:start + 10]
+            after = start + 10 if start + 10 < len(RECORDS) else None
+            return httpx.Response(200, json={"data": chunk, "paging": {"cursors": {"after": after}}})
+
+        serve(handler)
+        pagination = CursorPagination("paging.cursors.after", cursor_param="after", page_size=10, items_key="data")
+        assert await collect(ShopClient().paginate("/items", pagination, params={"fields": "id"})) == RECORDS
+
+    @pytest.mark.asyncio
+    async def test_link_header(self, serve):
+        """rel=next absolute URLs are followed with their own query"""
+        def handler(request):
+            page = int(request.url.params.get("page_info", 0))
+            headers = {}
+            if page < 2:
+                headers["Link"] = f'<https://api.shop.test/items?page_info={page + 1}>; rel="next"'
+            return httpx.Response(200, json={"items": RECORDS[page * 10:(page + 1) * 10]}, headers=headers)
+
+        seen = serve(handler)
+        assert await collect(ShopClient().paginate("/items", LinkHeaderPagination(items_key="items"))) == RECORDS
+        assert str(seen[-1].url) == "https://api.shop.test/items?page_info=2"
+
+
+class TestStreaming:
+    """Prefetching and VTEX orders"""
+
+    @pytest.mark.asyncio
+    async def test_next_page_is_prefetched(self, serve):
+        """Page 2 is requested while page 1 is still being consumed"""
+        def handler(request):
+            page = int(request.url.params["page"])
+            return httpx.Response(200, json=RECORDS[(page - 1) * 10:page * 10])
+
+        seen = serve(handler)
+        iterator = ShopClient().paginate("/items", PageNumberPagination(page_size=10))
+        assert await iterator.__anext__() == 0
+        await asyncio.sleep(0.01)
+
+        assert len(seen) == 2
+        await iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_vtex_iter_orders(self, serve):
+        """Orders stream across pages using VTEX's paging.pages"""
+        def handler(request):
+            page, size = int(request.url.params["page"]), int(request.url.params["per_page"])
+            orders = [{"orderId": f"{n}-01"} for n in RECORDS[(page - 1) * size:page * size]]
+            return httpx.Response(200, json={"list": orders, "paging": {"pages": 3, "currentPage": page}})
+
+        seen = serve(handler)
+        orders = await collect(VTEXClient().iter_orders(per_page=10, params={"f_status": "invoiced"}))
+
+        assert [order["orderId"] for order in orders] == [f"{n}-01" for n in RECORDS]
+        assert seen[0].url.params["f_status"] == "invoiced"
+        assert seen[0].url.params["orderBy"] == "creationDate,desc"
@@ -0,0 +1,126 @@
+"""
+Tests for integration rate limiting and retries.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.integrations import ratelimit
+from app.integrations.ratelimit import AdaptiveConcurrency, TokenBucket, parse_retry_after, usage_pause
+from tests.conftest import ShopClient, scripted
+
+
+class TestHeaders:
+    """Tests for Retry-After and usage header parsing"""
+
+    def test_retry_after(self):
+        """Delay-seconds and HTTP-date forms"""
+        assert parse_retry_after("2.5") == 2.5
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_usage_headers(self):
+        """Exhausted X-RateLimit, Meta regain time and Meta usage percentages"""
+        assert usage_pause({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "7"}) == (7.0, True)
+        assert usage_pause({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1700000030"}, now=1700000000.0) == (30.0, True)
+        assert usage_pause({"x-ratelimit-remaining": "12"}) == (None, False)
+        business = '{"act_1": [{"call_count": 100, "estimated_time_to_regain_access": 2}]}'
+        assert usage_pause({"x-business-use-case-usage": business}) == (120.0, True)
+        assert usage_pause({"x-app-usage": '{"call_count": 95, "total_time": 10}'}) == (None, True)
+        assert usage_pause({"x-app-usage": '{"call_count": 40}'}) == (None, False)
+
+
+class TestLimiterParts:
+    """Tests for TokenBucket and AdaptiveConcurrency"""
+
+    @pytest.mark.asyncio
+    async def test_bucket_paces_after_burst(self):
+        """Burst passes immediately, further requests wait for refill"""
+        bucket = TokenBucket(rate=200.0, capacity=2)
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        assert time.monotonic() - started >= 4 / 200 * 0.9
+
+    def test_pause_holds_requests(self):
+        """A pause empties the bucket until the deadline"""
+        bucket = TokenBucket(rate=1000.0, capacity=10)
+        bucket.pause(0.5)
+        assert 0.4 < bucket.wait_time() <= 0.5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_aimd(self):
+        """Halves on throttling, grows back one slot per window of successes"""
+        concurrency = AdaptiveConcurrency(max_limit=8)
+        concurrency.on_throttle()
+        concurrency.on_throttle()
+        assert int(concurrency.limit) == 2
+        for _ in range(2):
+            concurrency.on_success()
+        assert int(concurrency.limit) == 2
+        for _ in range(3):
+            concurrency.on_success()
+        assert int(concurrency.limit) == 3
+
+        await concurrency.acquire()
+        await concurrency.acquire()
+        await concurrency.acquire()
+        waiter = asyncio.ensure_future(concurrency.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        await concurrency.release()
+        await asyncio.wait_for(waiter, 1)
+
+
+class TestClientRetries:
+    """BaseIntegrationClient retry and throttling behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_429_honours_retry_after_and_throttles(self, serve):
+        """A 429 pauses the provider limiter for Retry-After, then the request succeeds"""
+        seen = serve(scripted(httpx.Response(429, headers={"Retry-After": "0.05"}), httpx.Response(200, json={"ok": True})))
+        client = ShopClient()
+
+        started = time.monotonic()
+        assert await client._make_request("POST", "/orders", data={"id": 1}) == {"ok": True}
+
+        assert len(seen) == 2
+        assert time.monotonic() - started >= 0.045
+        stats = ratelimit.rate_limiter_stats()["shop"]
+        (limiter_stats,) = stats.values()
+        assert limiter_stats["throttled"] == 1
+        assert limiter_stats["concurrency_limit"] == 4
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retry_idempotent_only(self, serve):
+        """503 is retried for GET but not for POST"""
+        seen = serve(scripted(httpx.Response(503), httpx.Response(200, json={"ok": True})))
+        assert await ShopClient()._make_request("GET", "/orders") == {"ok": True}
+        assert len(seen) == 2
+
+        seen = serve(scripted(httpx.Response(503)))
+        with pytest.raises(httpx.HTTPStatusError):
+            await ShopClient()._make_request("POST", "/orders")
+        assert len(seen) == 3
+
+    @pytest.mark.asyncio
+    async def test_limiters_are_per_credential(self, serve):
+        """Different tenant credentials of one provider get separate buckets"""
+        serve(scripted(httpx.Response(200, json={})))
+        await ShopClient(account="tenant-a")._make_request("GET", "/ping")
+        await ShopClient(account="tenant-b")._make_request("GET", "/ping")
+
+        assert len(ratelimit.rate_limiter_stats()["shop"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_token_refresh_keeps_the_account_bucket(self, serve):
+        """A new access token of the same account is paced by the same limiter"""
+        serve(scripted(httpx.Response(200, json={})))
+        await ShopClient(token="before-refresh")._make_request("GET", "/ping")
+        await ShopClient(token="after-refresh")._make_request("GET", "/ping")
+
+        assert len(ratelimit.rate_limiter_stats()["shop"]) == 1
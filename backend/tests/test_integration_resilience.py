@@ -0,0 +1,177 @@
+"""
+Tests for integration circuit breakers and hedged requests.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.integrations import resilience
+from app.integrations.resilience import CircuitBreaker, CircuitOpenError, endpoint_key, hedged
+from tests.conftest import ShopClient
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker"""
+
+    def test_endpoint_key_collapses_ids(self):
+        """Resource ids do not create one breaker per resource"""
+        assert endpoint_key("vtex", "/api/oms/pvt/orders/1234567890-01") == "vtex:/api/oms/pvt/orders/{id}"
+        assert endpoint_key("vtex", "/api/oms/pvt/orders?page=2") == "vtex:/api/oms/pvt/orders"
+
+    @pytest.mark.asyncio
+    async def test_open_half_open_close(self):
+        """Opens past the failure rate, probes after the cool-down, closes on success"""
+        breaker = CircuitBreaker("p:/x", failure_rate=0.5, min_calls=4, open_seconds=0.05)
+        for ok in (True, False, True, False):
+            breaker.check()
+            breaker.record(ok)
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+        await asyncio.sleep(0.06)
+        breaker.check()
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            breaker.check()  # only one probe at a time
+        breaker.record(False)
+        assert breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        breaker.check()
+        breaker.record(True)
+        assert breaker.state == "closed"
+        assert breaker.stats()["opened"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unreported_probe_expires(self):
+        """A probe that never records an outcome stops blocking after the cool-down"""
+        breaker = CircuitBreaker("p:/x", min_calls=1, open_seconds=0.05)
+        breaker.record(False)
+        await asyncio.sleep(0.06)
+        breaker.check()  # the probe, never recorded
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+        await asyncio.sleep(0.06)
+        breaker.check()
+        breaker.record(True)
+        assert breaker.state == "closed"
+
+    def test_below_min_calls_stays_closed(self):
+        """A few failures do not open the breaker before min_calls"""
+        breaker = CircuitBreaker("p:/x", min_calls=10)
+        for _ in range(5):
+            breaker.record(False)
+        assert breaker.state == "closed"
+
+
+class TestHedging:
+    """Tests for hedged()"""
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_over_slow_first_attempt(self, serve):
+        """The duplicate answers first and the slow attempt is cancelled"""
+        delays = [1.0, 0.0]
+        cancelled = []
+
+        async def send():
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        assert await hedged(send, 0.01) == 0.0
+        await asyncio.sleep(0)
+        assert cancelled == [1.0]
+        assert resilience._hedges == {"sent": 1, "won": 1}
+
+    @pytest.mark.asyncio
+    async def test_fast_first_attempt_is_not_hedged(self, serve):
+        """No duplicate when the first attempt answers within the delay"""
+        async def send():
+            return "ok"
+
+        assert await hedged(send, 0.5) == "ok"
+        assert resilience._hedges["sent"] == 0
+
+
+class TestClientResilience:
+    """Circuit breaking and hedging in BaseIntegrationClient"""
+
+    @pytest.mark.asyncio
+    async def test_failing_endpoint_fails_fast(self, serve, monkeypatch):
+        """After enough 5xx the breaker opens and requests are not sent"""
+        monkeypatch.setattr(settings, "INTEGRATION_BREAKER_MIN_CALLS", 4)
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(500)
+
+        serve(handler)
+        client = ShopClient()
+        for order_id in range(4):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client._make_request("POST", f"/orders/{order_id}1/cancel")
+        with pytest.raises(CircuitOpenError):
+            await client._make_request("POST", "/orders/991/cancel")
+
+        assert len(seen) == 4
+        stats = resilience.resilience_stats()["endpoints"]["shop:/orders/{id}/cancel"]
+        assert stats["state"] == "open" and stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_half_open_slot(self, serve, monkeypatch):
+        """Cancelling the half-open probe lets the next call probe instead of failing fast"""
+        monkeypatch.setattr(settings, "INTEGRATION_BREAKER_MIN_CALLS", 2)
+        monkeypatch.setattr(settings, "INTEGRATION_BREAKER_OPEN_SECONDS", 0.05)
+        responses = [500, 500, "hang", 200]
+
+        async def handler(request):
+            status = responses.pop(0)
+            if status == "hang":
+                await asyncio.sleep(10)
+            return httpx.Response(status, json={})
+
+        serve(handler)
+        client = ShopClient()
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client._make_request("GET", "/products")
+        await asyncio.sleep(0.06)
+
+        probe = asyncio.create_task(client._make_request("GET", "/products"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert await client._make_request("GET", "/products") == {}
+        assert resilience.resilience_stats()["endpoints"]["shop:/products"]["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_slow_get_is_hedged(self, serve, monkeypatch):
+        """Once p95 is known, a GET slower than it gets a duplicate that wins"""
+        monkeypatch.setattr(settings, "INTEGRATION_HEDGING_ENABLED", True)
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 21:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"call": len(calls)})
+
+        serve(handler)
+        client = ShopClient()
+        for _ in range(20):
+            await client._make_request("GET", "/products")
+
+        assert await client._make_request("GET", "/products") == {"call": 22}
+        assert resilience._hedges == {"sent": 1, "won": 1}
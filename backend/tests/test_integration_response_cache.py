@@ -0,0 +1,137 @@
+"""
+Tests for the conditional-request integration response cache.
+"""
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.integrations import response_cache
+from app.integrations.ecommerce.vtex import VTEXClient
+from app.integrations.response_cache import ResponseCache
+
+PRODUCT = {"Id": 42, "Name": "Tênis Corrida", "IsActive": True}
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 06 Mar 2024 12:00:00 GMT"
+
+CREDENTIALS = {"account_name": "shop", "environment": "vtexcommercestable", "app_key": "key", "app_token": "token"}
+
+
+class FakeCatalog:
+    """Catalog product endpoint honoring If-None-Match"""
+
+    def __init__(self, cache_control=None):
+        self.cache_control = cache_control
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        headers = {"etag": ETAG, "last-modified": LAST_MODIFIED}
+        if self.cache_control:
+            headers["cache-control"] = self.cache_control
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json=PRODUCT, headers=headers)
+
+
+@pytest.fixture
+def catalog(serve, monkeypatch):
+    """Install a fake catalog and a fresh memory-only cache; returns a factory"""
+    monkeypatch.setattr(settings, "INTEGRATION_CACHE_ENABLED", True)
+
+    def install(fake, cache=None):
+        serve(fake)
+        monkeypatch.setattr(response_cache, "_response_cache", cache or ResponseCache())
+        return fake
+
+    return install
+
+
+class TestRevalidation:
+    """Validators turn repeat reads into 304s"""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_served_from_cache(self, catalog):
+        """The second read sends If-None-Match and answers the 304 from the cached body"""
+        fake = catalog(FakeCatalog())
+        client = VTEXClient(CREDENTIALS)
+
+        assert await client.get_product_by_id("42") == PRODUCT
+        assert await client.get_product_by_id("42") == PRODUCT
+
+        assert "if-none-match" not in fake.requests[0].headers
+        assert fake.requests[1].headers["if-none-match"] == ETAG
+        assert fake.requests[1].headers["if-modified-since"] == LAST_MODIFIED
+        stats = response_cache.get_response_cache().stats()
+        assert stats["not_modified"] == 1
+        assert stats["bytes_saved"] > 0
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_skips_request(self, catalog):
+        """Within max-age the cached body is returned without a request"""
+        fake = catalog(FakeCatalog(cache_control="max-age=300"))
+        client = VTEXClient(CREDENTIALS)
+
+        await client.get_product_by_id("42")
+        assert await client.get_product_by_id("42") == PRODUCT
+        assert len(fake.requests) == 1
+        assert response_cache.get_response_cache().stats()["fresh_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_store_and_uncached_calls(self, catalog):
+        """no-store responses and calls without cache=True are never cached"""
+        fake = catalog(FakeCatalog(cache_control="no-store"))
+        client = VTEXClient(CREDENTIALS)
+
+        await client.get_product_by_id("42")
+        await client.get_product_by_id("42")
+        await client._make_request("GET", "/api/catalog/pvt/product/7")
+        assert all("if-none-match" not in request.headers for request in fake.requests)
+        assert len(fake.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_accounts_do_not_share_entries(self, catalog):
+        """Another account's client never revalidates against this account's entry"""
+        fake = catalog(FakeCatalog())
+        await VTEXClient(CREDENTIALS).get_product_by_id("42")
+        await VTEXClient({**CREDENTIALS, "account_name": "other"}).get_product_by_id("42")
+        assert "if-none-match" not in fake.requests[1].headers
+
+    @pytest.mark.asyncio
+    async def test_rotated_token_keeps_entries(self, catalog):
+        """A new app token of the same account revalidates the entries cached before"""
+        fake = catalog(FakeCatalog())
+        await VTEXClient(CREDENTIALS).get_product_by_id("42")
+        await VTEXClient({**CREDENTIALS, "app_token": "rotated"}).get_product_by_id("42")
+        assert fake.requests[1].headers["if-none-match"] == ETAG
+
+
+class TestResponseCacheTiers:
+    """Memory bounds and the disk tier"""
+
+    @pytest.mark.asyncio
+    async def test_lru_bounded_by_bytes(self):
+        """The least recently used bodies are evicted past max_memory_bytes"""
+        cache = ResponseCache(max_memory_bytes=250)
+        request = httpx.Request("GET", "https://catalog.test/p")
+        for n in range(3):
+            response = httpx.Response(200, content=b"x" * 100, headers={"etag": f'"{n}"'}, request=request)
+            await cache.store(f"k{n}", response)
+
+        assert await cache.lookup("k0") is None
+        assert (await cache.lookup("k2")).etag == '"2"'
+        assert cache.stats()["memory_bytes"] == 200
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, catalog, tmp_path):
+        """A new process revalidates against the entry persisted on disk"""
+        path = str(tmp_path / "responses.sqlite")
+        catalog(FakeCatalog(), ResponseCache(disk_path=path))
+        await VTEXClient(CREDENTIALS).get_product_by_id("42")
+
+        restarted = ResponseCache(disk_path=path)
+        fake = catalog(FakeCatalog(), restarted)
+        assert await VTEXClient(CREDENTIALS).get_product_by_id("42") == PRODUCT
+        assert fake.requests[0].headers["if-none-match"] == ETAG
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.stats()["not_modified"] == 1
@@ -0,0 +1,190 @@
+"""
+Tests for streaming knowledge ingestion.
+"""
+
+import asyncio
+import io
+
+import pytest
+
+from app.engine.ingestion import (
+    IngestionProgress,
+    KnowledgeIngestor,
+    TextChunker,
+    detect_metrics,
+    iter_document_text,
+)
+from app.engine.rag_engine import RAGEngine
+
+
+class AsyncBytesFile:
+    """Minimal async file (UploadFile-like) over bytes"""
+
+    def __init__(self, data: bytes):
+        self.file = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+
+async def _single_document(name: str, data: bytes, progress: IngestionProgress):
+    yield name, iter_document_text(AsyncBytesFile(data), name, progress)
+
+
+async def _pieces(*pieces: str):
+    for piece in pieces:
+        yield piece
+
+
+class TestTextChunker:
+    """Tests for incremental chunking"""
+
+    def test_chunks_are_bounded_and_cover_text(self):
+        """Chunks respect max_chars regardless of how text is fed"""
+        text = " ".join(f"Frase número {i} sobre CAC Payback." for i in range(400))
+        chunker = TextChunker(max_chars=300, overlap=40)
+
+        chunks = []
+        for start in range(0, len(text), 37):
+            chunks.extend(chunker.feed(text[start:start + 37]))
+        chunks.extend(chunker.flush())
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 300 for chunk in chunks)
+        assert "Frase número 0 " in chunks[0]
+        assert chunks[-1].endswith("Frase número 399 sobre CAC Payback.")
+
+    def test_prefers_paragraph_boundaries(self):
+        """A paragraph break inside the window is used as the split point"""
+        chunker = TextChunker(max_chars=100, overlap=10)
+
+        chunks = chunker.feed("a" * 70 + "\n\n" + "b" * 70) + chunker.flush()
+
+        assert chunks[0] == "a" * 70
+
+
+class TestDetectMetrics:
+    """Tests for metric tagging"""
+
+    def test_matches_whole_words_only(self):
+        """A metric name inside another word is not a mention"""
+        vocabulary = {"TAM", "LTV/CAC", "Churn"}
+        assert detect_metrics("Avaliamos também o churn mensal.", vocabulary) == ["Churn"]
+        assert detect_metrics("TAM de R$ 2 bi; LTV/CAC acima de 3x.", vocabulary) == ["LTV/CAC", "TAM"]
+
+
+class TestKnowledgeIngestor:
+    """Tests for the ingestion pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_reingest_does_not_duplicate_chunks(self):
+        """Chunk ids are deterministic, so re-ingesting a document keeps one copy"""
+        engine = RAGEngine()
+        namespace = "test_ingest_reingest"
+        data = "\n\n".join(f"Seção {i}: payback de CAC em meses." for i in range(20)).encode("utf-8")
+
+        counts = []
+        for _ in range(2):
+            progress = IngestionProgress(namespace)
+            ingestor = KnowledgeIngestor(engine, batch_size=4, max_chars=80, overlap=10)
+            await ingestor.ingest(namespace, _single_document("doc.md", data, progress), progress=progress)
+            counts.append(await engine.count(namespace))
+
+        assert counts[0] > 1
+        assert counts[1] == counts[0]
+
+    @pytest.mark.asyncio
+    async def test_edited_and_alike_named_documents_keep_their_chunks(self):
+        """Changed chunks and documents whose names slugify alike are not dropped as duplicates"""
+        engine = RAGEngine()
+        namespace = "test_ingest_edited"
+        ingestor = KnowledgeIngestor(engine, batch_size=4, max_chars=80, overlap=10)
+
+        async def ingest(name, text):
+            progress = IngestionProgress(namespace)
+            await ingestor.ingest(namespace, _single_document(name, text.encode("utf-8"), progress), progress=progress)
+
+        await ingest("Plano Q1.md", "Meta de CAC Payback: 12 meses.")
+        await ingest("Plano Q1.md", "Meta de CAC Payback: 9 meses.")
+        await ingest("plano-q1.md", "Burn Multiple abaixo de 1,5x.")
+
+        contents = {hit.content for hit in await engine.search(namespace, "meta de CAC Payback", limit=10)}
+        assert contents == {
+            "Meta de CAC Payback: 12 meses.",
+            "Meta de CAC Payback: 9 meses.",
+            "Burn Multiple abaixo de 1,5x.",
+        }
+
+    @pytest.mark.asyncio
+    async def test_default_progress_belongs_to_the_tenant(self):
+        """Progress created by the ingestor carries the owning tenant"""
+        engine = RAGEngine()
+
+        async def documents():
+            yield "doc.md", _pieces("Receita recorrente por cliente.")
+
+        progress = await KnowledgeIngestor(engine).ingest("test_ingest_tenant", documents(), tenant_id="acme")
+
+        assert progress.tenant_id == "acme"
+        assert progress.chunks == 1
+
+    @pytest.mark.asyncio
+    async def test_ingested_chunks_become_searchable(self):
+        """Chunks are appended to the namespace index incrementally"""
+        engine = RAGEngine()
+        namespace = "test_ingest_searchable"
+        paragraphs = [f"Playbook {i}: reduzir churn por coorte com onboarding." for i in range(50)]
+        paragraphs.append("Playbook final: Burn Multiple acima de 2x exige corte de custos.")
+        data = "\n\n".join(paragraphs).encode("utf-8")
+
+        progress = IngestionProgress(namespace)
+        ingestor = KnowledgeIngestor(engine, batch_size=4, max_chars=200, overlap=20)
+        await ingestor.ingest(
+            namespace,
+            _single_document("playbook.md", data, progress),
+            metrics=["Churn por coorte"],
+            progress=progress,
+        )
+
+        stats = progress.to_dict()
+        assert stats["documents"] == 1
+        assert stats["bytes_read"] == len(data)
+        assert stats["batches"] > 1
+        assert stats["finished"]
+
+        assert await engine.count(namespace) == stats["chunks"]
+
+        hits = await engine.search(namespace, "Burn Multiple acima de 2x", limit=1)
+        assert "Burn Multiple" in hits[0].content
+        assert "Churn por coorte" in hits[0].metrics
+
+    @pytest.mark.asyncio
+    async def test_searches_run_while_ingesting(self):
+        """Searches are served between ingestion batches"""
+        engine = RAGEngine()
+        namespace = "test_ingest_concurrent"
+        data = "\n\n".join(f"Parágrafo {i} sobre LTV/CAC." for i in range(200)).encode("utf-8")
+        observed_counts = []
+
+        def on_progress(progress: IngestionProgress) -> None:
+            observed_counts.append(progress.chunks)
+
+        async def search_repeatedly():
+            seen = []
+            for _ in range(20):
+                hits = await engine.search(namespace, "LTV/CAC", limit=3)
+                seen.append(len(hits))
+                await asyncio.sleep(0)
+            return seen
+
+        progress = IngestionProgress(namespace)
+        ingestor = KnowledgeIngestor(
+            engine, batch_size=8, max_chars=120, overlap=10, on_progress=on_progress
+        )
+        _, seen = await asyncio.gather(
+            ingestor.ingest(namespace, _single_document("doc.md", data, progress), progress=progress),
+            search_repeatedly(),
+        )
+
+        assert len(observed_counts) > 1
+        assert max(seen) == 3
@@ -0,0 +1,140 @@
+"""
+Tests for the LLM gateway, against the bundled chat-completions stub.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.engine import llm
+from app.engine.llm import LLMError, LLMGateway
+from app.engine.orchestrator import DecisionOrchestrator
+from scripts.llm_stub_server import DEFAULT_REPLY, create_app
+
+MESSAGES = [{"role": "user", "content": "Devemos escalar tráfego pago?"}]
+
+
+def _gateway(transport, **kwargs):
+    return LLMGateway(
+        base_url="http://stub/v1",
+        api_key="test",
+        model="stub",
+        backoff_seconds=0.001,
+        transport=transport,
+        **kwargs,
+    )
+
+
+def _stub_gateway(**kwargs):
+    return _gateway(httpx.ASGITransport(app=create_app(latency_ms=0, tokens_per_second=0)), **kwargs)
+
+
+class TestLLMGateway:
+    """Tests for LLMGateway"""
+
+    @pytest.mark.asyncio
+    async def test_complete_accounts_tokens_per_tenant(self):
+        """Usage reported by the API is charged to the calling tenant"""
+        gateway = _stub_gateway()
+
+        text = await gateway.complete(MESSAGES, tenant_id="acme")
+        first = gateway.usage("acme")
+        await gateway.complete(MESSAGES, tenant_id="acme")
+        await gateway.complete(MESSAGES)
+
+        assert text == DEFAULT_REPLY
+        assert first["total_tokens"] > 0
+        assert gateway.usage("acme") == {key: 2 * value for key, value in first.items()}
+        assert gateway.usage()["requests"] == 1
+        assert gateway.usage("globex") == {}
+        await gateway.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_deltas_and_usage(self):
+        """Streaming reassembles the reply and reads the final usage chunk"""
+        gateway = _stub_gateway()
+
+        deltas = [delta async for delta in gateway.stream(MESSAGES, tenant_id="acme")]
+
+        assert "".join(deltas).strip() == DEFAULT_REPLY
+        assert len(deltas) > 1
+        assert gateway.usage("acme")["completion_tokens"] > 0
+        await gateway.close()
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self):
+        """429 and connection errors are retried; 400 fails immediately"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            if len(calls) == 2:
+                raise httpx.ConnectError("refused", request=request)
+            if b"bad" in request.content:
+                return httpx.Response(400, json={"error": {"message": "bad request"}})
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}], "usage": {}})
+
+        gateway = _gateway(httpx.MockTransport(handler), max_retries=2)
+
+        assert await gateway.complete(MESSAGES) == "ok"
+        assert gateway.retries == 2
+        with pytest.raises(LLMError):
+            await gateway.complete([{"role": "user", "content": "bad"}])
+        assert len(calls) == 4
+        await gateway.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than max_concurrency requests are in flight"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        gateway = _gateway(httpx.MockTransport(handler), max_concurrency=3)
+
+        await asyncio.gather(*(gateway.complete(MESSAGES) for _ in range(12)))
+
+        assert peak == 3
+        await gateway.close()
+
+    @pytest.mark.asyncio
+    async def test_diagnosis_falls_back_to_rules(self, monkeypatch):
+        """With the LLM enabled but failing, the rule-based diagnosis is used"""
+        def handler(request):
+            return httpx.Response(503)
+
+        monkeypatch.setattr(settings, "LLM_ENABLED", True)
+        monkeypatch.setattr(settings, "DIAGNOSIS_CACHE_ENABLED", False)
+        monkeypatch.setattr(llm, "_llm_gateway", _gateway(httpx.MockTransport(handler), max_retries=0))
+        orchestrator = DecisionOrchestrator()
+        context = {"ltv": 1000, "cac": 500, "churn_rate": 0.02}
+
+        diagnosis = await orchestrator._generate_diagnosis("Escalar?", context, [], "acme")
+        risks = await orchestrator._identify_hidden_risks("Escalar?", context, [], "acme")
+
+        assert diagnosis.startswith("O LTV/CAC atual (2.0x)")
+        assert "Unit economics frágeis - risco de escala prematura" in risks
+
+    @pytest.mark.asyncio
+    async def test_diagnosis_uses_llm_when_enabled(self, monkeypatch):
+        """The LLM answer becomes the diagnosis and the risk list"""
+        monkeypatch.setattr(settings, "LLM_ENABLED", True)
+        monkeypatch.setattr(settings, "DIAGNOSIS_CACHE_ENABLED", False)
+        monkeypatch.setattr(llm, "_llm_gateway", _stub_gateway())
+        orchestrator = DecisionOrchestrator()
+
+        diagnosis = await orchestrator._generate_diagnosis("Escalar?", {}, [], "acme")
+
+        assert diagnosis == DEFAULT_REPLY
+        assert llm.get_llm_gateway().usage("acme")["requests"] == 1
@@ -0,0 +1,661 @@
+"""
+Tests for the RAG engine retrieval path.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.engine.ann import IVFPartitioner
+from app.engine.embedding_cache import EmbeddingCache
+from app.engine.embeddings import HashingEmbedder
+from app.engine.filters import PostingIndex
+from app.engine.rag_engine import RAGEngine, KnowledgeHit
+from app.engine.quantization import Int8Codec, ProductQuantizationCodec, build_codec
+from app.engine.vector_index import NamespaceIndex, PersistentNamespaceIndex
+from app.engine.vector_store import LocalVectorStore
+
+
+class TestMultiNamespaceRetrieval:
+    """Tests for retrieve_multi_namespace"""
+
+    @pytest.mark.asyncio
+    async def test_returns_hits_tagged_with_namespace(self):
+        """Each hit carries its namespace without touching the stored item"""
+        engine = RAGEngine()
+
+        hits = await engine.retrieve_multi_namespace(
+            query="Devemos escalar investimento em tráfego pago?",
+            namespaces=["growth_capital", "unit_economics"],
+            limit_per_namespace=2,
+        )
+
+        assert len(hits) == 4
+        assert all(isinstance(hit, KnowledgeHit) for hit in hits)
+        assert {hit.namespace for hit in hits} == {"growth_capital", "unit_economics"}
+        assert hits[0]["namespace"] == hits[0].namespace
+        assert hits[0].get("content") == hits[0].content
+
+        for items in RAGEngine.KNOWLEDGE_BASE.values():
+            for item in items:
+                assert "namespace" not in item
+
+    @pytest.mark.asyncio
+    async def test_hits_are_immutable(self):
+        """Hits cannot be mutated or extended"""
+        engine = RAGEngine()
+
+        hits = await engine.retrieve_multi_namespace(
+            query="LTV/CAC",
+            namespaces=["growth_capital"],
+        )
+
+        with pytest.raises(AttributeError):
+            hits[0].namespace = "other"
+        with pytest.raises(AttributeError):
+            hits[0].extra = 1
+        assert hits[0].to_dict()["namespace"] == "growth_capital"
+
+    @pytest.mark.asyncio
+    async def test_namespaces_are_searched_concurrently(self, monkeypatch):
+        """Namespace searches overlap instead of running one after another"""
+        engine = RAGEngine()
+        in_flight = 0
+        peak = 0
+        original_search = RAGEngine.search
+
+        async def slow_search(self, namespace, query, limit=5, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await original_search(self, namespace, query, limit, **kwargs)
+
+        monkeypatch.setattr(RAGEngine, "search", slow_search)
+
+        await engine.retrieve_multi_namespace(
+            query="CAC Payback",
+            namespaces=["growth_capital", "unit_economics", "market_sizing"],
+        )
+
+        assert peak == 3
+
+
+class TestSemanticSearch:
+    """Tests for embedding-based ranking"""
+
+    @pytest.mark.asyncio
+    async def test_ranks_most_similar_item_first(self):
+        """The item sharing the query's wording ranks first"""
+        engine = RAGEngine()
+
+        hits = await engine.search(
+            namespace="growth_capital",
+            query="Burn Multiple acima de 2x",
+            limit=2,
+        )
+
+        assert hits[0].id == "gc_003"
+        assert hits[0].score >= hits[1].score
+
+
+class TestEmbeddingCache:
+    """Tests for the two-tier query embedding cache"""
+
+    @pytest.mark.asyncio
+    async def test_normalized_queries_share_an_entry(self):
+        """Case, spacing and trailing punctuation do not cause misses"""
+        cache = EmbeddingCache(HashingEmbedder(dimension=64), max_memory_entries=8)
+
+        first = await cache.embed_query("Devemos escalar investimento em tráfego pago?")
+        second = await cache.embed_query("  devemos escalar   investimento em TRÁFEGO pago ")
+
+        assert np.array_equal(first, second)
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_is_bounded(self):
+        """The LRU evicts the least recently used query"""
+        cache = EmbeddingCache(HashingEmbedder(dimension=16), max_memory_entries=2)
+
+        for query in ["a", "b", "c"]:
+            await cache.embed_query(query)
+
+        assert cache.stats()["memory_entries"] == 2
+        await cache.embed_query("a")
+        assert cache.stats()["misses"] == 4
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """A fresh cache (new process) reads vectors from disk"""
+        path = str(tmp_path / "embeddings.sqlite")
+        embedder = HashingEmbedder(dimension=32)
+
+        warm = EmbeddingCache(embedder, disk_path=path)
+        vector = await warm.embed_query("LTV/CAC mínimo")
+
+        restarted = EmbeddingCache(embedder, disk_path=path)
+        cached = await restarted.embed_query("ltv/cac mínimo")
+
+        assert np.array_equal(vector, cached)
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.stats()["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_model_change_invalidates_disk_tier(self, tmp_path):
+        """Vectors written by another model version are purged"""
+        path = str(tmp_path / "embeddings.sqlite")
+
+        await EmbeddingCache(HashingEmbedder(dimension=32), disk_path=path).embed_query("NRR")
+        upgraded = EmbeddingCache(HashingEmbedder(dimension=48), disk_path=path)
+
+        assert upgraded.disk.count() == 0
+        vector = await upgraded.embed_query("NRR")
+        assert vector.shape == (48,)
+        assert upgraded.stats()["misses"] == 1
+
+
+class TestPersistentIndex:
+    """Tests for the memory-mapped namespace index"""
+
+    def _vectors(self, count: int, dimension: int = 8) -> np.ndarray:
+        rng = np.random.default_rng(count)
+        vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def test_reopened_index_is_memory_mapped(self, tmp_path):
+        """Vectors and items survive a reopen and are served from a memmap"""
+        index = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag", create=True)
+        vectors = self._vectors(5)
+        index.append([{"id": f"i{i}", "content": str(i)} for i in range(5)], vectors)
+
+        reopened = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag")
+
+        assert reopened.count == 5
+        assert isinstance(reopened._vectors, np.memmap)
+        assert np.allclose(reopened.vectors, vectors)
+        assert reopened.search(vectors[3], limit=1)[0][0]["id"] == "i3"
+
+    def test_other_workers_see_appends_on_refresh(self, tmp_path):
+        """A second handle (another worker) picks up appended rows"""
+        writer = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag", create=True)
+        reader = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag")
+        writer.append([{"id": "a", "content": "a"}], self._vectors(1))
+
+        assert reader.count == 0
+        reader.refresh()
+        assert reader.count == 1
+        assert reader.items[0]["id"] == "a"
+
+    def test_existing_ids_are_skipped(self, tmp_path):
+        """Re-appending chunks another handle already wrote does not duplicate them"""
+        writer = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag", create=True)
+        other = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag")
+        vectors = self._vectors(3)
+        writer.append([{"id": f"i{i}", "content": str(i)} for i in range(2)], vectors[:2])
+
+        other.append([{"id": f"i{i}", "content": str(i)} for i in range(3)], vectors)
+
+        assert other.count == 3
+        assert [item["id"] for item in PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag").items] == [
+            "i0", "i1", "i2",
+        ]
+
+    def test_torn_write_is_ignored(self, tmp_path):
+        """Bytes past the published count are dropped by the next append"""
+        index = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag", create=True)
+        index.append([{"id": "a", "content": "a"}], self._vectors(1))
+        with open(tmp_path / "ns" / "vectors.f32", "ab") as handle:
+            handle.write(b"\x00" * 13)
+
+        index.append([{"id": "b", "content": "b"}], self._vectors(2)[:1])
+        reopened = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "tag")
+
+        assert reopened.count == 2
+        assert (tmp_path / "ns" / "vectors.f32").stat().st_size == 2 * 8 * 4
+
+    def test_model_change_discards_index(self, tmp_path):
+        """An index built by another embedder is not reused"""
+        index = PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "old", create=True)
+        index.append([{"id": "a", "content": "a"}], self._vectors(1))
+
+        assert PersistentNamespaceIndex.open(str(tmp_path), "ns", 8, "new").count == 0
+
+    @pytest.mark.asyncio
+    async def test_engine_persists_and_reuses_seeded_namespaces(self, tmp_path, monkeypatch):
+        """Seeded namespaces are written once and reopened without embedding"""
+        monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_DIR", str(tmp_path))
+        embedder = RAGEngine().embedder
+
+        def worker():
+            return RAGEngine(store=LocalVectorStore(embedder.dimension, embedder.model_tag))
+
+        hits = await worker().search("unit_economics", "NRR abaixo de 90%", limit=1)
+        assert hits[0].id == "ue_002"
+        assert (tmp_path / "unit_economics" / "vectors.f32").exists()
+
+        engine = worker()
+
+        async def fail_embed(texts):
+            raise AssertionError("persisted namespace should not be re-embedded")
+
+        monkeypatch.setattr(engine, "embedder", type("E", (), {
+            "embed": staticmethod(fail_embed),
+            "dimension": engine.embedder.dimension,
+            "model_tag": engine.embedder.model_tag,
+        })())
+        assert await engine.count("unit_economics") == len(RAGEngine.KNOWLEDGE_BASE["unit_economics"])
+
+
+    @pytest.mark.asyncio
+    async def test_searches_refresh_while_adding(self, tmp_path, monkeypatch):
+        """Refreshes from searches never interleave with an append of the same handle"""
+        monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_REFRESH_SECONDS", 0.0)
+        store = LocalVectorStore(8, "tag")
+        vectors = self._vectors(200)
+        batches = [
+            ([{"id": f"i{i}", "content": str(i)} for i in range(start, start + 10)], vectors[start:start + 10])
+            for start in range(0, 200, 10)
+        ]
+
+        async def add_all():
+            for items, batch in batches:
+                await store.add("ns", items, batch)
+
+        async def search_repeatedly():
+            for _ in range(200):
+                store.generation("ns")
+                await store.search("ns", vectors[0], limit=1)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(add_all(), search_repeatedly())
+
+        index = await store.get_index("ns")
+        assert index.count == 200
+        assert [item["id"] for item in index.items] == [f"i{i}" for i in range(200)]
+        assert np.allclose(index.vectors, vectors)
+
+
+class TestQuantizedIndex:
+    """Tests for quantized codes with exact re-rank"""
+
+    @staticmethod
+    def _corpus(count, dimension=64, seed=7):
+        rng = np.random.default_rng(seed)
+        vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        items = [{"id": f"i{i}", "content": str(i)} for i in range(count)]
+        return items, vectors
+
+    @staticmethod
+    def _recall(index, vectors, queries, limit=10):
+        exact_scores = vectors @ queries.T
+        found = 0
+        for q in range(len(queries)):
+            expected = set(np.argsort(-exact_scores[:, q])[:limit])
+            hits = index.search(queries[q], limit)
+            found += len(expected & {int(item["id"][1:]) for item, _ in hits})
+        return found / (len(queries) * limit)
+
+    @pytest.mark.parametrize("codec_factory", [
+        lambda d: Int8Codec(d),
+        lambda d: ProductQuantizationCodec(d, subvectors=16, min_train_rows=256, iterations=10),
+    ])
+    def test_rerank_preserves_recall(self, codec_factory):
+        """Shortlisting on codes and re-ranking exactly keeps recall@10 high"""
+        items, vectors = self._corpus(2000)
+        queries = vectors[:20] + 0.05 * self._corpus(20, seed=11)[1]
+        index = NamespaceIndex("ns", 64, "tag", codec=codec_factory(64), rerank_candidates=100)
+        for start in range(0, 2000, 500):
+            index.append(items[start:start + 500], vectors[start:start + 500])
+
+        assert index.quantized
+        assert index.memory_profile()["scan_bytes_per_vector"] < 64 * 4
+        assert self._recall(index, vectors, queries) >= 0.9
+
+    def test_pq_serves_exact_search_until_trained(self):
+        """PQ only kicks in once the namespace has enough rows to train on"""
+        items, vectors = self._corpus(300)
+        index = NamespaceIndex(
+            "ns", 64, "tag", codec=ProductQuantizationCodec(64, min_train_rows=200, iterations=5)
+        )
+        index.append(items[:100], vectors[:100])
+        assert not index.quantized
+        assert index.search(vectors[5], 1)[0][0]["id"] == "i5"
+
+        index.append(items[100:], vectors[100:])
+        assert index.quantized
+        assert index.search(vectors[250], 1)[0][0]["id"] == "i250"
+
+    def test_float_vectors_leave_the_heap_once_quantized(self):
+        """Only the codes stay in memory; re-rank vectors are read from a map"""
+        items, vectors = self._corpus(600)
+        index = NamespaceIndex(
+            "ns", 64, "tag", codec=ProductQuantizationCodec(64, subvectors=8, min_train_rows=200, iterations=5)
+        )
+        index.append(items[:100], vectors[:100])
+        assert index.memory_profile()["memory_bytes"] >= 100 * 64 * 4
+
+        index.append(items[100:400], vectors[100:400])
+        index.append(items[400:], vectors[400:])
+        profile = index.memory_profile()
+
+        assert isinstance(index._vectors, np.memmap)
+        assert profile["memory_bytes"] < 600 * 64 * 4
+        assert profile["memory_bytes"] == sum(array.nbytes for array in index._codes.values())
+        assert profile["mapped_bytes"] == 600 * 64 * 4
+        assert np.allclose(index.vectors, vectors)
+        assert index.search(vectors[450], 1)[0][0]["id"] == "i450"
+
+    def test_codes_are_persisted_and_shared(self, tmp_path):
+        """Codes and the trained codebook are memory-mapped by other workers"""
+        items, vectors = self._corpus(400)
+
+        def codec():
+            return build_codec({"quantization": "pq", "pq_subvectors": 8, "pq_min_train_rows": 200}, 64)
+
+        writer = PersistentNamespaceIndex.open(str(tmp_path), "ns", 64, "tag", create=True, codec=codec())
+        reader = PersistentNamespaceIndex.open(str(tmp_path), "ns", 64, "tag", codec=codec())
+        writer.append(items[:300], vectors[:300])
+        writer.append(items[300:], vectors[300:])
+
+        reader.refresh()
+        assert reader.quantized
+        assert isinstance(reader._codes["codes"], np.memmap)
+        assert np.array_equal(reader._codes["codes"], writer._codes["codes"])
+        assert reader.search(vectors[350], 1)[0][0]["id"] == "i350"
+
+    def test_codec_change_rebuilds_codes(self, tmp_path):
+        """Reopening with another codec re-encodes from the float32 vectors"""
+        items, vectors = self._corpus(50)
+        index = PersistentNamespaceIndex.open(str(tmp_path), "ns", 64, "tag", create=True)
+        index.append(items, vectors)
+
+        reopened = PersistentNamespaceIndex.open(str(tmp_path), "ns", 64, "tag", codec=Int8Codec(64))
+
+        assert reopened.quantized
+        assert reopened.count == 50
+        assert reopened.search(vectors[7], 1)[0][0]["id"] == "i7"
+
+
+class TestIVFIndex:
+    """Tests for the IVF approximate nearest-neighbour index"""
+
+    @staticmethod
+    def _clustered(count, dimension=32, centers=20, seed=3):
+        rng = np.random.default_rng(seed)
+        means = rng.standard_normal((centers, dimension))
+        vectors = means[rng.integers(0, centers, count)] + 0.3 * rng.standard_normal((count, dimension))
+        vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+        return [{"id": f"i{i}", "content": str(i)} for i in range(count)], vectors
+
+    def _index(self, **kwargs):
+        return NamespaceIndex(
+            "ns", 32, "tag", ann=IVFPartitioner(32, lists=16, nprobe=4, min_train_rows=500), **kwargs
+        )
+
+    def test_probing_more_lists_raises_recall(self):
+        """nprobe trades latency for recall, all lists equal brute force"""
+        items, vectors = self._clustered(3000)
+        index = self._index()
+        for start in range(0, 3000, 250):
+            index.append(items[start:start + 250], vectors[start:start + 250])
+        queries = vectors[::150]
+
+        def recall(nprobe):
+            found = 0
+            for query in queries:
+                expected = set(np.argsort(-(vectors @ query))[:10])
+                found += len(expected & {int(item["id"][1:]) for item, _ in index.search(query, 10, nprobe)})
+            return found / (10 * len(queries))
+
+        assert index.partitioned
+        assert index.ann.list_sizes().sum() == 3000
+        assert recall(4) >= 0.8
+        assert recall(16) == 1.0
+
+    def test_rows_inserted_after_training_are_found(self):
+        """Appends after training go to the existing lists"""
+        items, vectors = self._clustered(1200)
+        index = self._index()
+        index.append(items[:600], vectors[:600])
+        centroids = index.ann.centroids.copy()
+
+        index.append(items[600:], vectors[600:])
+
+        assert np.array_equal(index.ann.centroids, centroids)
+        assert index.search(vectors[1100], 1)[0][0]["id"] == "i1100"
+
+    def test_lists_are_persisted_without_retraining(self, tmp_path):
+        """Reopened and sibling indexes reuse the centroids and assignments"""
+        items, vectors = self._clustered(1000)
+
+        def open_index(create=False):
+            return PersistentNamespaceIndex.open(
+                str(tmp_path), "ns", 32, "tag", create=create,
+                codec=Int8Codec(32), ann=IVFPartitioner(32, lists=16, min_train_rows=500),
+            )
+
+        writer = open_index(create=True)
+        reader = open_index()
+        writer.append(items[:600], vectors[:600])
+        writer.append(items[600:], vectors[600:])
+        reader.refresh()
+        reopened = open_index()
+
+        for index in (reader, reopened):
+            assert index.partitioned and index.quantized
+            assert np.array_equal(index.ann.centroids, writer.ann.centroids)
+            assert np.array_equal(index.ann.list_sizes(), writer.ann.list_sizes())
+            assert index.search(vectors[900], 1)[0][0]["id"] == "i900"
+
+
+class TestTenantIsolation:
+    """Tests for tenant shards and filter pushdown"""
+
+    @pytest.mark.asyncio
+    async def test_private_knowledge_is_only_visible_to_its_tenant(self):
+        """Tenant items are layered over shared knowledge for that tenant only"""
+        engine = RAGEngine()
+        await engine.add_items("test_tenants", [{"id": "shared", "content": "CAC Payback compartilhado"}])
+        await engine.add_items(
+            "test_tenants",
+            [{"id": "private", "content": "Playbook privado de CAC Payback da Acme"}],
+            tenant_id="acme",
+        )
+
+        acme = await engine.search("test_tenants", "playbook privado CAC Payback Acme", tenant_id="acme")
+        other = await engine.search("test_tenants", "playbook privado CAC Payback Acme", tenant_id="globex")
+
+        assert acme[0].id == "private"
+        assert acme[0].get("tenant_id") == "acme"
+        assert {hit.id for hit in acme} == {"private", "shared"}
+        assert [hit.id for hit in other] == ["shared"]
+
+    @pytest.mark.asyncio
+    async def test_namespace_ids_cannot_address_other_shards(self, tmp_path, monkeypatch):
+        """A namespace id naming another tenant's shard or a path is rejected"""
+        monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_DIR", str(tmp_path / "index"))
+        embedder = RAGEngine().embedder
+        engine = RAGEngine(store=LocalVectorStore(embedder.dimension, embedder.model_tag))
+        await engine.add_items(
+            "test_tenants",
+            [{"id": "private", "content": "Playbook privado da Globex"}],
+            tenant_id="globex",
+        )
+
+        for namespace in ("test_tenants@globex", "../index/test_tenants@globex", "test_tenants/.."):
+            with pytest.raises(ValueError):
+                await engine.search(namespace, "playbook privado", tenant_id="acme")
+            with pytest.raises(ValueError):
+                await engine.find_items(namespace, tenant_id="acme")
+            with pytest.raises(ValueError):
+                await engine.search_all("playbook privado", namespaces=[namespace], tenant_id="acme")
+        with pytest.raises(ValueError):
+            await engine.add_items("test_tenants", [{"id": "x", "content": "x"}], tenant_id="../acme")
+
+    def test_filters_are_applied_before_top_k(self):
+        """A filtered search returns `limit` matches even if they rank low overall"""
+        rng = np.random.default_rng(5)
+        vectors = rng.standard_normal((500, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        items = [
+            {"id": str(i), "metrics": ["NRR"] if i % 50 == 0 else ["CAC"], "tags": ["saas"] if i % 100 == 0 else []}
+            for i in range(500)
+        ]
+        index = NamespaceIndex("ns", 16, "tag")
+        index.append(items, vectors)
+
+        hits = index.search(vectors[1], 5, filters={"metrics": ["nrr"]})
+        both = index.search(vectors[1], 5, filters={"metrics": ["NRR"], "tags": ["saas"]})
+
+        assert len(hits) == 5
+        assert all("NRR" in item["metrics"] for item, _ in hits)
+        assert {item["id"] for item, _ in both} == {"0", "100", "200", "300", "400"}
+        assert index.search(vectors[1], 5, filters={"metrics": ["unknown"]}) == []
+        assert index.filters.counts("metrics") == {"NRR": 10, "CAC": 490}
+
+    def test_postings_published_before_their_size_match_nothing(self):
+        """A search racing an add never fails on a list whose size is not set yet"""
+        postings = PostingIndex()
+        postings.add([{"id": "a", "metrics": ["CAC"]}], 0)
+        # State between publishing a new list and setting its size
+        postings._postings["metrics"]["nrr"] = np.array([1], dtype=np.int64)
+
+        assert postings.rows({"metrics": ["NRR"]}, 2).tolist() == []
+        assert postings.rows({"metrics": ["CAC", "NRR"]}, 2).tolist() == [0]
+
+    def test_filters_use_ivf_candidates_for_large_sets(self, monkeypatch):
+        """Large filtered sets are intersected with the probed IVF lists"""
+        monkeypatch.setattr(NamespaceIndex, "FILTERED_SCAN_ROWS", 10)
+        rng = np.random.default_rng(6)
+        vectors = rng.standard_normal((800, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        items = [{"id": str(i), "tags": ["even" if i % 2 == 0 else "odd"]} for i in range(800)]
+        index = NamespaceIndex("ns", 16, "tag", ann=IVFPartitioner(16, lists=8, nprobe=8, min_train_rows=400))
+        index.append(items, vectors)
+
+        hits = index.search(vectors[10], 3, filters={"tags": ["even"]})
+
+        assert index.partitioned
+        assert hits[0][0]["id"] == "10"
+        assert all(int(item["id"]) % 2 == 0 for item, _ in hits)
+
+
+class TestCrossNamespaceSearch:
+    """Tests for search_all"""
+
+    @staticmethod
+    def _engine():
+        embedder = RAGEngine().embedder
+        return RAGEngine(store=LocalVectorStore(embedder.dimension, embedder.model_tag))
+
+    @pytest.mark.asyncio
+    async def test_hits_are_fused_by_score(self):
+        """One ranking across namespaces, ordered by similarity"""
+        engine = self._engine()
+
+        hits = await engine.search_all("CAC Payback e eficiência de capital", limit=6)
+
+        assert len(hits) == 6
+        assert len({hit.namespace for hit in hits}) > 1
+        assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached_until_the_index_changes(self):
+        """Repeated searches hit the cache; an add invalidates it at once"""
+        engine = self._engine()
+        query = "playbook de expansão internacional"
+
+        first = await engine.search_all(query, namespaces=["market_sizing", "test_fused"], limit=3)
+        second = await engine.search_all(f"  {query.upper()} ", namespaces=["test_fused", "market_sizing"], limit=3)
+        assert second == first
+        assert engine.search_cache.hits == 1
+
+        # Callers get their own list: mutating it does not touch the cache
+        second.clear()
+        third = await engine.search_all(query, namespaces=["market_sizing", "test_fused"], limit=3)
+        assert third == first and len(third) == 3
+        first.reverse()
+        assert (await engine.search_all(query, namespaces=["market_sizing", "test_fused"], limit=3))[0] == third[0]
+
+        await engine.add_items("test_fused", [{"id": "new", "content": "Playbook de expansão internacional"}])
+        third = await engine.search_all(query, namespaces=["market_sizing", "test_fused"], limit=3)
+
+        assert third is not first
+        assert third[0].id == "new"
+        assert third[0].namespace == "test_fused"
+
+    @pytest.mark.asyncio
+    async def test_tenant_additions_only_invalidate_that_tenant(self):
+        """Tenant shard generations are part of the key"""
+        engine = self._engine()
+        await engine.search_all("NRR", namespaces=["unit_economics"], tenant_id="acme")
+        await engine.search_all("NRR", namespaces=["unit_economics"], tenant_id="globex")
+
+        await engine.add_items("unit_economics", [{"id": "acme_nrr", "content": "NRR da Acme"}], tenant_id="acme")
+        await engine.search_all("NRR", namespaces=["unit_economics"], tenant_id="acme")
+        await engine.search_all("NRR", namespaces=["unit_economics"], tenant_id="globex")
+
+        assert engine.search_cache.hits == 1
+        assert "unit_economics" in await engine.list_namespaces("acme")
+
+
+class TestNamespaceStats:
+    """Tests for namespace statistics and metric lookups"""
+
+    @staticmethod
+    def _engine():
+        embedder = RAGEngine().embedder
+        return RAGEngine(store=LocalVectorStore(embedder.dimension, embedder.model_tag))
+
+    @pytest.mark.asyncio
+    async def test_items_are_looked_up_by_metric(self):
+        """Items mentioning a metric come from the postings, shared plus tenant"""
+        engine = self._engine()
+        await engine.add_items(
+            "growth_capital",
+            [{"id": "acme_cac", "content": "Payback da Acme", "metrics": ["cac payback"]}],
+            tenant_id="acme",
+        )
+
+        shared = await engine.find_items("growth_capital", metrics=["CAC Payback"])
+        acme = await engine.find_items("growth_capital", metrics=["CAC Payback"], tenant_id="acme")
+
+        assert [hit.id for hit in shared] == ["gc_001"]
+        assert [hit.id for hit in acme] == ["gc_001", "acme_cac"]
+        assert await engine.find_items("growth_capital", metrics=["unknown"]) == []
+
+    @pytest.mark.asyncio
+    async def test_stats_follow_ingestion(self):
+        """Counts and metric frequencies are refreshed when items are added"""
+        engine = self._engine()
+        before = await engine.namespace_stats("growth_capital")
+
+        await engine.add_items("growth_capital", [{"id": "new", "content": "GEI", "metrics": ["GEI", "NRR"]}])
+        after = await engine.namespace_stats("growth_capital")
+
+        assert after["item_count"] == before["item_count"] + 1
+        assert after["metrics"]["GEI"] == before["metrics"]["GEI"] + 1
+        assert after["metrics"]["NRR"] == 1
+        assert list(after["metrics"])[0] == "GEI"
+
+    @pytest.mark.asyncio
+    async def test_cached_stats_are_not_shared_with_callers(self):
+        """Editing returned stats does not change what later callers get"""
+        engine = self._engine()
+        first = await engine.namespace_stats("growth_capital")
+        expected = {**first, "metrics": dict(first["metrics"]), "tags": dict(first["tags"])}
+
+        first["item_count"] = -1
+        first["metrics"].clear()
+        second = await engine.namespace_stats("growth_capital")
+        second["tags"]["mutated"] = 1
+
+        assert second == {**expected, "tags": {**expected["tags"], "mutated": 1}}
+        assert await engine.namespace_stats("growth_capital") == expected
@@ -0,0 +1,104 @@
+"""
+Tests for the SEMrush client and its streaming report parser.
+"""
+
+import math
+
+import httpx
+import pytest
+
+from app.integrations.tools.semrush import SemrushClient
+from app.integrations.tools.semrush_csv import ColumnarReport, SemrushError, parse_text
+
+DOMAIN_RANKS = (
+    "Domain;Rank;Organic Keywords;Organic Traffic;Organic Cost;Adwords Keywords;Adwords Traffic;Adwords Cost\r\n"
+    "loja.com.br;1520;48211;392004;251877.5;310;8120;10442\r\n"
+)
+ORGANIC_HEADER = "Keyword;Position;Search Volume;CPC;Url;Trends\r\n"
+
+
+def organic_line(n: int) -> str:
+    return f"tenis corrida {n};{n % 20 + 1};{1000 + n};{'' if n % 2 else '1.25'};https://loja.com.br/p/{n};0.5,1.00\r\n"
+
+
+class TestReportParsing:
+    """Typed rows from semicolon-separated reports"""
+
+    @pytest.mark.asyncio
+    async def test_domain_overview_typed(self, serve):
+        """domain_ranks is parsed into one typed row"""
+        seen = serve(lambda request: httpx.Response(200, text=DOMAIN_RANKS))
+        overview = await SemrushClient({"api_key": "k"}).domain_overview("loja.com.br", db="br")
+
+        assert overview["domain"] == "loja.com.br"
+        assert overview["rank"] == 1520
+        assert overview["organic_cost"] == 251877.5
+        assert seen[0].url.params["type"] == "domain_ranks"
+        assert seen[0].url.params["database"] == "br"
+
+    @pytest.mark.asyncio
+    async def test_rows_stream_before_body_ends(self, serve):
+        """Rows are yielded while later chunks are still being produced"""
+        produced = []
+
+        async def body():
+            yield ORGANIC_HEADER.encode()
+            for n in range(500):
+                produced.append(n)
+                yield organic_line(n).encode()
+
+        serve(lambda request: httpx.Response(200, content=body()))
+        rows = SemrushClient({"api_key": "k"}).domain_organic("loja.com.br", export_columns="Ph,Po,Nq,Cp,Ur,Td")
+
+        first = await rows.__anext__()
+        assert first == {
+            "keyword": "tenis corrida 0",
+            "position": 1,
+            "search_volume": 1000,
+            "cpc": 1.25,
+            "url": "https://loja.com.br/p/0",
+            "trends": [0.5, 1.0],
+        }
+        assert len(produced) < 500
+        remaining = [row async for row in rows]
+        assert len(remaining) == 499
+        assert remaining[0]["cpc"] is None
+
+    @pytest.mark.asyncio
+    async def test_columnar_report(self, serve):
+        """Numeric columns are float64 arrays with NaN for missing values"""
+        serve(lambda request: httpx.Response(200, text=ORGANIC_HEADER + "".join(organic_line(n) for n in range(4))))
+        report = await SemrushClient({"api_key": "k"}).report_columns(
+            "domain_organic", "Ph,Po,Nq,Cp,Ur,Td", {"domain": "loja.com.br"}
+        )
+
+        assert len(report) == 4
+        assert report.array("search_volume").tolist() == [1000.0, 1001.0, 1002.0, 1003.0]
+        assert math.isnan(report.array("cpc")[1])
+        assert report.column("keyword")[3] == "tenis corrida 3"
+
+    @pytest.mark.asyncio
+    async def test_errors(self, serve):
+        """NOTHING FOUND is empty; other ERROR lines raise"""
+        serve(lambda request: httpx.Response(200, text="ERROR 50 :: NOTHING FOUND\r\n"))
+        client = SemrushClient({"api_key": "k"})
+        assert [row async for row in client.phrase_related("xyz")] == []
+
+        serve(lambda request: httpx.Response(200, text="ERROR 132 :: API UNITS BALANCE IS ZERO\r\n"))
+        with pytest.raises(SemrushError) as error:
+            await client.domain_overview("loja.com.br")
+        assert error.value.code == 132
+
+    @pytest.mark.asyncio
+    async def test_transient_status_retried(self, serve):
+        """A 503 before the body starts is retried like any integration GET"""
+        responses = [httpx.Response(503, text="busy"), httpx.Response(200, text=DOMAIN_RANKS)]
+        seen = serve(lambda request: responses.pop(0))
+        assert (await SemrushClient({"api_key": "k"}).domain_overview("loja.com.br"))["rank"] == 1520
+        assert len(seen) == 2
+
+    def test_column_count_mismatch(self):
+        """A header that does not match export_columns is rejected"""
+        with pytest.raises(ValueError):
+            parse_text(DOMAIN_RANKS, "Dn,Rk")
+        assert len(ColumnarReport("Dn,Rk").fields) == 2
@@ -0,0 +1,131 @@
+"""
+Tests for the SEMrush persistent result cache and unit budget.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.db.session import Base
+from app.integrations.tools.semrush import SemrushClient
+from app.integrations.tools.semrush_cache import CachedSemrushClient, SemrushReportCache, UnitBudgetExceeded
+
+TENANT = "tenant-1"
+DOMAIN_RANKS = "Domain;Rank;Organic Keywords;Organic Traffic;Organic Cost;Adwords Keywords;Adwords Traffic;Adwords Cost\r\nloja.com.br;1520;48211;392004;251877.5;310;8120;10442\r\n"
+ORGANIC = "Keyword;Position;Search Volume\r\n" + "".join(f"kw {n};{n + 1};{100 * n}\r\n" for n in range(4))
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def semrush(serve, monkeypatch):
+    """Fake SEMrush answering domain_ranks and domain_organic; returns the request list"""
+    monkeypatch.setattr(settings, "SEMRUSH_MONTHLY_UNIT_BUDGET", 0)
+    monkeypatch.setattr(settings, "SEMRUSH_TENANT_UNIT_BUDGETS", {})
+    monkeypatch.setattr(settings, "SEMRUSH_CACHE_TTL_HOURS", {})
+
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        body = DOMAIN_RANKS if request.url.params["type"] == "domain_ranks" else ORGANIC
+        return httpx.Response(200, text=body)
+
+    return serve(handler)
+
+
+def cached_client(session_factory, tenant_id=TENANT):
+    cache = SemrushReportCache(session_factory)
+    return CachedSemrushClient(SemrushClient({"api_key": "k"}), tenant_id, cache=cache)
+
+
+class TestReportCache:
+    """Persistent reuse of report results"""
+
+    @pytest.mark.asyncio
+    async def test_hit_saves_units(self, semrush, session_factory):
+        """A repeated report is served from the database and counted as units saved"""
+        client = cached_client(session_factory)
+        first = await client.domain_organic("loja.com.br", limit=10, export_columns="Ph,Po,Nq")
+        second = await cached_client(session_factory, "tenant-2").domain_organic(
+            "loja.com.br", limit=10, export_columns="Ph,Po,Nq"
+        )
+
+        assert first == second
+        assert len(semrush) == 1
+        usage = await client.cache.usage(TENANT)
+        assert usage["units_spent"] == 40
+        assert usage["calls"] == 1
+        other = await client.cache.usage("tenant-2")
+        assert other["units_saved"] == 40
+        assert other["hit_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_key_includes_database_and_columns(self, semrush, session_factory):
+        """Another database or column set is a different report"""
+        client = cached_client(session_factory)
+        await client.domain_organic("loja.com.br", limit=10, export_columns="Ph,Po,Nq")
+        await client.domain_organic("loja.com.br", db="br", limit=10, export_columns="Ph,Po,Nq")
+        await client.domain_organic("loja.com.br", limit=10, export_columns="Ph,Nq,Po")
+        assert len(semrush) == 3
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, semrush, session_factory, monkeypatch):
+        """An expired result is fetched again"""
+        monkeypatch.setattr(settings, "SEMRUSH_CACHE_TTL_HOURS", {"domain_ranks": 0})
+        client = cached_client(session_factory)
+        assert (await client.domain_overview("loja.com.br"))["rank"] == 1520
+        await client.domain_overview("loja.com.br")
+        assert len(semrush) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self, semrush, session_factory):
+        """Identical reports requested together cost one call"""
+        client = cached_client(session_factory)
+        results = await asyncio.gather(*(client.domain_overview("loja.com.br") for _ in range(3)))
+        assert all(result == results[0] for result in results)
+        assert len(semrush) == 1
+        assert client.cache.stats()["hits"] == 2
+
+
+class TestUnitBudget:
+    """Per-tenant monthly budget"""
+
+    @pytest.mark.asyncio
+    async def test_refuses_over_budget(self, semrush, session_factory, monkeypatch):
+        """A call whose worst case does not fit is refused before it is sent"""
+        monkeypatch.setattr(settings, "SEMRUSH_TENANT_UNIT_BUDGETS", {TENANT: 100})
+        client = cached_client(session_factory)
+        with pytest.raises(UnitBudgetExceeded) as error:
+            await client.domain_organic("loja.com.br", limit=20, export_columns="Ph,Po,Nq")
+        assert error.value.remaining == 100
+        assert semrush == []
+
+        # Other tenants keep the (unlimited) default
+        await cached_client(session_factory, "tenant-2").domain_organic("loja.com.br", limit=20, export_columns="Ph,Po,Nq")
+
+    @pytest.mark.asyncio
+    async def test_queues_behind_in_flight_reservations(self, semrush, session_factory, monkeypatch):
+        """A call that only collides with in-flight reservations waits for them to settle"""
+        monkeypatch.setattr(settings, "SEMRUSH_MONTHLY_UNIT_BUDGET", 250)
+        client = cached_client(session_factory)
+
+        first, second = await asyncio.gather(
+            client.domain_organic("a.com", limit=20, export_columns="Ph,Po,Nq"),
+            client.domain_organic("b.com", limit=20, export_columns="Ph,Po,Nq"),
+        )
+        assert len(first) == len(second) == 4
+        assert client.cache.budget.stats()["queued"] == 1
+        usage = await client.cache.usage(TENANT)
+        assert usage["units_spent"] == 80
+        assert usage["remaining"] == 170
@@ -0,0 +1,110 @@
+"""
+Tests for single-flight coalescing of evaluations and searches.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+from app.engine.orchestrator import DecisionOrchestrator
+from app.engine.rag_engine import RAGEngine
+from app.engine.vector_store import LocalVectorStore
+
+CONTEXT = {"company_stage": "traction", "decision_type": "growth", "ltv": 1000.0, "cac": 500.0, "churn_rate": 0.02}
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Same key runs once while in flight, again afterwards"""
+        flights = SingleFlight()
+        runs = []
+
+        async def work(value):
+            runs.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(*(flights.do("k", lambda: work(1)) for _ in range(5)), flights.do("other", lambda: work(2)))
+        again = await flights.do("k", lambda: work(3))
+
+        assert results == [1, 1, 1, 1, 1, 2]
+        assert again == 3
+        assert runs == [1, 2, 3]
+        assert flights.stats() == {"in_flight": 0, "calls": 7, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller_and_cancellation_does_not(self):
+        """A failure is raised to all waiters; a cancelled waiter leaves the work running"""
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("s", slow))
+        second = asyncio.ensure_future(flights.do("s", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+
+
+class TestCoalescedPipelines:
+    """Coalescing in RAGEngine.search and DecisionOrchestrator.evaluate"""
+
+    @pytest.mark.asyncio
+    async def test_identical_searches_hit_the_store_once(self, monkeypatch):
+        """Concurrent identical searches share one store query, each gets its own list"""
+        embedder = RAGEngine().embedder
+        store = LocalVectorStore(embedder.dimension, embedder.model_tag)
+        engine = RAGEngine(store=store)
+        await engine.count("unit_economics")
+
+        calls = []
+        original = store.search
+
+        async def counted_search(*args, **kwargs):
+            calls.append(args)
+            await asyncio.sleep(0.01)
+            return await original(*args, **kwargs)
+
+        monkeypatch.setattr(store, "search", counted_search)
+
+        results = await asyncio.gather(*(engine.search("unit_economics", "NRR acima de 100%", tenant_id="acme") for _ in range(4)))
+        await engine.search("unit_economics", "NRR acima de 100%", tenant_id="globex")
+
+        assert len(calls) == 2
+        assert results[0] == results[3] and results[0] is not results[3]
+
+    @pytest.mark.asyncio
+    async def test_identical_evaluations_run_the_pipeline_once(self, monkeypatch):
+        """Same tenant, question and context share one run; other tenants do not"""
+        runs = []
+        original = DecisionOrchestrator._evaluate
+
+        async def counted_evaluate(self, *args, **kwargs):
+            runs.append(args)
+            await asyncio.sleep(0.01)
+            return await original(self, *args, **kwargs)
+
+        monkeypatch.setattr(DecisionOrchestrator, "_evaluate", counted_evaluate)
+        question = "Devemos escalar investimento em tráfego pago?"
+
+        responses = await asyncio.gather(
+            *(DecisionOrchestrator().evaluate(question, dict(CONTEXT), f"user-{i}", "acme") for i in range(3)),
+            DecisionOrchestrator().evaluate(question, dict(CONTEXT), "user-x", "globex"),
+        )
+
+        assert len(runs) == 2
+        assert responses[0] == responses[1] and responses[0] is not responses[1]
@@ -0,0 +1,39 @@
+"""
+Tests for the SQLite key/value store behind the caches' disk tiers.
+"""
+
+from app.core.sqlite_store import SQLiteStore
+
+
+class TestSQLiteStore:
+    """Tests for SQLiteStore"""
+
+    def test_values_survive_reopen(self, tmp_path):
+        """Values and their meta are read back by another store on the same file"""
+        path = str(tmp_path / "cache.sqlite")
+        SQLiteStore(path, "entries", 10).put("a", b"\x00\x01", meta='{"etag": "v1"}')
+
+        assert SQLiteStore(path, "entries", 10).get("a") == (b"\x00\x01", '{"etag": "v1"}')
+        assert SQLiteStore(path, "entries", 10).get("b") is None
+
+    def test_other_tags_are_purged(self, tmp_path):
+        """Rows written under another tag are dropped on open"""
+        path = str(tmp_path / "cache.sqlite")
+        SQLiteStore(path, "entries", 10, tag="model-a").put("a", b"old")
+
+        store = SQLiteStore(path, "entries", 10, tag="model-b")
+        assert store.get("a") is None
+        assert store.count() == 0
+
+    def test_least_recently_read_rows_are_pruned(self, tmp_path, monkeypatch):
+        """Past max_entries the rows read longest ago go first"""
+        monkeypatch.setattr(SQLiteStore, "PRUNE_EVERY", 1)
+        store = SQLiteStore(str(tmp_path / "cache.sqlite"), "entries", 2)
+        store.put("a", b"1")
+        store.put("b", b"2")
+        store.get("a")
+        store.put("c", b"3")
+
+        assert store.count() == 2
+        assert store.get("b") is None
+        assert store.get("a") is not None
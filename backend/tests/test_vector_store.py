@@ -0,0 +1,129 @@
+"""
+Tests for the vector store backends.
+
+The Qdrant backend runs against embedded Qdrant (`:memory:`), and against a
+real server when QDRANT_TEST_URL is set (e.g. a local container:
+`docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant`).
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.engine.vector_store import LocalVectorStore, QdrantVectorStore
+
+DIMENSION = 16
+
+
+def _local_store():
+    return LocalVectorStore(DIMENSION, "test-model")
+
+
+def _qdrant_store(location=None, url=None, prefer_grpc=False):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    if location:
+        client = qdrant_client.AsyncQdrantClient(location=location)
+    else:
+        client = qdrant_client.AsyncQdrantClient(url=url, prefer_grpc=prefer_grpc)
+    return QdrantVectorStore(client, DIMENSION, "test-model", prefix="mai_test_", batch_size=7)
+
+
+STORES = [
+    pytest.param(_local_store, id="memory"),
+    pytest.param(lambda: _qdrant_store(location=":memory:"), id="qdrant-embedded"),
+    pytest.param(
+        lambda: _qdrant_store(url=os.environ["QDRANT_TEST_URL"], prefer_grpc=True),
+        id="qdrant-server",
+        marks=pytest.mark.skipif(not os.getenv("QDRANT_TEST_URL"), reason="QDRANT_TEST_URL not set"),
+    ),
+]
+
+
+def _corpus(count, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    items = [
+        {"id": f"doc-{i}", "content": f"chunk {i}", "metrics": ["NRR" if i % 3 == 0 else "CAC"], "tags": []}
+        for i in range(count)
+    ]
+    return items, vectors
+
+
+@pytest.mark.parametrize("make_store", STORES)
+class TestVectorStoreContract:
+    """Behaviour every backend must provide"""
+
+    @pytest.mark.asyncio
+    async def test_add_search_and_count(self, make_store):
+        """Batched adds are searchable and counted per shard"""
+        store = make_store()
+        namespace = f"contract_{os.getpid()}"
+        items, vectors = _corpus(30)
+
+        assert not await store.open(namespace)
+        await store.add(namespace, items, vectors)
+        hits = await store.search(namespace, vectors[4], limit=3)
+
+        assert await store.count(namespace) == 30
+        assert hits[0][0]["id"] == "doc-4"
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-4)
+        assert not any(key.startswith("_") for key in hits[0][0])
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_tenants_and_filters(self, make_store):
+        """Tenant shards are isolated and filters apply before top-k"""
+        store = make_store()
+        namespace = f"contract_tenants_{os.getpid()}"
+        items, vectors = _corpus(12)
+        await store.add(namespace, items[:6], vectors[:6])
+        await store.add(namespace, items[6:], vectors[6:], tenant_id="acme")
+
+        shared = await store.search(namespace, vectors[7], limit=12)
+        acme = await store.search(namespace, vectors[7], limit=12, tenants=[None, "acme"])
+        nrr = await store.search(namespace, vectors[1], limit=3, tenants=[None, "acme"], filters={"metrics": ["nrr"]})
+
+        assert {item["id"] for item, _ in shared} == {f"doc-{i}" for i in range(6)}
+        assert acme[0][0]["id"] == "doc-7"
+        assert len(acme) == 12
+        assert len(nrr) == 3 and all(item["metrics"] == ["NRR"] for item, _ in nrr)
+        assert await store.count(namespace, "acme") == 6
+        assert await store.facets(namespace, "metrics", [None, "acme"]) == {"NRR": 4, "CAC": 8}
+        assert {item["id"] for item in await store.lookup(namespace, {"metrics": ["nrr"]}, [None, "acme"])} == {
+            "doc-0", "doc-3", "doc-6", "doc-9",
+        }
+        assert len(await store.lookup(namespace, {"metrics": ["CAC"]}, limit=2)) == 2
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_only_if_empty(self, make_store):
+        """Seeding twice does not duplicate items"""
+        store = make_store()
+        namespace = f"contract_seed_{os.getpid()}"
+        items, vectors = _corpus(4)
+
+        await store.add(namespace, items, vectors, only_if_empty=True)
+        await store.add(namespace, items, vectors, only_if_empty=True)
+
+        assert await store.count(namespace) == 4
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_namespaces_and_generations(self, make_store):
+        """Listings respect tenants and every add bumps the shard generation"""
+        store = make_store()
+        shared, private = f"contract_list_{os.getpid()}", f"contract_private_{os.getpid()}"
+        items, vectors = _corpus(4)
+
+        await store.add(shared, items, vectors)
+        await store.add(private, items, vectors, tenant_id="acme")
+
+        assert shared in await store.namespaces()
+        assert private not in await store.namespaces("globex")
+        assert {shared, private} <= set(await store.namespaces("acme"))
+        assert store.generation(shared) == 1
+        assert store.generation(private) == 0
+        assert store.generation(private, "acme") == 1
+        await store.close()
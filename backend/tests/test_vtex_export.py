@@ -0,0 +1,214 @@
+"""
+Tests for the VTEX bulk order export.
+"""
+
+import asyncio
+import re
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.db.session import Base
+from app.integrations.ecommerce import vtex_export
+from app.integrations.ecommerce.vtex import VTEXClient
+from app.integrations.ecommerce.vtex_export import VTEXOrderExporter, normalize_order, parse_vtex_datetime
+from app.models.commerce import ExportCheckpoint, Order
+
+START = datetime(2024, 3, 1)
+END = datetime(2024, 3, 4)
+
+# 60 orders, one every 72 minutes over three days
+ORDERS = [
+    {
+        "orderId": f"{1000 + n}-01",
+        "creationDate": (START + timedelta(minutes=72 * n)).isoformat() + ".1234567+00:00",
+        "lastChange": (START + timedelta(minutes=72 * n + 5)).isoformat() + "+00:00",
+        "status": "invoiced",
+        "value": 15990,
+        "totals": [{"id": "Items", "value": 15000}, {"id": "Discounts", "value": -1000}, {"id": "Shipping", "value": 1990}],
+        "items": [{"quantity": 2}, {"quantity": 1}],
+        "clientProfileData": {"email": f"Customer{n % 7}@Example.com", "userProfileId": None},
+        "storePreferencesData": {"currencyCode": "BRL"},
+        "salesChannel": "1",
+    }
+    for n in range(60)
+]
+_RANGE = re.compile(r"creationDate:\[(.+) TO (.+)\]")
+
+
+class FakeVTEX:
+    """OMS list + get order, with optional failing order ids"""
+
+    def __init__(self):
+        self.failing = set()
+        self.list_calls = 0
+        self.detail_calls = 0
+        # "probe" (per_page=1 count), "list" and "detail", in request order
+        self.events = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/api/oms/pvt/orders":
+            self.list_calls += 1
+            self.events.append("probe" if request.url.params["per_page"] == "1" else "list")
+            low, high = (parse_vtex_datetime(value) for value in _RANGE.match(request.url.params["f_creationDate"]).groups())
+            matching = [o for o in ORDERS if low <= parse_vtex_datetime(o["creationDate"]) <= high]
+            matching.reverse()
+            page, per_page = int(request.url.params["page"]), int(request.url.params["per_page"])
+            pages = max(1, -(-len(matching) // per_page))
+            chunk = matching[(page - 1) * per_page:page * per_page]
+            return httpx.Response(200, json={
+                "list": [{"orderId": o["orderId"]} for o in chunk],
+                "paging": {"total": len(matching), "pages": pages, "currentPage": page, "perPage": per_page},
+            })
+        order_id = path.rsplit("/", 1)[-1]
+        self.detail_calls += 1
+        self.events.append("detail")
+        if order_id in self.failing:
+            return httpx.Response(404)
+        return httpx.Response(200, json=next(o for o in ORDERS if o["orderId"] == order_id))
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def vtex(serve, monkeypatch):
+    monkeypatch.setattr(settings, "INTEGRATION_MAX_RETRIES", 0)
+    fake = FakeVTEX()
+    serve(fake)
+    return fake
+
+
+def exporter(session_factory, **kwargs):
+    options = dict(window=timedelta(hours=12), window_concurrency=3, detail_concurrency=8, batch_size=7, page_size=5)
+    options.update(kwargs)
+    return VTEXOrderExporter(VTEXClient({"account_name": "shop"}), "tenant-1", session_factory=session_factory, **options)
+
+
+class FailingListing:
+    """Client whose listing fails right after its first summaries"""
+
+    async def iter_orders(self, **kwargs):
+        for order in ORDERS[:3]:
+            yield {"orderId": order["orderId"]}
+        raise httpx.ReadTimeout("listing timed out")
+
+
+async def count_orders(session_factory):
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(Order))
+
+
+class TestNormalize:
+    """Tests for order normalization"""
+
+    def test_order_row(self):
+        """Cents become currency units, e-mails are hashed, 7-digit fractions parse"""
+        row = normalize_order(ORDERS[1], "tenant-1")
+
+        assert row["external_id"] == "1001-01"
+        assert row["total_value"] == 159.9
+        assert row["discounts_value"] == -10.0
+        assert row["items_count"] == 3
+        assert row["created_at"] == datetime(2024, 3, 1, 1, 12, 0, 123456)
+        assert len(row["customer_id"]) == 32 and "@" not in row["customer_id"]
+        assert row["customer_id"] == normalize_order({**ORDERS[8], "orderId": "x"}, "t")["customer_id"]
+
+
+class TestExport:
+    """Tests for VTEXOrderExporter"""
+
+    @pytest.mark.asyncio
+    async def test_exports_every_order_once(self, vtex, session_factory):
+        """All orders land in the table; a re-run resumes past the end and does nothing"""
+        progress = await exporter(session_factory).run(START, END)
+
+        assert progress.orders == len(ORDERS)
+        assert progress.failed == 0
+        assert progress.completed_through == END
+        assert await count_orders(session_factory) == len(ORDERS)
+        assert progress.orders_per_second > 0
+
+        calls = vtex.list_calls + vtex.detail_calls
+        again = await exporter(session_factory).run(START, END)
+        assert again.orders == 0 and again.resumed_orders == len(ORDERS)
+        assert vtex.list_calls + vtex.detail_calls == calls
+
+    @pytest.mark.asyncio
+    async def test_failed_window_is_retried_on_resume(self, vtex, session_factory):
+        """The checkpoint stops before a window with failures; the re-run fills it without duplicates"""
+        vtex.failing = {ORDERS[15]["orderId"]}  # created on day 1, second half
+        progress = await exporter(session_factory).run(START, END)
+
+        assert progress.failed == 1 and progress.failed_windows == 1
+        # Failed detail calls are requests too
+        assert progress.requests == vtex.events.count("probe") + vtex.detail_calls == 6 + len(ORDERS)
+        assert progress.completed_through == START + timedelta(hours=12)
+        async with session_factory() as session:
+            checkpoint = (await session.execute(select(ExportCheckpoint))).scalar_one()
+        assert checkpoint.completed_through == START + timedelta(hours=12)
+
+        vtex.failing = set()
+        resumed = await exporter(session_factory).run(START, END)
+        assert resumed.completed_through == END
+        assert await count_orders(session_factory) == len(ORDERS)
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_the_end_moved(self, vtex, session_factory):
+        """A re-run with a later end (the default end is the current hour) resumes and exports through it"""
+        vtex.failing = {ORDERS[15]["orderId"]}
+        await exporter(session_factory).run(START, END)
+
+        vtex.failing = set()
+        probes = vtex.events.count("probe")
+        resumed = await exporter(session_factory).run(START, END + timedelta(days=1))
+
+        assert resumed.resumed_orders > 0
+        assert resumed.completed_through == END + timedelta(days=1)
+        # Only the windows after the checkpoint are listed again
+        assert vtex.events.count("probe") - probes == 7
+        assert await count_orders(session_factory) == len(ORDERS)
+        async with session_factory() as session:
+            checkpoint = (await session.execute(select(ExportCheckpoint))).scalar_one()
+        assert checkpoint.range_end == END + timedelta(days=1)
+
+    @pytest.mark.asyncio
+    async def test_failed_listing_gives_back_detail_slots(self, session_factory):
+        """Order tasks cancelled before they start still release their concurrency slot"""
+        slots = asyncio.Semaphore(4)
+        export = VTEXOrderExporter(FailingListing(), "tenant-1", session_factory=session_factory)
+
+        assert not await export._export_part((START, END), slots)
+        for _ in range(4):
+            await asyncio.wait_for(slots.acquire(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_windows_over_the_page_cap_are_split(self, vtex, session_factory, monkeypatch):
+        """A window listing more than MAX_LIST_PAGES pages is halved until it fits"""
+        monkeypatch.setattr(vtex_export, "MAX_LIST_PAGES", 2)  # 10 orders per listing
+        progress = await exporter(session_factory, window=timedelta(days=3)).run(START, END)
+
+        assert progress.windows_total >= 6
+        assert progress.orders == len(ORDERS)
+
+    @pytest.mark.asyncio
+    async def test_windows_are_sized_as_they_are_exported(self, vtex, session_factory):
+        """Orders of the first window are fetched before later windows are counted"""
+        progress = await exporter(session_factory, window_concurrency=1).run(START, END)
+
+        assert progress.orders == len(ORDERS)
+        last_probe = len(vtex.events) - 1 - vtex.events[::-1].index("probe")
+        assert vtex.events.index("detail") < last_probe